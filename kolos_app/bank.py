@@ -0,0 +1,207 @@
+"""Question banks preprocessed once per process.
+
+Library reads style.css and every questions/*.json at start-up and turns
+each bank into an immutable Bank: cleaned options and answers, the
+multi-select flag and a stable id per question (hash of its text, so ids
+survive reordering and edits of other questions). Reruns only look things
+up in memory.
+
+A file is parsed again only when watchdog reports a change and both its
+mtime and its content hash differ from the loaded version (a file touched
+without an edit just gets the new mtime); a bank that fails to parse keeps
+its last good version. watchdog watches only the questions folder and the
+CSS file, so writes elsewhere in the app folder (wyniki.db and its WAL) do
+not reach the handler. Without watchdog the banks are loaded once and
+refresh() can be called by hand.
+"""
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+
+MULTI_MARKER = "Wybierz wszystkie poprawne"
+_CLEAN = re.compile(r'[✓X]|\s+$')
+
+
+def clean_text(text: str) -> str:
+    """Usuwa niechciane znaki i białe znaki z tekstu."""
+    return _CLEAN.sub('', text).strip()
+
+
+class Question:
+    """Oczyszczone pytanie; współdzielone przez wszystkie sesje, nie modyfikować."""
+    __slots__ = ("id", "question", "options", "correct_answer", "is_multi")
+
+    def __init__(self, id: str, question: str, options: tuple, correct_answer, is_multi: bool):
+        self.id = id
+        self.question = question
+        self.options = options  # krotka tekstów odpowiedzi
+        self.correct_answer = correct_answer  # tekst lub krotka tekstów (wielokrotny wybór)
+        self.is_multi = is_multi
+
+
+class Bank:
+    """All questions of one file, in file order, and an id -> Question map."""
+    __slots__ = ("path", "mtime_ns", "digest", "questions", "by_id")
+
+    def __init__(self, path: Path, mtime_ns: int, digest: str, questions: tuple) -> None:
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.digest = digest
+        self.questions = questions
+        self.by_id = {q.id: q for q in questions}
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+
+def question_id(text: str, taken: dict) -> str:
+    base = hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+    qid, n = base, 1
+    while qid in taken:  # powtórzona treść pytania
+        qid, n = f"{base}-{n}", n + 1
+    return qid
+
+
+def parse_bank(path: Path, raw: bytes, mtime_ns: int) -> Bank:
+    data = json.loads(raw.decode("utf-8"))
+    questions = {}
+    for item in data:
+        correct_answer = item.get('correct_answer')
+        if isinstance(correct_answer, str):
+            correct_answer = clean_text(correct_answer)
+        elif isinstance(correct_answer, list):
+            correct_answer = tuple(clean_text(ans) for ans in correct_answer)
+        options = tuple(clean_text(value) for value in item.get('options', {}).values())
+        qid = question_id(item["question"], questions)
+        questions[qid] = Question(qid, item["question"], options, correct_answer, MULTI_MARKER in item["question"])
+    return Bank(path, mtime_ns, hashlib.sha256(raw).hexdigest(), tuple(questions.values()))
+
+
+def quiz_name(path: Path) -> str:
+    return path.stem.replace("_", " ").capitalize()
+
+
+class Library:
+    """Quiz list, banks and CSS of one app, shared by all sessions."""
+
+    def __init__(self, data_dir: str | Path = "questions", css_path: str | Path = "style.css") -> None:
+        self.data_dir: Path = Path(data_dir)
+        self.css_path: Path = Path(css_path)
+        self.css: str | None = None
+        self.quizzes: dict[str, Path] = {}
+        self.errors: dict[Path, str] = {}
+        self.reloads: int = 0
+        self._banks: dict[Path, Bank] = {}
+        self._lock = threading.Lock()
+        self._observer = None
+        self._css_watch = None
+        self.refresh()
+
+    def bank(self, path: Path) -> Bank:
+        bank = self._banks.get(Path(path))
+        return bank if bank is not None else Bank(Path(path), 0, "", ())
+
+    def refresh(self) -> None:
+        """Rescan the quiz folder and reload whatever changed."""
+        with self._lock:
+            self._load_css()
+            paths = sorted(self.data_dir.glob("*.json")) if self.data_dir.is_dir() else []
+            for path in set(self._banks) - set(paths):
+                self._drop(path)
+            for path in paths:
+                self._load_bank(path)
+            self.quizzes = {quiz_name(path): path for path in paths if path in self._banks}
+
+    def file_changed(self, path: str) -> None:
+        path = Path(path)
+        with self._lock:
+            if path.resolve() == self.css_path.resolve():
+                self._load_css()
+            elif path.suffix == ".json" and path.parent.resolve() == self.data_dir.resolve():
+                path = self.data_dir / path.name
+                if path.exists():
+                    self._load_bank(path)
+                else:
+                    self._drop(path)
+                paths = sorted(self._banks)
+                self.quizzes = {quiz_name(p): p for p in paths}
+
+    def _load_css(self) -> None:
+        try:
+            self.css = self.css_path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            self.css = None
+
+    def _load_bank(self, path: Path) -> None:
+        old = self._banks.get(path)
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+            if old is not None and old.mtime_ns == mtime_ns:
+                return
+            raw = path.read_bytes()
+            if old is not None and hashlib.sha256(raw).hexdigest() == old.digest:
+                old.mtime_ns = mtime_ns  # dotknięty, treść bez zmian
+                return
+            bank = parse_bank(path, raw, mtime_ns)
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            # zostaje ostatnia poprawna wersja (jeśli była)
+            self.errors[path] = f"{type(e).__name__}: {e}"
+            return
+        self.errors.pop(path, None)
+        # podmiana całego słownika: czytelnicy nie potrzebują blokady
+        self._banks = {**self._banks, path: bank}
+        self.reloads += 1
+
+    def _drop(self, path: Path) -> None:
+        self._banks = {p: b for p, b in self._banks.items() if p != path}
+        self.errors.pop(path, None)
+
+    def start_watching(self) -> bool:
+        """Reload on file changes; False when watchdog is not installed."""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+        library = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type in ("deleted", "moved") and Path(event.src_path) == library.css_path.resolve():
+                    # plik CSS podmieniony (zapis atomowy) lub usunięty; watchdog
+                    # zgłasza to jako zdarzenie katalogu, obserwujemy nowy plik
+                    library.file_changed(event.src_path)
+                    library._watch_css(self)
+                    return
+                if event.is_directory or event.event_type in ("opened", "closed_no_write"):
+                    return
+                for path in {event.src_path, getattr(event, "dest_path", "")} - {""}:
+                    library.file_changed(path)
+
+        self._observer = Observer()
+        handler = Handler()
+        if self.data_dir.is_dir():
+            self._observer.schedule(handler, str(self.data_dir))
+        self._watch_css(handler)
+        self._observer.daemon = True
+        self._observer.start()
+        return True
+
+    def _watch_css(self, handler) -> None:
+        """(Re)schedule the watch on the CSS file itself, not on its folder."""
+        if self._css_watch is not None:
+            try:
+                self._observer.unschedule(self._css_watch)
+            except KeyError:
+                pass
+            self._css_watch = None
+        if self.css_path.is_file():
+            self._css_watch = self._observer.schedule(handler, str(self.css_path.resolve()))
+
+    def stop_watching(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
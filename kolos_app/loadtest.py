@@ -0,0 +1,286 @@
+"""Load test of the quiz flow with N simultaneous sessions.
+
+Every session is a streamlit AppTest; the shared library and result
+store are process-wide (st.cache_resource), as in production. A session
+picks a quiz (round robin over questions/*.json), answers every question
+with a random option and ends on the summary screen.
+
+AppTest sets up a process-global runtime for every run, so sessions cannot
+run in parallel threads. The driver works in rounds instead: in every round
+all unfinished sessions click at the same moment and the reruns are served
+one after another, as on a server whose script threads share one core (GIL).
+For every rerun the service time (the rerun alone) and the response time
+(the wait for the sessions served earlier in the round plus the rerun) are
+recorded, by phase:
+
+- load:    first page view,
+- select:  choosing the quiz in the list,
+- start:   "Rozpocznij" (builds the session state),
+- answer:  choosing an answer (feedback screen),
+- next:    going to the next question,
+- summary: the last "next", which renders the end screen.
+
+Reported per session count: service and response percentiles, reruns and quizzes
+per second, the size of one session state (sizeof over the whole
+object graph), peak RSS, and how long the writer thread needed to get
+every answer into the database after the last rerun. The app runs from a
+temporary directory (a copy of its modules, questions/ and style.css, and
+an empty wyniki.db), since it keeps its files next to main.py.
+
+By default only machine-independent results are compared with the
+baseline: session errors, answers missing from the database and the size
+of the session state. Timings depend on the machine, so --check-timing
+(with a baseline saved on the same machine) adds the p95 of the response
+time and of every phase with at least --min-samples samples in both runs
+(load, select, start and summary have one sample per session), and the
+reruns per second.
+
+    python loadtest.py --sessions 1 4 8
+    python loadtest.py --save-baseline
+    python loadtest.py --check-timing
+"""
+import argparse
+import atexit
+import json
+import os
+import random
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP_DIR = Path(__file__).resolve().parent
+MAIN = str(APP_DIR / "main.py")  # w __main__ kopia w katalogu tymczasowym
+APP_FILES = ("main.py", "bank.py", "store.py", "style.css")
+BASELINE = str(APP_DIR / "loadtest_baseline.json")
+PHASES = ("load", "select", "start", "answer", "next", "summary")
+# najmniej próbek, przy których p95 fazy jest porównywany z bazą
+MIN_SAMPLES = 20
+
+
+def percentiles(values: list[float]) -> dict:
+    """p50/p95/p99 in ms and the number of samples."""
+    return {**{f"p{p}": 1000 * percentile(values, p) for p in (50, 95, 99)}, "n": len(values)}
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+def deep_size(obj, seen: set | None = None) -> int:
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_size(getattr(obj, name), seen) for name in obj.__slots__ if hasattr(obj, name))
+    elif hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+def rerun(at: AppTest, phase: str, action=None):
+    """One rerun; yields (phase, service time) to the driver."""
+    start = time.perf_counter()
+    (action() if action is not None else at).run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"{phase}: {at.exception[0].message}")
+    return phase, elapsed
+
+
+def session(quiz: str, seed: int, timeout: float, result: dict):
+    """One student taking one quiz from the start screen to the summary,
+    one rerun per step of the generator."""
+    rng = random.Random(seed)
+    at = AppTest.from_file(MAIN, default_timeout=timeout)
+    yield rerun(at, "load")
+    yield rerun(at, "select", lambda: at.selectbox[0].select(quiz))
+    yield rerun(at, "start", [b for b in at.button if b.label.startswith("Rozpocznij")][0].click)
+    answers = 0
+    while at.session_state["current_q_index_ptr"] < at.session_state["total_questions"]:
+        options = [b for b in at.button if b.key and b.key.startswith("q")]
+        if options:
+            yield rerun(at, "answer", rng.choice(options).click)
+        else:
+            rng.choice(at.checkbox).check()
+            yield rerun(at, "answer", [b for b in at.button if b.label == "Sprawdź odpowiedzi"][0].click)
+        answers += 1
+        last = at.session_state["current_q_index_ptr"] + 1 == at.session_state["total_questions"]
+        button = [b for b in at.button if b.label in ("Przejdź natychmiast", "Następne pytanie")][0]
+        yield rerun(at, "summary" if last else "next", button.click)
+    state = {key: at.session_state[key] for key in at.session_state.keys()}
+    result.update(answers=answers, state_bytes=deep_size(state))
+
+
+def count_answers(db: str) -> int:
+    if not os.path.exists(db):
+        return 0
+    with sqlite3.connect(db) as conn:
+        try:
+            return conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        except sqlite3.OperationalError:  # tabele jeszcze nie istnieją
+            return 0
+
+
+def run_sessions(n: int, quizzes: list[str], timeout: float = 30.0, seed: int = 0) -> dict:
+    service = {phase: [] for phase in PHASES}
+    response: list[float] = []
+    results = [{} for _ in range(n)]
+    errors: list[str] = []
+    db_before = count_answers("wyniki.db")
+
+    sessions = {i: session(quizzes[i % len(quizzes)], seed + i, timeout, results[i]) for i in range(n)}
+    start = time.perf_counter()
+    while sessions:
+        # runda: wszystkie sesje klikają jednocześnie, serwer obsługuje je po kolei
+        waited = 0.0
+        for i, steps in list(sessions.items()):
+            try:
+                phase, elapsed = next(steps)
+            except StopIteration:
+                del sessions[i]
+                continue
+            except Exception as e:  # błąd jednej sesji nie przerywa pomiaru
+                errors.append(f"sesja {i}: {type(e).__name__}: {e}")
+                del sessions[i]
+                continue
+            waited += elapsed
+            service[phase].append(elapsed)
+            response.append(waited)
+    wall = time.perf_counter() - start
+    results = [r for r in results if r]
+
+    # czas, po którym wątek zapisu ma w bazie wszystkie odpowiedzi
+    expected = db_before + sum(r["answers"] for r in results)
+    write_start = time.perf_counter()
+    while count_answers("wyniki.db") < expected and time.perf_counter() - write_start < 10.0:
+        time.sleep(0.01)
+    db_lag = time.perf_counter() - write_start
+
+    reruns = len(response)
+    row = {
+        "reruns": reruns,
+        "wall_s": wall,
+        "reruns_per_s": reruns / wall,
+        "quizzes_per_s": len(results) / wall,
+        "errors": errors,
+        "state_kb": max((r["state_bytes"] for r in results), default=0) / 1024,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "db_lag_s": db_lag,
+        "db_complete": count_answers("wyniki.db") >= expected,
+    }
+    if response:
+        row["response"] = percentiles(response)
+    for phase, values in service.items():
+        if values:
+            row[phase] = percentiles(values)
+    return row
+
+
+def format_percentiles(row: dict | None) -> str:
+    return f"{row['p50']:.1f}/{row['p95']:.1f}/{row['p99']:.1f}" if row else "-"
+
+
+def regressions(
+        current: dict, baseline: dict, speed_tol: float | None, memory_tol: float,
+        min_samples: int = MIN_SAMPLES,
+) -> list[str]:
+    """Errors, database completeness and session state always; timings only
+    when speed_tol is given, p95s only from at least min_samples samples."""
+    found = []
+    for n, row in current.items():
+        if row["errors"]:
+            found.append(f"N={n}: {len(row['errors'])} sesji z błędem")
+        if not row["db_complete"]:
+            found.append(f"N={n}: nie wszystkie odpowiedzi zapisane w bazie")
+        base = baseline.get(n)
+        if base is None:
+            continue
+        if row["state_kb"] > base["state_kb"] * (1 + memory_tol):
+            found.append(f"N={n}: stan sesji {row['state_kb']:.1f} kB, baza {base['state_kb']:.1f}")
+        if speed_tol is None:
+            continue
+        for phase in ("response",) + PHASES:
+            if phase not in row or phase not in base:
+                continue
+            # p95 z kilku próbek to praktycznie maksimum, nie porównujemy go
+            if min(row[phase].get("n", 0), base[phase].get("n", 0)) < min_samples:
+                continue
+            if row[phase]["p95"] > base[phase]["p95"] * (1 + speed_tol):
+                found.append(f"N={n} {phase}: p95 {row[phase]['p95']:.1f} ms, baza {base[phase]['p95']:.1f}")
+        if row["reruns_per_s"] < base["reruns_per_s"] / (1 + speed_tol):
+            found.append(f"N={n}: {row['reruns_per_s']:.1f} przebiegów/s, baza {base['reruns_per_s']:.1f}")
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test of the quiz with N simultaneous sessions.")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--quiz', nargs='+', default=None, help='nazwy quizów (domyślnie wszystkie z questions/)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=30.0, help='limit czasu jednego przebiegu skryptu [s]')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check-timing', action='store_true', help='porównaj też czasy z bazą (zależne od maszyny)')
+    parser.add_argument('--min-samples', type=int, default=MIN_SAMPLES,
+                        help='najmniej próbek fazy, przy których porównujemy jej p95')
+    parser.add_argument('--speed-tol', type=float, default=0.5, help='dopuszczalne spowolnienie (0.5 = 50%%)')
+    parser.add_argument('--memory-tol', type=float, default=0.25, help='dopuszczalny wzrost stanu sesji')
+    args = parser.parse_args()
+
+    # aplikacja działa w katalogu tymczasowym, żeby nie zmieniać wyniki.db;
+    # rmtree zarejestrowane przed Store, więc atexit wykona je po zamknięciu bazy
+    work_dir = tempfile.mkdtemp(prefix="kolos_loadtest_")
+    atexit.register(shutil.rmtree, work_dir, True)
+    shutil.copytree(APP_DIR / "questions", Path(work_dir) / "questions")
+    for name in APP_FILES:
+        shutil.copy(APP_DIR / name, work_dir)
+    os.chdir(work_dir)
+    MAIN = os.path.join(work_dir, "main.py")
+    quizzes = args.quiz or sorted(p.stem.replace("_", " ").capitalize() for p in Path("questions").glob("*.json"))
+
+    current = {}
+    print(f"{'N':>4} {'przebiegi/s':>12} {'quizy/s':>8} {'odpowiedź p50/p95/p99 [ms]':>27} "
+          f"{'stan [kB]':>10} {'RSS [MB]':>9} {'zapis [s]':>10}")
+    for n in args.sessions:
+        row = run_sessions(n, quizzes, args.timeout, args.seed)
+        current[str(n)] = row
+        print(f"{n:>4} {row['reruns_per_s']:>12.1f} {row['quizzes_per_s']:>8.3f} "
+              f"{format_percentiles(row.get('response')):>27} {row['state_kb']:>10.1f} "
+              f"{row['peak_rss_mb']:>9.1f} {row['db_lag_s']:>10.3f}")
+        print("     obsługa [ms]: " + ", ".join(f"{phase} {format_percentiles(row[phase])}"
+                                               for phase in PHASES if phase in row))
+        for error in row["errors"]:
+            print(f"  {error}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=1)
+        print(f"Baza zapisana do pliku: {args.baseline}")
+    else:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        elif args.check_timing:
+            sys.exit(f"Brak pliku bazy {args.baseline} (zapisz go: --save-baseline)")
+        found = regressions(current, baseline, args.speed_tol if args.check_timing else None, args.memory_tol,
+                            args.min_samples)
+        for line in found:
+            print(f"REGRESJA: {line}")
+        if found:
+            sys.exit(1)
+        print(f"Brak regresji względem {args.baseline}" + ("" if args.check_timing else " (bez czasów, --check-timing)"))
@@ -1,9 +1,13 @@
 import streamlit as st
-import json
+import math
 import random
-import re
 import time
+import uuid
 from pathlib import Path
+from typing import NamedTuple
+
+from bank import Bank, Library, Question
+from store import Store
 
 # Konfiguracja strony
 st.set_page_config(
@@ -12,67 +16,117 @@ st.set_page_config(
     layout="centered"
 )
 
-# --- FUNKCJA DO ŁADOWANIA LOKALNEGO CSS ---
-def local_css(file_name):
-    try:
-        with open(file_name) as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-    except FileNotFoundError:
-        st.warning(f"Plik {file_name} nie został znaleziony. Aplikacja będzie działać ze standardowymi stylami.")
+# Pliki aplikacji względem main.py, niezależnie od katalogu uruchomienia
+APP_DIR = Path(__file__).resolve().parent
 
-# Wywołanie funkcji, aby załadować style z pliku style.css
-local_css("style.css")
+# --- Pytania, quizy i style (wczytane raz na proces, przeładowywane przez watchdog) ---
 
+@st.cache_resource
+def library() -> Library:
+    """Jedna biblioteka na proces serwera, wspólna dla wszystkich sesji."""
+    lib = Library(APP_DIR / "questions", APP_DIR / "style.css")
+    lib.start_watching()
+    return lib
 
-# --- Funkcje pomocnicze ---
 
-@st.cache_data
-def load_data(file_path: str) -> list:
-    """Wczytuje i czyści dane pytań z pliku JSON."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        for item in data:
-            if isinstance(item.get('correct_answer'), str):
-                item['correct_answer'] = clean_text(item['correct_answer'])
-            elif isinstance(item.get('correct_answer'), list):
-                item['correct_answer'] = [clean_text(ans) for ans in item['correct_answer']]
-            
-            if isinstance(item.get('options'), dict):
-                cleaned_options = {}
-                for key, value in item['options'].items():
-                   cleaned_options[key] = clean_text(value)
-                item['options'] = cleaned_options
-        return data
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        st.error(f"Błąd wczytywania pliku {file_path}: {e}")
-        return []
-
-def find_quizzes(data_dir="questions"):
-    """Skanuje folder 'data' i zwraca słownik z nazwami quizów i ścieżkami do plików."""
-    data_path = Path(data_dir)
-    if not data_path.is_dir():
-        return {}
-    quiz_files = list(data_path.glob("*.json"))
-    # Tworzy mapowanie: przyjazna nazwa -> pełna ścieżka
-    return {file.stem.replace("_", " ").capitalize(): file for file in quiz_files}
-
-def clean_text(text: str) -> str:
-    """Usuwa niechciane znaki i białe znaki z tekstu."""
-    return re.sub(r'[✓X]|\s+$', '', text).strip()
+@st.cache_resource
+def store() -> Store:
+    """Zapis podejść i statystyk pytań (SQLite, wątek zapisujący w tle)."""
+    return Store(str(APP_DIR / "wyniki.db"))
+
+
+def stats_caption(stats: tuple | None) -> str:
+    if not stats:
+        return "Brak zapisanych odpowiedzi na to pytanie."
+    answered, correct = stats
+    return f"Wszyscy: {correct}/{answered} poprawnie ({100 * correct / answered:.0f}%)"
+
+
+def admin_summary(quiz_path) -> None:
+    """Statystyki quizu z liczników (bez przeglądania wszystkich podejść)."""
+    quiz = quiz_path.stem
+    started, finished, score_sum, total_sum = store().quiz_stats(quiz)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Rozpoczęte podejścia", started)
+    col2.metric("Ukończone", finished)
+    col3.metric("Średni wynik", f"{100 * score_sum / total_sum:.2f}%" if total_sum else "-")
+    question_stats = store().question_stats(quiz)
+    rows = []
+    for question in library().bank(quiz_path).questions:
+        answered, correct = question_stats.get(question.id, (0, 0))
+        rows.append({
+            "Pytanie": question.question,
+            "Odpowiedzi": answered,
+            "Poprawne": correct,
+            "Poprawne [%]": round(100 * correct / answered, 1) if answered else None,
+        })
+    # najtrudniejsze pytania na górze
+    rows.sort(key=lambda row: (row["Poprawne [%]"] is None, row["Poprawne [%]"] or 0))
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    if store().pending:
+        st.caption(f"{store().pending} zdarzeń czeka na zapis.")
+    if store().error:
+        st.error(f"Błąd zapisu wyników (zapis będzie ponowiony): {store().error}")
+    if store().lost:
+        st.error(f"Utracone zdarzenia: {store().lost}")
+
+
+class AnswerRecord(NamedTuple):
+    """Odpowiedź w historii sesji: id pytania i indeksy wybranych opcji."""
+    question_id: str
+    answer: tuple
+    is_correct: bool
+
+
+def current_bank() -> Bank:
+    return library().bank(st.session_state.current_quiz_path)
+
+
+def option_texts(question: Question, answer: tuple):
+    """Teksty wybranych opcji (lista dla wielokrotnego wyboru, jak w poprawnej odpowiedzi)."""
+    texts = [question.options[i] for i in answer if i < len(question.options)]
+    return texts if question.is_multi else (texts[0] if texts else "")
+
+
+def shuffled_option_order(question: Question) -> tuple:
+    order = list(range(len(question.options)))
+    random.shuffle(order)
+    return tuple(order)
+
+
+def current_question() -> Question | None:
+    """Bieżące pytanie sesji (None, jeśli zniknęło z przeładowanego banku)."""
+    question_id = st.session_state.question_indices[st.session_state.current_q_index_ptr]
+    return current_bank().by_id.get(question_id)
+
+
+# Style z pamięci biblioteki (bez czytania pliku przy każdym przebiegu)
+if library().css is not None:
+    st.markdown(f"<style>{library().css}</style>", unsafe_allow_html=True)
+else:
+    st.warning("Plik style.css nie został znaleziony. Aplikacja będzie działać ze standardowymi stylami.")
 
 def initialize_quiz(quiz_file_path):
-    """Inicjalizuje lub resetuje stan quizu w sesji na podstawie wybranego pliku."""
-    questions = load_data(quiz_file_path)
+    """Inicjalizuje lub resetuje stan quizu w sesji na podstawie wybranego pliku.
+
+    Sesja trzyma tylko permutację id pytań, kolejność opcji bieżącego pytania
+    i krótkie rekordy odpowiedzi; teksty są w banku wspólnym dla procesu.
+    """
+    questions = library().bank(quiz_file_path).questions
     
-    st.session_state.questions = questions
+    st.session_state.current_quiz_path = quiz_file_path
     st.session_state.total_questions = len(questions)
     
-    question_indices = list(range(st.session_state.total_questions))
+    question_indices = [question.id for question in questions]
     random.shuffle(question_indices)
-    st.session_state.question_indices = question_indices
+    st.session_state.question_indices = tuple(question_indices)
+    st.session_state.bank_digest = current_bank().digest
+    st.session_state.option_order = shuffled_option_order(current_bank().by_id[question_indices[0]]) if questions else ()
     
+    st.session_state.attempt_id = uuid.uuid4().hex
+    st.session_state.attempt_saved = False
+    store().start_attempt(st.session_state.attempt_id, quiz_file_path.stem, len(questions))
+
     st.session_state.current_q_index_ptr = 0
     st.session_state.score = 0
     st.session_state.quiz_history = []
@@ -80,6 +134,27 @@ def initialize_quiz(quiz_file_path):
     st.session_state.quiz_started = True
     st.session_state.checkbox_states = {}
     st.session_state.timer_stopped = False
+    st.session_state.advance_at = None
+
+def sync_with_bank():
+    """Po przeładowaniu banku usuwa z dalszej części testu pytania, których
+    już nie ma, i przelicza total_questions z pozostałych id."""
+    bank = current_bank()
+    if bank.digest == st.session_state.bank_digest:
+        return
+    st.session_state.bank_digest = bank.digest
+    indices = st.session_state.question_indices
+    ptr = st.session_state.current_q_index_ptr
+    # pytanie z udzieloną odpowiedzią zostaje do końca ekranu z wynikiem
+    keep = ptr + 1 if st.session_state.answer_submitted else ptr
+    ahead = tuple(qid for qid in indices[keep:] if qid in bank.by_id)
+    changed = indices[keep:keep + 1] != ahead[:1]
+    st.session_state.question_indices = indices[:keep] + ahead
+    st.session_state.total_questions = len(st.session_state.question_indices)
+    if changed and not st.session_state.answer_submitted and ahead:
+        # bieżące pytanie zniknęło: nowe pytanie dostaje własną kolejność opcji
+        st.session_state.option_order = shuffled_option_order(bank.by_id[ahead[0]])
+        st.session_state.checkbox_states = {}
 
 def reset_quiz():
     """Całkowicie resetuje quiz, usuwając stan sesji, wracając do ekranu wyboru."""
@@ -90,9 +165,26 @@ def reset_quiz():
 def go_to_next_question():
     """Przechodzi do następnego pytania i resetuje stany."""
     st.session_state.current_q_index_ptr += 1
+    if st.session_state.current_q_index_ptr < st.session_state.total_questions:
+        question = current_question()
+        st.session_state.option_order = shuffled_option_order(question) if question is not None else ()
     st.session_state.answer_submitted = False
     st.session_state.checkbox_states = {}
     st.session_state.timer_stopped = False
+    st.session_state.advance_at = None
+
+@st.fragment(run_every=1)
+def countdown():
+    """Odliczanie do automatycznego przejścia.
+
+    Fragment odświeża się co sekundę po stronie serwera tylko na czas
+    krótkiego przebiegu, więc wątek skryptu nie jest blokowany przez sleep.
+    """
+    remaining = math.ceil(st.session_state.advance_at - time.time())
+    if remaining <= 0:
+        go_to_next_question()
+        st.rerun()
+    st.markdown(f"### Automatyczne przejście za **{remaining}** s...")
 
 
 # --- Główna logika aplikacji ---
@@ -113,11 +205,15 @@ if st.session_state.quiz_started:
             initialize_quiz(current_quiz_path)
             st.rerun()
 
+    sync_with_bank()
+
 # --- Ekran startowy i wybór quizu ---
 if not st.session_state.quiz_started:
     st.header("Wybierz quiz do rozwiązania")
     
-    quiz_map = find_quizzes()
+    quiz_map = library().quizzes
+    for path, error in library().errors.items():
+        st.error(f"Błąd wczytywania pliku {path}: {error}")
     
     if not quiz_map:
         st.error("Nie znaleziono żadnych plików .json w folderze 'data'. Upewnij się, że folder istnieje i zawiera pliki z quizami.")
@@ -135,14 +231,22 @@ if not st.session_state.quiz_started:
             initialize_quiz(selected_path)
             st.rerun()
 
+        if st.sidebar.checkbox("Statystyki pytań (admin)"):
+            st.write("---")
+            st.subheader(f"Statystyki: {selected_quiz_name}")
+            admin_summary(quiz_map[selected_quiz_name])
+
 # --- Przebieg Quizu ---
 elif st.session_state.current_q_index_ptr < st.session_state.total_questions:
     
-    question_idx = st.session_state.question_indices[st.session_state.current_q_index_ptr]
-    question_data = st.session_state.questions[question_idx]
-    question_text = question_data["question"]
-    options = question_data.get("options", {})
-    correct_answer = question_data["correct_answer"]
+    question_data = current_question()
+    if question_data is None:
+        # pytanie usunięte lub zmienione w pliku w trakcie testu
+        go_to_next_question()
+        st.rerun()
+    question_text = question_data.question
+    options = question_data.options
+    correct_answer = question_data.correct_answer
 
     progress = (st.session_state.current_q_index_ptr) / st.session_state.total_questions
     st.progress(progress, text=f"Pytanie {st.session_state.current_q_index_ptr + 1} z {st.session_state.total_questions}")
@@ -155,19 +259,20 @@ elif st.session_state.current_q_index_ptr < st.session_state.total_questions:
     if st.session_state.answer_submitted:
         last_result = st.session_state.quiz_history[-1]
         
-        if isinstance(last_result['correct_answer'], list):
-            correct_answer_display = "\n" + "\n".join([f"- {ans}" for ans in last_result['correct_answer']])
+        if isinstance(correct_answer, tuple):
+            correct_answer_display = "\n" + "\n".join([f"- {ans}" for ans in correct_answer])
             correct_answer_heading = "**Poprawne odpowiedzi:**"
         else:
-            correct_answer_display = f"**{last_result['correct_answer']}**"
+            correct_answer_display = f"**{correct_answer}**"
             correct_answer_heading = "**Poprawna odpowiedź to:**"
         
-        if last_result['is_correct']:
+        if last_result.is_correct:
             feedback_message = f"✅ Dobrze! {correct_answer_heading}{correct_answer_display}"
             st.success(feedback_message)
             countdown_duration = 2
         else:
-            user_answer_str = ", ".join(last_result['user_answer']) if isinstance(last_result['user_answer'], list) else last_result['user_answer']
+            user_answer = option_texts(question_data, last_result.answer)
+            user_answer_str = ", ".join(user_answer) if isinstance(user_answer, list) else user_answer
             feedback_message = f"❌ Niestety, źle. Twoja odpowiedź: **{user_answer_str}**. {correct_answer_heading}{correct_answer_display}"
             st.error(feedback_message)
             countdown_duration = 5
@@ -180,71 +285,60 @@ elif st.session_state.current_q_index_ptr < st.session_state.total_questions:
                 go_to_next_question()
                 st.rerun()
         else:
-            placeholder = st.empty()
+            if st.session_state.get('advance_at') is None:
+                st.session_state.advance_at = time.time() + countdown_duration
+            countdown()
             
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("Przejdź natychmiast", use_container_width=True):
                     go_to_next_question()
                     st.rerun()
-            if not last_result['is_correct']:
+            if not last_result.is_correct:
                 with col2:
                     if st.button("Zatrzymaj timer", use_container_width=True):
                         st.session_state.timer_stopped = True
                         st.rerun()
 
-            for i in range(countdown_duration, 0, -1):
-                placeholder.markdown(f"### Automatyczne przejście za **{i}** s...")
-                time.sleep(1)
-            
-            go_to_next_question()
-            st.rerun()
-
     # Jeśli odpowiedź nie została udzielona, pokaż opcje
     else:
-        is_multi_select = "Wybierz wszystkie poprawne" in question_text
+        is_multi_select = question_data.is_multi
 
-        # <<< POCZĄTEK ZMIANY: LOSOWANIE ODPOWIEDZI >>>
-        shuffled_options = list(options.values())
-        random.shuffle(shuffled_options)
-        # <<< KONIEC ZMIANY >>>
+        # kolejność opcji wylosowana przy przejściu do pytania (st.session_state.option_order)
+        shuffled_options = st.session_state.option_order
 
         if is_multi_select:
             st.markdown("Wybierz jedną lub więcej odpowiedzi i kliknij 'Sprawdź'.")
             user_answers = []
-            for option_text in shuffled_options: # Używamy przetasowanej listy
+            for option_idx in shuffled_options: # Używamy przetasowanej listy
+                option_text = options[option_idx]
                 if st.checkbox(option_text, key=f"q{st.session_state.current_q_index_ptr}_{option_text}"):
-                    user_answers.append(option_text)
+                    user_answers.append(option_idx)
             
             if st.button("Sprawdź odpowiedzi", use_container_width=True, type="primary"):
-                is_correct = set(user_answers) == set(correct_answer)
+                is_correct = {options[i] for i in user_answers} == set(correct_answer)
                 if is_correct:
                     st.session_state.score += 1
                 
-                st.session_state.quiz_history.append({
-                    "question": question_text,
-                    "user_answer": user_answers,
-                    "correct_answer": correct_answer,
-                    "is_correct": is_correct
-                })
+                st.session_state.quiz_history.append(AnswerRecord(question_data.id, tuple(user_answers), is_correct))
+                store().record_answer(st.session_state.attempt_id, st.session_state.current_quiz_path.stem,
+                                      question_data.id, [options[i] for i in user_answers], is_correct)
                 st.session_state.answer_submitted = True
                 st.rerun()
         else:
             st.markdown("Wybierz jedną odpowiedź:")
             cols = st.columns(2)
             col_idx = 0
-            for option_text in shuffled_options: # Używamy przetasowanej listy
+            for option_idx in shuffled_options: # Używamy przetasowanej listy
+                option_text = options[option_idx]
                 if cols[col_idx].button(option_text, key=f"q{st.session_state.current_q_index_ptr}_{option_text}", use_container_width=True):
                     is_correct = (option_text == correct_answer)
                     if is_correct:
                         st.session_state.score += 1
 
-                    st.session_state.quiz_history.append({
-                        "question": question_text,
-                        "user_answer": option_text,
-                        "correct_answer": correct_answer,
-                        "is_correct": is_correct
-                    })
+                    st.session_state.quiz_history.append(AnswerRecord(question_data.id, (option_idx,), is_correct))
+                    store().record_answer(st.session_state.attempt_id, st.session_state.current_quiz_path.stem,
+                                          question_data.id, [option_text], is_correct)
                     st.session_state.answer_submitted = True
                     st.rerun()
                 col_idx = (col_idx + 1) % 2
@@ -257,28 +351,43 @@ else:
     score = st.session_state.score
     total = st.session_state.total_questions
     percentage = (score / total * 100) if total > 0 else 0
+    quiz = st.session_state.current_quiz_path.stem
+    if not st.session_state.attempt_saved:
+        store().finish_attempt(st.session_state.attempt_id, quiz, score, total)
+        st.session_state.attempt_saved = True
     
     st.subheader("Podsumowanie wyników:")
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     col1.metric("Twój wynik", f"{score}/{total}")
     col2.metric("Procentowo", f"{percentage:.2f}%")
+    _, finished, score_sum, total_sum = store().quiz_stats(quiz)
+    if total_sum:
+        col3.metric("Średnia wszystkich", f"{100 * score_sum / total_sum:.2f}%", help=f"{finished} ukończonych podejść")
     
     st.write("---")
     
     st.subheader("Szczegółowa analiza odpowiedzi:")
+    bank = current_bank()
+    question_stats = store().question_stats(quiz)
     for i, result in enumerate(st.session_state.quiz_history):
-        icon = "✅" if result["is_correct"] else "❌"
-        with st.expander(f"{icon} Pytanie {i+1} - {'Poprawnie' if result['is_correct'] else 'Błędnie'}", expanded=not result["is_correct"]):
-            st.markdown(f"**Pytanie:** {result['question']}")
+        question = bank.by_id.get(result.question_id)
+        if question is None:
+            st.caption(f"Pytanie {i+1} zostało usunięte z banku pytań.")
+            continue
+        icon = "✅" if result.is_correct else "❌"
+        with st.expander(f"{icon} Pytanie {i+1} - {'Poprawnie' if result.is_correct else 'Błędnie'}", expanded=not result.is_correct):
+            st.markdown(f"**Pytanie:** {question.question}")
             
-            user_answer_str = ", ".join(result['user_answer']) if isinstance(result['user_answer'], list) else result['user_answer']
+            user_answer = option_texts(question, result.answer)
+            user_answer_str = ", ".join(user_answer) if isinstance(user_answer, list) else user_answer
             st.info(f"**Twoja odpowiedź:** {user_answer_str}")
             
-            if isinstance(result['correct_answer'], list):
-                formatted_answers = "\n".join([f"- {ans}" for ans in result['correct_answer']])
+            if isinstance(question.correct_answer, tuple):
+                formatted_answers = "\n".join([f"- {ans}" for ans in question.correct_answer])
                 st.success(f"**Poprawne odpowiedzi:**\n{formatted_answers}")
             else:
-                st.success(f"**Poprawna odpowiedź:** {result['correct_answer']}")
+                st.success(f"**Poprawna odpowiedź:** {question.correct_answer}")
+            st.caption(stats_caption(question_stats.get(question.id)))
 
     st.write("---")
     if st.button("Zagraj w ten quiz jeszcze raz!", type="primary", use_container_width=True):
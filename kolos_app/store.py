@@ -0,0 +1,221 @@
+"""Quiz attempts and per-question statistics in a local SQLite file.
+
+Sessions only put events on a queue (start_attempt, record_answer,
+finish_attempt), so a rerun never waits for the disk. One writer thread
+takes up to batch_size events (or whatever arrived within flush_interval),
+inserts them in a single transaction and in the same transaction adds the
+batch totals to question_stats / quiz_stats. The totals are also kept in
+memory, so the end screen and the admin view read counters instead of
+scanning the raw attempts and answers tables.
+
+A batch whose transaction fails is rolled back and kept: it is written
+again together with the next batch (retried every flush_interval when
+nothing new arrives). At most MAX_RETAINED events are kept, the oldest are
+dropped beyond that and counted in lost.
+"""
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id TEXT PRIMARY KEY, quiz TEXT NOT NULL, total INTEGER NOT NULL,
+    started REAL NOT NULL, finished REAL, score INTEGER
+);
+CREATE TABLE IF NOT EXISTS answers (
+    attempt_id TEXT NOT NULL, question_id TEXT NOT NULL, answer TEXT NOT NULL,
+    is_correct INTEGER NOT NULL, answered REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS question_stats (
+    quiz TEXT NOT NULL, question_id TEXT NOT NULL,
+    answered INTEGER NOT NULL, correct INTEGER NOT NULL,
+    PRIMARY KEY (quiz, question_id)
+);
+CREATE TABLE IF NOT EXISTS quiz_stats (
+    quiz TEXT PRIMARY KEY, started INTEGER NOT NULL, finished INTEGER NOT NULL,
+    score INTEGER NOT NULL, total INTEGER NOT NULL
+);
+"""
+
+_STOP = object()
+# najwięcej zdarzeń trzymanych do ponownego zapisu, gdy baza nie przyjmuje zapisów
+MAX_RETAINED = 100_000
+
+
+class Store:
+    def __init__(self, path: str = "wyniki.db", batch_size: int = 64, flush_interval: float = 0.5) -> None:
+        self.path: str = path
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.error: str | None = None  # błąd ostatniego zapisu (None po udanym zapisie)
+        self.batches: int = 0
+        self.written: int = 0
+        self.lost: int = 0  # zdarzenia porzucone (ponad MAX_RETAINED lub przy zamknięciu)
+        self._retained: int = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        # quiz -> {question_id: [answered, correct]}, quiz -> [started, finished, score, total]
+        self._question_stats: dict[str, dict[str, list[int]]] = {}
+        self._quiz_stats: dict[str, list[int]] = {}
+
+        conn = self._connect()
+        for quiz, question_id, answered, correct in conn.execute("SELECT * FROM question_stats"):
+            self._question_stats.setdefault(quiz, {})[question_id] = [answered, correct]
+        for quiz, *counts in conn.execute("SELECT * FROM quiz_stats"):
+            self._quiz_stats[quiz] = counts
+        conn.close()
+
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    # --- zdarzenia z sesji (bez czekania na dysk) ---
+
+    def start_attempt(self, attempt_id: str, quiz: str, total: int) -> None:
+        self._queue.put(("start", attempt_id, quiz, total, time.time()))
+
+    def record_answer(self, attempt_id: str, quiz: str, question_id: str, answer: list, is_correct: bool) -> None:
+        self._queue.put(("answer", attempt_id, quiz, question_id, json.dumps(answer, ensure_ascii=False),
+                         int(is_correct), time.time()))
+
+    def finish_attempt(self, attempt_id: str, quiz: str, score: int, total: int) -> None:
+        self._queue.put(("finish", attempt_id, quiz, score, total, time.time()))
+
+    # --- statystyki z pamięci ---
+
+    def question_stats(self, quiz: str) -> dict[str, tuple[int, int]]:
+        """question_id -> (answered, correct), as of the last written batch."""
+        with self._lock:
+            return {qid: tuple(counts) for qid, counts in self._question_stats.get(quiz, {}).items()}
+
+    def quiz_stats(self, quiz: str) -> tuple[int, int, int, int]:
+        """(started, finished, score sum, question sum of finished attempts)."""
+        with self._lock:
+            return tuple(self._quiz_stats.get(quiz, (0, 0, 0, 0)))
+
+    @property
+    def pending(self) -> int:
+        """Events not written yet: queued plus kept from a failed batch."""
+        return self._queue.qsize() + self._retained
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far is written (for tests and shutdown);
+        False when it is not written within timeout."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    # --- wątek zapisu ---
+
+    def _writer(self) -> None:
+        conn = self._connect()
+        retry: list = []  # zdarzenia z nieudanej partii, zapisywane razem z następną
+        waiting: list[threading.Event] = []
+        stop = False
+        while not stop:
+            try:
+                # przy zaległej partii ponawiamy zapis także bez nowych zdarzeń
+                batch = [self._queue.get(timeout=self.flush_interval if retry else None)]
+            except queue.Empty:
+                batch = []
+            deadline = time.monotonic() + self.flush_interval
+            # zbieramy partię; flush() i close() kończą ją od razu
+            while batch and len(batch) < self.batch_size and isinstance(batch[-1], tuple):
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            events = retry
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiting.append(item)
+                else:
+                    events.append(item)
+            retry = []
+            failed = bool(events) and not self._write(conn, events)
+            if failed and stop:
+                self.lost += len(events)
+            elif failed:
+                retry = events[-MAX_RETAINED:]
+                self.lost += len(events) - len(retry)
+            self._retained = len(retry)
+            # flush() wraca dopiero, gdy wcześniejsze zdarzenia są w bazie
+            if not failed:
+                for done in waiting:
+                    done.set()
+                waiting = []
+        conn.close()
+
+    def _write(self, conn: sqlite3.Connection, events: list) -> bool:
+        """One transaction for the batch; False (and error set) when it was rolled back."""
+        answered: Counter = Counter()
+        correct: Counter = Counter()
+        quiz_delta: dict[str, list[int]] = {}
+        starts, answers, finishes = [], [], []
+        for kind, attempt_id, quiz, *rest in events:
+            delta = quiz_delta.setdefault(quiz, [0, 0, 0, 0])
+            if kind == "start":
+                total, started = rest
+                starts.append((attempt_id, quiz, total, started))
+                delta[0] += 1
+            elif kind == "answer":
+                question_id, answer, is_correct, at = rest
+                answers.append((attempt_id, question_id, answer, is_correct, at))
+                answered[quiz, question_id] += 1
+                correct[quiz, question_id] += is_correct
+            else:
+                score, total, finished = rest
+                finishes.append((finished, score, attempt_id))
+                delta[1] += 1
+                delta[2] += score
+                delta[3] += total
+        try:
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO attempts (id, quiz, total, started) VALUES (?, ?, ?, ?)", starts)
+                conn.executemany("INSERT INTO answers VALUES (?, ?, ?, ?, ?)", answers)
+                conn.executemany("UPDATE attempts SET finished = ?, score = ? WHERE id = ?", finishes)
+                conn.executemany(
+                    "INSERT INTO question_stats VALUES (?, ?, ?, ?) ON CONFLICT (quiz, question_id) DO UPDATE SET "
+                    "answered = answered + excluded.answered, correct = correct + excluded.correct",
+                    [(quiz, qid, n, correct[quiz, qid]) for (quiz, qid), n in answered.items()],
+                )
+                conn.executemany(
+                    "INSERT INTO quiz_stats VALUES (?, ?, ?, ?, ?) ON CONFLICT (quiz) DO UPDATE SET "
+                    "started = started + excluded.started, finished = finished + excluded.finished, "
+                    "score = score + excluded.score, total = total + excluded.total",
+                    [(quiz, *delta) for quiz, delta in quiz_delta.items()],
+                )
+        except sqlite3.Error as e:
+            self.error = f"{type(e).__name__}: {e}"
+            return False
+        self.error = None
+        with self._lock:
+            for (quiz, qid), n in answered.items():
+                counts = self._question_stats.setdefault(quiz, {}).setdefault(qid, [0, 0])
+                counts[0] += n
+                counts[1] += correct[quiz, qid]
+            for quiz, delta in quiz_delta.items():
+                counts = self._quiz_stats.setdefault(quiz, [0, 0, 0, 0])
+                for i, d in enumerate(delta):
+                    counts[i] += d
+        self.batches += 1
+        self.written += len(events)
+        return True
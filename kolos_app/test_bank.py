@@ -0,0 +1,209 @@
+"""Library reloads (mtime and hash, bad files, watchdog renames) and the
+re-sync of a quiz in progress after its bank changed.
+
+    python -m pytest kolos_app
+"""
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+from bank import Library, question_id
+
+APP_DIR = Path(__file__).resolve().parent
+
+
+def questions(n: int, prefix: str = "Pytanie") -> list[dict]:
+    return [
+        {"question": f"{prefix} {i}", "options": {"a": f"tak {i}", "b": f"nie {i}"}, "correct_answer": f"tak {i}"}
+        for i in range(n)
+    ]
+
+
+def write(path: Path, items: list[dict] | str) -> None:
+    """Write a bank and move its mtime forward, so every write is a new mtime."""
+    path.write_text(items if isinstance(items, str) else json.dumps(items, ensure_ascii=False), encoding="utf-8")
+    mtime = path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+@pytest.fixture
+def app_dir(tmp_path: Path) -> Path:
+    (tmp_path / "questions").mkdir()
+    write(tmp_path / "questions" / "quiz.json", questions(4))
+    (tmp_path / "style.css").write_text("h1 {}", encoding="utf-8")
+    return tmp_path
+
+
+def library(app_dir: Path) -> Library:
+    return Library(app_dir / "questions", app_dir / "style.css")
+
+
+def test_reload_needs_new_mtime_and_content(app_dir):
+    lib = library(app_dir)
+    path = app_dir / "questions" / "quiz.json"
+    bank = lib.bank(lib.quizzes["Quiz"])
+    assert len(bank) == 4
+    reloads = lib.reloads
+
+    # nowy mtime, ta sama treść: bank bez zmian, zapamiętany nowy mtime
+    write(path, path.read_text(encoding="utf-8"))
+    lib.file_changed(str(path))
+    assert lib.bank(path) is bank
+    assert bank.mtime_ns == path.stat().st_mtime_ns
+    assert lib.reloads == reloads
+
+    write(path, questions(6))
+    lib.file_changed(str(path))
+    assert len(lib.bank(path)) == 6
+    assert lib.reloads == reloads + 1
+
+
+def test_bad_file_keeps_last_good_bank(app_dir):
+    lib = library(app_dir)
+    path = app_dir / "questions" / "quiz.json"
+    bank = lib.bank(path)
+
+    write(path, "[{\"question\": ")
+    lib.file_changed(str(path))
+    assert lib.bank(path) is bank
+    assert "JSONDecodeError" in lib.errors[path]
+
+    write(path, questions(2))
+    lib.file_changed(str(path))
+    assert len(lib.bank(path)) == 2
+    assert path not in lib.errors
+
+
+def test_new_bad_file_is_reported_not_listed(app_dir):
+    write(app_dir / "questions" / "zepsuty.json", "nie json")
+    lib = library(app_dir)
+    assert list(lib.quizzes) == ["Quiz"]
+    assert app_dir / "questions" / "zepsuty.json" in lib.errors
+
+
+def test_ids_survive_reordering(app_dir):
+    lib = library(app_dir)
+    path = app_dir / "questions" / "quiz.json"
+    ids = {q.question: q.id for q in lib.bank(path).questions}
+    write(path, questions(4)[::-1])
+    lib.file_changed(str(path))
+    assert {q.question: q.id for q in lib.bank(path).questions} == ids
+
+
+def test_watchdog_renames_and_css(app_dir):
+    pytest.importorskip("watchdog")
+    lib = library(app_dir)
+    assert lib.start_watching()
+    folder = app_dir / "questions"
+    try:
+        # zapis atomowy edytora: plik tymczasowy przeniesiony na nazwę banku (dest_path)
+        write(app_dir / "quiz.tmp", questions(7))
+        os.replace(app_dir / "quiz.tmp", folder / "quiz.json")
+        assert wait_for(lambda: len(lib.bank(folder / "quiz.json")) == 7)
+
+        # zmiana nazwy w folderze: stary quiz znika, nowy się pojawia
+        os.replace(folder / "quiz.json", folder / "nowy_quiz.json")
+        assert wait_for(lambda: list(lib.quizzes) == ["Nowy quiz"])
+
+        # przeniesienie poza folder usuwa quiz
+        os.replace(folder / "nowy_quiz.json", app_dir / "archiwum.json")
+        assert wait_for(lambda: not lib.quizzes)
+
+        # CSS podmieniony atomowo, potem zwykły zapis do nowego pliku
+        (app_dir / "style.tmp").write_text("h2 {}", encoding="utf-8")
+        os.replace(app_dir / "style.tmp", app_dir / "style.css")
+        assert wait_for(lambda: lib.css == "h2 {}")
+        (app_dir / "style.css").write_text("h3 {}", encoding="utf-8")
+        assert wait_for(lambda: lib.css == "h3 {}")
+
+        # zapisy obok aplikacji (baza wyników) nie docierają do biblioteki
+        reloads = lib.reloads
+        calls = []
+        lib.file_changed = calls.append
+        (app_dir / "wyniki.db").write_bytes(b"x")
+        time.sleep(0.3)
+        assert calls == []
+        assert lib.reloads == reloads
+    finally:
+        lib.stop_watching()
+
+
+@pytest.fixture
+def app(app_dir):
+    """AppTest of a copy of main.py in app_dir (the app keeps its files next to main.py)."""
+    streamlit = pytest.importorskip("streamlit")
+    from streamlit.testing.v1 import AppTest
+
+    for name in ("main.py", "bank.py", "store.py"):
+        shutil.copy(APP_DIR / name, app_dir)
+    # biblioteka i baza są zasobami procesu; każda aplikacja testowa dostaje własne
+    streamlit.cache_resource.clear()
+    at = AppTest.from_file(str(app_dir / "main.py"), default_timeout=30)
+    at.run()
+    [b for b in at.button if b.label.startswith("Rozpocznij")][0].click().run()
+    assert not at.exception
+    yield at
+    streamlit.cache_resource.clear()
+
+
+def rerun_until(at, condition) -> bool:
+    return wait_for(lambda: at.run() is not None and condition(), timeout=5.0)
+
+
+def test_quiz_in_progress_follows_removed_questions(app, app_dir):
+    path = app_dir / "questions" / "quiz.json"
+    order = app.session_state["question_indices"]
+    assert app.session_state["total_questions"] == 4
+
+    # usunięte: bieżące pytanie i jedno dalsze
+    items = questions(4)
+    ids = [question_id(item["question"], {}) for item in items]
+    removed = {order[0], order[2]}
+    write(path, [item for item, qid in zip(items, ids) if qid not in removed])
+
+    assert rerun_until(app, lambda: app.session_state["total_questions"] == 2)
+    assert not app.exception
+    assert app.session_state["question_indices"] == (order[1], order[3])
+    assert app.session_state["current_q_index_ptr"] == 0
+    assert app.session_state["bank_digest"] != ""
+    assert "z 2" in app.get("progress")[0].proto.text
+
+
+def test_quiz_in_progress_ignores_added_questions(app, app_dir):
+    path = app_dir / "questions" / "quiz.json"
+    order = app.session_state["question_indices"]
+    digest = app.session_state["bank_digest"]
+
+    write(path, questions(4) + questions(3, prefix="Nowe pytanie"))
+    assert rerun_until(app, lambda: app.session_state["bank_digest"] != digest)
+    assert not app.exception
+    # podejście obejmuje pytania z chwili startu, nowe pytania są dla kolejnych podejść
+    assert app.session_state["question_indices"] == order
+    assert app.session_state["total_questions"] == 4
+
+
+def test_answered_question_stays_after_removal(app, app_dir):
+    path = app_dir / "questions" / "quiz.json"
+    order = app.session_state["question_indices"]
+    [b for b in app.button if b.key and b.key.startswith("q")][0].click().run()
+    assert app.session_state["answer_submitted"]
+
+    items = questions(4)
+    ids = [question_id(item["question"], {}) for item in items]
+    write(path, [item for item, qid in zip(items, ids) if qid not in (order[0], order[1])])
+
+    assert rerun_until(app, lambda: app.session_state["total_questions"] == 3)
+    # pytanie z odpowiedzią zostaje, usunięte zostaje tylko dalsze
+    assert app.session_state["question_indices"] == (order[0], order[2], order[3])
@@ -0,0 +1,183 @@
+"""Store batching, retry of a failed batch, counters against the database,
+shutdown, and the database file of the app.
+
+    python -m pytest kolos_app
+"""
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+from store import SCHEMA, Store
+
+APP_DIR = Path(__file__).resolve().parent
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def play(store: Store, attempt_id: str, quiz: str, answers: list[tuple[str, bool]], finish: bool = True) -> None:
+    """One attempt: start, the answers (question_id, is_correct), finish."""
+    store.start_attempt(attempt_id, quiz, len(answers))
+    for qid, ok in answers:
+        store.record_answer(attempt_id, quiz, qid, ["a"], ok)
+    if finish:
+        store.finish_attempt(attempt_id, quiz, sum(ok for _, ok in answers), len(answers))
+
+
+def db_stats(path: Path, quiz: str) -> tuple[dict, tuple]:
+    """question_stats and quiz_stats recounted from the raw attempts and answers tables."""
+    conn = sqlite3.connect(path)
+    questions = {
+        qid: (n, c) for qid, n, c in conn.execute(
+            "SELECT question_id, COUNT(*), SUM(is_correct) FROM answers JOIN attempts ON attempts.id = attempt_id "
+            "WHERE quiz = ? GROUP BY question_id", (quiz,))
+    }
+    started, finished, score, total = conn.execute(
+        "SELECT COUNT(*), COUNT(finished), COALESCE(SUM(score), 0), "
+        "COALESCE(SUM(CASE WHEN finished IS NOT NULL THEN total END), 0) FROM attempts WHERE quiz = ?", (quiz,)
+    ).fetchone()
+    conn.close()
+    return questions, (started, finished, score, total)
+
+
+@pytest.fixture
+def store(tmp_path: Path):
+    s = Store(str(tmp_path / "wyniki.db"), batch_size=4, flush_interval=0.2)
+    yield s
+    s.close()
+
+
+def test_events_are_written_in_batches(store, tmp_path):
+    play(store, "a1", "Quiz", [("q1", True), ("q2", False), ("q3", True)])
+    play(store, "a2", "Quiz", [("q1", False), ("q2", False)], finish=False)
+    assert store.flush()
+    # 8 zdarzeń po 4 w transakcji
+    assert store.written == 8
+    assert store.batches == 2
+    assert store.pending == 0
+    assert store.error is None
+
+    conn = sqlite3.connect(tmp_path / "wyniki.db")
+    assert conn.execute("SELECT COUNT(*) FROM answers").fetchone() == (5,)
+    assert conn.execute("SELECT score, total FROM attempts WHERE id = 'a1'").fetchone() == (2, 3)
+    assert conn.execute("SELECT finished FROM attempts WHERE id = 'a2'").fetchone() == (None,)
+    conn.close()
+
+
+def test_counters_match_database(store, tmp_path):
+    play(store, "a1", "Quiz", [("q1", True), ("q2", False)])
+    play(store, "a2", "Quiz", [("q1", True), ("q2", True), ("q3", False)])
+    play(store, "a3", "Quiz", [("q3", True)], finish=False)
+    play(store, "b1", "Inny", [("q1", False)])
+    assert store.flush()
+
+    for quiz in ("Quiz", "Inny"):
+        questions, totals = db_stats(tmp_path / "wyniki.db", quiz)
+        assert store.question_stats(quiz) == questions
+        assert store.quiz_stats(quiz) == totals
+    assert store.question_stats("Quiz")["q1"] == (2, 2)
+    assert store.quiz_stats("Quiz") == (3, 2, 3, 5)
+
+    # liczniki zapisane w bazie wracają po ponownym otwarciu
+    store.close()
+    again = Store(str(tmp_path / "wyniki.db"))
+    assert again.question_stats("Quiz") == store.question_stats("Quiz")
+    assert again.quiz_stats("Inny") == (1, 1, 0, 1)
+    again.close()
+
+
+def test_failed_batch_is_retried(store, tmp_path):
+    play(store, "a1", "Quiz", [("q1", True)])
+    assert store.flush()
+
+    # tabela odpowiedzi znika: kolejne partie nie przechodzą
+    conn = sqlite3.connect(tmp_path / "wyniki.db")
+    conn.execute("DROP TABLE answers")
+    conn.commit()
+    play(store, "a2", "Quiz", [("q1", False), ("q2", True)])
+    assert not store.flush(timeout=0.5)
+    assert "no such table" in store.error
+    assert store.pending == 4
+    # nieudana partia niczego nie dolicza
+    assert store.quiz_stats("Quiz") == (1, 1, 1, 1)
+    assert store.question_stats("Quiz") == {"q1": (1, 1)}
+
+    # po naprawie zaległa partia zapisuje się sama, bez nowych zdarzeń
+    conn.executescript(SCHEMA)
+    conn.close()
+    assert wait_for(lambda: store.pending == 0)
+    assert store.error is None
+    assert store.lost == 0
+    assert store.quiz_stats("Quiz") == (2, 2, 2, 3)
+    assert store.question_stats("Quiz") == {"q1": (2, 1), "q2": (1, 1)}
+    questions, totals = db_stats(tmp_path / "wyniki.db", "Quiz")
+    # odpowiedzi sprzed usunięcia tabeli przepadły razem z nią, liczniki nie
+    assert questions == {"q1": (1, 0), "q2": (1, 1)}
+    assert totals == store.quiz_stats("Quiz")
+
+
+def test_close_writes_queued_events(tmp_path):
+    # długi flush_interval: bez close() te zdarzenia czekałyby na kolejną partię
+    store = Store(str(tmp_path / "wyniki.db"), batch_size=1000, flush_interval=30)
+    play(store, "a1", "Quiz", [("q1", True), ("q2", True)])
+    store.close()
+    assert not store._thread.is_alive()
+    assert store.pending == 0
+    assert db_stats(tmp_path / "wyniki.db", "Quiz") == ({"q1": (1, 1), "q2": (1, 1)}, (1, 1, 2, 2))
+    # ponowne zamknięcie (atexit po ręcznym close) nic nie robi
+    store.close()
+
+
+def test_close_counts_unwritable_events_as_lost(store, tmp_path):
+    conn = sqlite3.connect(tmp_path / "wyniki.db")
+    conn.execute("DROP TABLE answers")
+    conn.commit()
+    conn.close()
+    play(store, "a1", "Quiz", [("q1", True)])
+    store.close()
+    assert store.lost == 3
+    assert store.written == 0
+
+
+def test_database_is_next_to_main(tmp_path, monkeypatch):
+    streamlit = pytest.importorskip("streamlit")
+    from streamlit.testing.v1 import AppTest
+
+    app_dir = tmp_path / "app"
+    app_dir.mkdir()
+    for name in ("main.py", "bank.py", "store.py", "style.css"):
+        shutil.copy(APP_DIR / name, app_dir)
+    shutil.copytree(APP_DIR / "questions", app_dir / "questions")
+    cwd = tmp_path / "inny_katalog"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+
+    streamlit.cache_resource.clear()
+    try:
+        at = AppTest.from_file(str(app_dir / "main.py"), default_timeout=30)
+        at.run()
+        [b for b in at.button if b.label.startswith("Rozpocznij")][0].click().run()
+        assert not at.exception
+    finally:
+        streamlit.cache_resource.clear()
+
+    db = app_dir / "wyniki.db"
+    assert db.exists()
+    assert not list(cwd.iterdir())
+
+    def started() -> bool:
+        conn = sqlite3.connect(db)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM attempts").fetchone()[0] == 1
+        finally:
+            conn.close()
+
+    assert wait_for(started)
@@ -1,15 +1,22 @@
 # app.py
 import streamlit as st
 import numpy as np
-from element import Element
+from element import Element, ElementBatch
 
 st.set_page_config(page_title="Solve H t + P = 0", layout="wide")
 
 st.title("📐 Visual Finite-Element Solver")
 
+# powyżej tej liczby elementów nie renderujemy pełnych macierzy w LaTeX
+FULL_RENDER_MAX_ME = 10
+# liczba punktów wykresu w trybie dużej siatki
+CHART_POINTS = 2000
+# rozmiar podglądu macierzy H w trybie dużej siatki
+PREVIEW_SIZE = 6
+
 # 1) Sidebar inputs
 st.sidebar.header("Global parameters")
-ME      = st.sidebar.number_input("Number of elements (ME)",   min_value=1, value=2, step=1)
+ME      = st.sidebar.number_input("Number of elements (ME)",   min_value=1, max_value=10**6, value=2, step=1)
 LG      = st.sidebar.number_input("Total length (LG)",         min_value=0.1, value=5.0)
 S       = st.sidebar.number_input("Area (S)",                  min_value=0.1, value=2.0)
 k       = st.sidebar.number_input("Conductivity (k)",          min_value=0.0, value=50.0)
@@ -20,39 +27,47 @@ dir_val = st.sidebar.radio("Flow direction (dir)", options=(1, -1), index=0)
 
 delta_L = LG / ME
 
+
+@st.cache_data(max_entries=8)
+def solve_bar(ME: int, LG: float, S: float, k: float, alpha: float,
+              q: float, t_sr: float, dir: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Assemble in banded form and solve; cached on all the inputs."""
+    batch = ElementBatch.uniform(ME=ME, LG=LG, S=S, k=k,
+                                 alpha=alpha, q=q, t_sr=t_sr,
+                                 dir=dir)
+    ab, P_final = batch.assemble_banded()
+    t = Element.solve_equation(ab, P_final, mode="banded")
+    return ab, P_final, t
+
+
+# helper to convert numpy → LaTeX bmatrix
+def to_latex(A: np.ndarray) -> str:
+    rows = [" & ".join(f"{v:.2f}" for v in row) for row in A]
+    body = r"\\ ".join(rows)
+    return rf"\begin{{bmatrix}}{body}\end{{bmatrix}}"
+
+
+def banded_preview(ab: np.ndarray, size: int) -> np.ndarray:
+    """Top-left size x size block of H rebuilt from its band."""
+    n = min(size, ab.shape[1])
+    block = np.diag(ab[1, :n])
+    block += np.diag(ab[0, 1:n], k=1)
+    block += np.diag(ab[2, :n - 1], k=-1)
+    return block
+
+
 if st.sidebar.button("🔢 Solve"):
-    # Sprawdzenie, czy liczba elementów przekracza limit
-    if ME > 10:
-        st.warning(
-            "Liczba elementów (ME) jest większa niż 10. "
-            "Obliczenia nie zostaną wykonane ze względu na potencjalne wysokie koszty obliczeniowe."
-        )
-    else:
-        # 2) build elements & assemble
-        MN = ME + 1
-        H_final = np.zeros((MN, MN))
-        P_final = np.zeros((MN, 1))
-        elements = []
-        for i in range(ME):
-            el = Element(length=delta_L, S=S, k=k,
-                         alpha=alpha, q=q, t_sr=t_sr,
-                         dir=dir_val,
-                         is_start=(i==0), is_end=(i==ME-1))
-            elements.append(el)
-            # assemble
-            for r in range(2):
-                for c in range(2):
-                    H_final[i+r, i+c] += el.H[r, c]
-            for r in range(2):
-                P_final[i+r, 0] += el.P[r, 0]
-
-        # 3) helper to convert numpy → LaTeX bmatrix
-        def to_latex(A: np.ndarray) -> str:
-            rows = [" & ".join(f"{v:.2f}" for v in row) for row in A]
-            body = r"\\ ".join(rows)
-            return rf"\begin{{bmatrix}}{body}\end{{bmatrix}}"
-
-        # 4) display
+    try:
+        ab, P_final, t = solve_bar(int(ME), LG, S, k, alpha, q, t_sr, dir_val)
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+
+    MN = ME + 1
+    if ME <= FULL_RENDER_MAX_ME:
+        H_final = banded_preview(ab, MN)
+
+        # display
         st.subheader("Assembled Matrices")
         col1, col2 = st.columns(2)
         with col1:
@@ -65,7 +80,39 @@ if st.sidebar.button("🔢 Solve"):
         st.markdown("**Equation to solve:**")
         st.latex(r"H\,t + P = 0")
 
-        # 5) solve and show t
-        t = Element.solve_equation(H_final, P_final)
+        # solve and show t
         st.subheader("Solution vector \(t\)")
-        st.latex(r"t = " + to_latex(t.reshape(-1,1)))
\ No newline at end of file
+        st.latex(r"t = " + to_latex(t.reshape(-1,1)))
+    else:
+        # tryb dużej siatki: wykres + statystyki zamiast pełnych macierzy
+        st.subheader("Assembled Matrices (large mesh)")
+        col1, col2 = st.columns(2)
+        with col1:
+            nnz = int(np.count_nonzero(ab))
+            st.markdown(
+                f"**\(H\)**: {MN} x {MN}, tridiagonal, "
+                f"{nnz} non-zeros ({nnz / MN**2:.2e} density)."
+            )
+            st.markdown(f"Top-left {PREVIEW_SIZE} x {PREVIEW_SIZE} block:")
+            st.latex(r"H = " + to_latex(banded_preview(ab, PREVIEW_SIZE)) + r"\cdots")
+        with col2:
+            nz = np.flatnonzero(P_final[:, 0])
+            st.markdown(f"**\(P\)**: {MN} entries, non-zero at nodes {', '.join(str(i + 1) for i in nz)}.")
+            st.latex(r"P = " + to_latex(P_final[:PREVIEW_SIZE]) + r"\vdots")
+
+        st.markdown("**Equation to solve:**")
+        st.latex(r"H\,t + P = 0")
+
+        st.subheader("Solution \(t(x)\)")
+        t_flat = t[:, 0]
+        stride = max(1, MN // CHART_POINTS)
+        x = np.linspace(0.0, LG, MN)
+        chart_idx = np.r_[np.arange(0, MN, stride), MN - 1]
+        st.line_chart({"x": x[chart_idx], "t": t_flat[chart_idx]}, x="x", y="t")
+
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("t(0)", f"{t_flat[0]:.4f}")
+        c2.metric(f"t({LG:g})", f"{t_flat[-1]:.4f}")
+        c3.metric("min t", f"{t_flat.min():.4f}")
+        c4.metric("max t", f"{t_flat.max():.4f}")
+        st.caption(f"Mean t = {t_flat.mean():.4f}, Δx = {delta_L:.3e}, chart shows every {stride}. node.")
@@ -82,11 +82,182 @@ class Element:
             print(f"{H_line}   {P_line}")
 
     @staticmethod
-    def solve_equation(H: np.ndarray, P: np.ndarray) -> np.ndarray:
-        # Ensure that H is invertible (non-singular)
-        if np.linalg.det(H) == 0:
-            raise ValueError("Matrix H is singular and cannot be inverted.")
+    def solve_equation(H: np.ndarray, P: np.ndarray, mode: str = "dense") -> np.ndarray:
+        """Solve H t + P = 0.
+
+        mode="dense": H is the full MN x MN matrix (reference path, O(n^3)).
+        mode="banded": H is the (3, MN) banded form from
+        ``ElementBatch.assemble_banded`` and is solved in O(n).
+        """
+        if mode == "banded":
+            return Element.solve_banded(H, P)
+        if mode != "dense":
+            raise ValueError(f"Unknown solver mode: {mode}")
+
+        # det over/underflows for large MN, the condition number does not
+        if 1.0 / np.linalg.cond(H) < H.shape[0] * np.finfo(float).eps:
+            raise ValueError("Matrix H is singular or ill-conditioned and cannot be inverted.")
 
         # Solve for t
         t = -np.linalg.inv(H) @ P
-        return t
\ No newline at end of file
+        return t
+
+    @staticmethod
+    def solve_banded(ab: np.ndarray, P: np.ndarray) -> np.ndarray:
+        """Thomas algorithm for tridiagonal H stored as ab (3, MN).
+
+        ab[0, 1:] is the upper diagonal, ab[1] the main diagonal and
+        ab[2, :-1] the lower diagonal (LAPACK ``solve_banded`` layout).
+        Singularity is checked on the elimination pivots.
+
+        A leading batch axis, as from ``ElementBatch.assemble_banded``
+        (ab (B, 3, MN), P (B, MN, 1)), solves B systems at once: the same
+        loop then runs over (B,) rows instead of floats. Returns (..., MN, 1).
+        """
+        ab = np.asarray(ab, dtype=float)
+        n: int = ab.shape[-1]
+        batch: tuple[int, ...] = ab.shape[:-2]
+
+        def rows(V: np.ndarray) -> list:
+            # wiersz na węzeł: liczba lub tablica (B,) dla wielu układów
+            return list(np.moveaxis(V, -1, 0).copy()) if batch else V.tolist()
+
+        c: list = rows(ab[..., 0, 1:])
+        d: list = rows(ab[..., 1, :])
+        a: list = rows(ab[..., 2, :-1])
+        b: list = rows(-np.asarray(P, dtype=float).reshape(batch + (n,)))
+
+        try:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for i in range(1, n):
+                    m = a[i - 1] / d[i - 1]
+                    d[i] -= m * c[i - 1]
+                    b[i] -= m * b[i - 1]
+        except ZeroDivisionError:
+            raise ValueError("Matrix H is singular (zero pivot).") from None
+
+        # "not >" łapie też NaN po dzieleniu przez zerowy pivot w partii
+        pivots = np.abs(np.array(d))
+        bad = ~(pivots.min(axis=0) > n * np.finfo(float).eps * pivots.max(axis=0))
+        if np.any(bad):
+            where = f" for batch rows {np.flatnonzero(bad).tolist()}" if batch else ""
+            raise ValueError(f"Matrix H is singular or ill-conditioned (pivot ratio too small){where}.")
+
+        b[-1] /= d[-1]
+        for i in range(n - 2, -1, -1):
+            b[i] = (b[i] - c[i] * b[i + 1]) / d[i]
+        return np.moveaxis(np.array(b), 0, -1).reshape(batch + (n, 1))
+
+
+class ElementBatch:
+    """Array-backed set of elements: C, H and P for all of them at once.
+
+    Row ``i`` of ``C``/``H``/``P`` holds exactly what ``Element`` number ``i``
+    would hold (same ``is_start``/``is_end`` handling of q and alpha).
+    ``length``, ``S`` and ``k`` may be given per element (arrays of size ME)
+    for non-uniform meshes and materials; alpha, q and t_sr are boundary data.
+
+    A leading batch axis stacks independent bars with the same ME: ``length``
+    of shape (B, ME) and alpha, q, t_sr, dir of shape (B,) give C (B, ME),
+    H (B, ME, 2, 2) and P (B, ME, 2).
+    """
+
+    def __init__(
+            self, length: np.ndarray, S: float | np.ndarray, k: float | np.ndarray,
+            alpha: float | np.ndarray,
+            q: float | np.ndarray,
+            t_sr: float | np.ndarray,
+            dir: int | np.ndarray = 1,
+    ) -> None:
+        self.length: np.ndarray = np.asarray(length, dtype=float)
+        self.ME: int = self.length.shape[-1]
+        self.MN: int = self.ME + 1
+        self.x: np.ndarray = np.concatenate(
+            (np.zeros(self.length.shape[:-1] + (1,)), np.cumsum(self.length, axis=-1)), axis=-1)
+        self.S: np.ndarray = np.broadcast_to(np.asarray(S, dtype=float), self.length.shape)
+        self.k: np.ndarray = np.broadcast_to(np.asarray(k, dtype=float), self.length.shape)
+        self.alpha: float | np.ndarray = alpha
+        self.q: float | np.ndarray = q
+        self.t_sr: float | np.ndarray = t_sr
+        self.dir: int | np.ndarray = dir  # 1 from left to right; -1 from right to left
+
+        self.C: np.ndarray = self._calculate_C()
+        self.H: np.ndarray = self._calculate_H()
+        self.P: np.ndarray = self._calculate_P()
+
+    @classmethod
+    def uniform(
+            cls, ME: int, LG: float, S: float, k: float,
+            alpha: float,
+            q: float,
+            t_sr: float,
+            dir: int = 1,
+    ) -> "ElementBatch":
+        return cls(np.full(ME, LG / ME), S, k, alpha, q, t_sr, dir)
+
+    @classmethod
+    def from_nodes(
+            cls, x: np.ndarray, S: float | np.ndarray, k: float | np.ndarray,
+            alpha: float,
+            q: float,
+            t_sr: float,
+            dir: int = 1,
+    ) -> "ElementBatch":
+        """Mesh from (increasing) node coordinates, starting at x[0]."""
+        x = np.asarray(x, dtype=float)
+        length = np.diff(x)
+        if np.any(length <= 0):
+            raise ValueError("Node coordinates must be strictly increasing.")
+        batch = cls(length, S, k, alpha, q, t_sr, dir)
+        batch.x = x
+        return batch
+
+    def _calculate_C(self) -> np.ndarray:
+        return self.S * self.k / self.length
+
+    def _calculate_H(self) -> np.ndarray:
+        # shape (..., ME, 2, 2); convection only on the last element
+        H = np.empty(self.C.shape + (2, 2))
+        H[..., 0, 0] = self.C
+        H[..., 0, 1] = -self.C
+        H[..., 1, 0] = -self.C
+        H[..., 1, 1] = self.C
+        conv = self.alpha * self.S[..., -1]
+        reverse = np.asarray(self.dir) == -1
+        H[..., -1, 0, 0] += np.where(reverse, conv, 0.0)
+        H[..., -1, 1, 1] += np.where(reverse, 0.0, conv)
+        return H
+
+    def _calculate_P(self) -> np.ndarray:
+        # shape (..., ME, 2); q only on the first element, t_sr only on the last
+        P = np.zeros(self.C.shape + (2,))
+        P[..., 0, 0] = self.q * self.S[..., 0]
+        P[..., -1, 1] = -self.t_sr * self.alpha * self.S[..., -1]
+        return P
+
+    def assemble(self) -> tuple[np.ndarray, np.ndarray]:
+        """Global H (..., MN, MN) and P (..., MN, 1)."""
+        batch = self.C.shape[:-1]
+        idx = np.arange(self.ME)
+        H_final = np.zeros(batch + (self.MN, self.MN))
+        H_final[..., idx, idx] += self.H[..., 0, 0]
+        H_final[..., idx + 1, idx + 1] += self.H[..., 1, 1]
+        H_final[..., idx, idx + 1] = self.H[..., 0, 1]
+        H_final[..., idx + 1, idx] = self.H[..., 1, 0]
+        return H_final, self._assemble_P()
+
+    def assemble_banded(self) -> tuple[np.ndarray, np.ndarray]:
+        """Global H in banded form (..., 3, MN) and P (..., MN, 1), O(n) memory."""
+        batch = self.C.shape[:-1]
+        ab = np.zeros(batch + (3, self.MN))
+        ab[..., 0, 1:] = self.H[..., 0, 1]
+        ab[..., 1, :-1] += self.H[..., 0, 0]
+        ab[..., 1, 1:] += self.H[..., 1, 1]
+        ab[..., 2, :-1] = self.H[..., 1, 0]
+        return ab, self._assemble_P()
+
+    def _assemble_P(self) -> np.ndarray:
+        P_final = np.zeros(self.C.shape[:-1] + (self.MN, 1))
+        P_final[..., :-1, 0] += self.P[..., 0]
+        P_final[..., 1:, 0] += self.P[..., 1]
+        return P_final
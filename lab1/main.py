@@ -1,5 +1,12 @@
-import numpy as np
-from element import Element
+import argparse
+
+from element import Element, ElementBatch
+from metrics import Metrics
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--metrics', action='store_true', help='mierz czasy faz i zapisz metrics_main.json')
+parser.add_argument('--profile', action='store_true', help='uruchom pod cProfile (profile_main.prof)')
+args = parser.parse_args()
 
 # dane
 k = 50 # W/mk
@@ -14,49 +21,40 @@ delta_L = LG / ME
 dir = 1 # 1 from left to right; -1 from right to left
 
 # start
-final_H = np.zeros(
-    (MN, MN)
-) # macież o rozmiarze ilość węzłów x ilość węzłów
-final_P = np.zeros(
-    (MN, 1)
-)
-
-elemnts = []
-
-for i in range(ME):
-    element: Element  = Element(
-        length=delta_L,
+metrics = Metrics(enabled=args.metrics, profile_path="profile_main.prof" if args.profile else None)
+metrics.start()
+with metrics.phase("assembly"):
+    batch = ElementBatch.uniform(
+        ME=ME,
+        LG=LG,
         S=S,
-        k=50,
+        k=k,
         alpha=alpha,
         q=q,
         t_sr=t_sr,
-        is_start = (i == 0),
-        is_end = (i == ME-1)
-    )
-    elemnts.append(
-        element
+        dir=dir,
     )
 
-for i in range(ME):
-    element: Element = elemnts[i]
-    matrix_h = element.H
-    matrix_P = element.P
-    for row_ind, row in enumerate(matrix_h):
-        for col_ind, val in enumerate(row):
-            final_H[i + row_ind][i + col_ind] += val
+    final_H, final_P = batch.assemble()  # macież o rozmiarze ilość węzłów x ilość węzłów
 
-    for col_ind, val in enumerate(matrix_P):
-        final_P[i + col_ind][0] += val[0] # val should has only 1 element
+with metrics.phase("print"):
+    Element.print_equation(
+            final_H,
+            final_P
+        )
 
-Element.print_equation(
-        final_H,
-        final_P
+with metrics.phase("assembly"):
+    banded = batch.assemble_banded()
+with metrics.phase("solve"):
+    res = Element.solve_equation(
+        *banded,
+        mode="banded",
     )
 
-res = Element.solve_equation(
-    final_H,
-    final_P,
-)
-
 print(res)
+
+if metrics.enabled:
+    metrics.stop()
+    metrics.set("ME", ME)
+    metrics.write("metrics_main.json")
+    print(metrics.summary())
@@ -0,0 +1,117 @@
+"""Lightweight run instrumentation.
+
+Phases (assembly, solve, record, I/O, plotting, ...) are timed with
+perf_counter and counted; the run totals, steps per second and peak memory
+go into one JSON file. Optionally the whole run is wrapped in cProfile.
+A disabled Metrics costs one no-op context manager per phase call.
+Phases may nest; time spent in an inner phase is charged to the inner one
+only, so the phase times never overlap. lab2 imports this module as well.
+
+    metrics = Metrics(enabled=True, profile_path="profile.prof")
+    metrics.start()
+    with metrics.phase("solve"):
+        ...
+    metrics.stop(steps=n_steps)
+    metrics.write("metrics.json")
+"""
+import cProfile
+import io
+import json
+import pstats
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_NULL = nullcontext()
+
+
+def peak_memory_mb() -> float | None:
+    """Peak resident set size of this process [MB]."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux podaje kB, macOS bajty
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Metrics:
+    def __init__(self, enabled: bool = False, profile_path: str | None = None) -> None:
+        self.enabled: bool = enabled or profile_path is not None
+        self.profile_path: str | None = profile_path
+        self.phases: dict[str, list[float]] = {}  # name -> [time, calls]
+        self.values: dict[str, float | int | str | None] = {}
+        self._profiler: cProfile.Profile | None = None
+        self._start: float = 0.0
+        self.wall: float = 0.0
+        self._nested: list[float] = []  # czas faz wewnętrznych, po jednym na otwartą fazę
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        if self.profile_path is not None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self, steps: int | None = None, elapsed: float | None = None) -> None:
+        """steps per second over elapsed (e.g. the time loop alone), default the whole run."""
+        if self._profiler is not None:
+            self._profiler.disable()
+        self.wall = time.perf_counter() - self._start
+        if steps is not None:
+            elapsed = self.wall if elapsed is None else elapsed
+            self.values["steps"] = steps
+            self.values["steps_per_s"] = steps / elapsed if elapsed > 0 else None
+        self.values["peak_memory_mb"] = peak_memory_mb()
+
+    def phase(self, name: str):
+        if not self.enabled:
+            return _NULL
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            inner = self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+            entry = self.phases.setdefault(name, [0.0, 0])
+            entry[0] += elapsed - inner
+            entry[1] += 1
+
+    def set(self, name: str, value: float | int | str | None) -> None:
+        self.values[name] = value
+
+    def as_dict(self) -> dict:
+        return {
+            "wall_s": self.wall,
+            "phases": {name: {"time_s": t, "calls": int(n)} for name, (t, n) in self.phases.items()},
+            **self.values,
+        }
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=1)
+        if self._profiler is not None:
+            self._profiler.dump_stats(self.profile_path)
+
+    def summary(self, top: int = 15) -> str:
+        lines = [f"{'faza':<14} {'czas [s]':>10} {'wywołania':>10} {'udział':>7}"]
+        for name, (t, n) in sorted(self.phases.items(), key=lambda item: -item[1][0]):
+            share = t / self.wall if self.wall > 0 else 0.0
+            lines.append(f"{name:<14} {t:>10.4f} {int(n):>10} {share:>7.1%}")
+        for name, value in self.values.items():
+            lines.append(f"{name}: {value:.4g}" if isinstance(value, float) else f"{name}: {value}")
+        if self._profiler is not None:
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(top)
+            lines.append(out.getvalue())
+        return "\n".join(lines)
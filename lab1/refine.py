@@ -0,0 +1,117 @@
+"""Adaptive mesh refinement for the steady-state bar H t + P = 0.
+
+S and k may be constants, per-element arrays or callables of x (evaluated at
+element midpoints), so refined elements pick up the local material values.
+
+Error indicator per element: the jump of the temperature gradient dt/dx to
+its neighbours times the element length, i.e. an estimate of the linear
+interpolation error h^2/8 |t''|. Elements above the tolerance are bisected
+until every element is below it.
+
+    python refine.py --tol 1e-3
+"""
+import argparse
+from typing import Callable
+
+import numpy as np
+from element import Element, ElementBatch
+
+Property = float | np.ndarray | Callable[[np.ndarray], np.ndarray]
+
+
+def element_values(prop: Property, x: np.ndarray) -> np.ndarray:
+    """Per-element values of S or k on the mesh with nodes x."""
+    if callable(prop):
+        return np.asarray(prop(0.5 * (x[:-1] + x[1:])), dtype=float)
+    return np.broadcast_to(np.asarray(prop, dtype=float), (x.shape[0] - 1,))
+
+
+def solve_mesh(
+        x: np.ndarray, S: Property, k: Property,
+        alpha: float, q: float, t_sr: float, dir: int = 1,
+) -> np.ndarray:
+    batch = ElementBatch.from_nodes(
+        x, element_values(S, x), element_values(k, x), alpha, q, t_sr, dir
+    )
+    return Element.solve_equation(*batch.assemble_banded(), mode="banded")[:, 0]
+
+
+def error_indicator(x: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Estimated interpolation error per element, shape (ME,)."""
+    h = np.diff(x)
+    grad = np.diff(t) / h
+    jump = np.abs(np.diff(grad))  # at interior nodes
+    node_jump = np.zeros(x.shape[0])
+    node_jump[1:-1] = jump
+    return h * np.maximum(node_jump[:-1], node_jump[1:]) / 8.0
+
+
+def adaptive_refine(
+        LG: float, S: Property, k: Property,
+        alpha: float, q: float, t_sr: float, dir: int = 1,
+        tol: float = 1e-3,
+        ME0: int = 4,
+        max_iter: int = 50,
+) -> tuple[np.ndarray, np.ndarray, list[tuple[int, float]]]:
+    """Bisect elements whose indicator exceeds tol.
+
+    Returns node coordinates, nodal temperatures and the history of
+    (number of nodes, max indicator) per iteration.
+    """
+    x = np.linspace(0.0, LG, ME0 + 1)
+    history = []
+    for _ in range(max_iter):
+        t = solve_mesh(x, S, k, alpha, q, t_sr, dir)
+        eta = error_indicator(x, t)
+        history.append((x.shape[0], float(eta.max())))
+        marked = eta > tol
+        if not marked.any():
+            break
+        mid = 0.5 * (x[:-1] + x[1:])[marked]
+        x = np.sort(np.concatenate((x, mid)))
+    return x, t, history
+
+
+def uniform_refine(
+        LG: float, S: Property, k: Property,
+        alpha: float, q: float, t_sr: float, dir: int = 1,
+        tol: float = 1e-3,
+        ME0: int = 4,
+        max_iter: int = 50,
+) -> tuple[np.ndarray, np.ndarray, list[tuple[int, float]]]:
+    """Same loop with uniform bisection, for comparison."""
+    ME = ME0
+    history = []
+    for _ in range(max_iter):
+        x = np.linspace(0.0, LG, ME + 1)
+        t = solve_mesh(x, S, k, alpha, q, t_sr, dir)
+        eta = error_indicator(x, t)
+        history.append((x.shape[0], float(eta.max())))
+        if eta.max() <= tol:
+            break
+        ME *= 2
+    return x, t, history
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive vs uniform refinement of the bar.")
+    parser.add_argument("--tol", type=float, default=1e-3)
+    parser.add_argument("--ME0", type=int, default=4)
+    args = parser.parse_args()
+
+    # dane jak w main.py, przewodność spada w cienkiej warstwie przy końcu z konwekcją
+    LG = 5
+    S = 2
+    alpha = 10
+    q = -150
+    t_sr = 400
+
+    def k(x: np.ndarray) -> np.ndarray:
+        return 50 / (1 + 20 * np.exp(-(LG - x) / 0.1))
+
+    x_a, t_a, hist_a = adaptive_refine(LG, S, k, alpha, q, t_sr, tol=args.tol, ME0=args.ME0)
+    x_u, t_u, hist_u = uniform_refine(LG, S, k, alpha, q, t_sr, tol=args.tol, ME0=args.ME0)
+
+    print("adaptacyjna: " + ", ".join(f"{n} węzłów (η={e:.2e})" for n, e in hist_a))
+    print("równomierna: " + ", ".join(f"{n} węzłów (η={e:.2e})" for n, e in hist_u))
+    print(f"t(0) = {t_a[0]:.6f} / {t_u[0]:.6f}, t(LG) = {t_a[-1]:.6f} / {t_u[-1]:.6f}")
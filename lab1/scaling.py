@@ -0,0 +1,117 @@
+"""Mesh-scaling benchmark of the lab1 steady bar solver.
+
+For every element count: assembly and banded solve time and peak traced
+memory. Linear elements are nodally exact for a bar with constant k and S,
+so every run is also checked against the analytic solution
+t(x) = t_sr - q / alpha + q / k * (x - LG) (heat flux q at x = 0,
+convection at x = LG).
+
+An error above --max-error is reported as a regression (exit code 1).
+Timings depend on the machine, so they are compared with the baseline file
+only with --check-timing (a slowdown above --speed-tol is a regression);
+save the baseline on the machine that runs the check.
+
+    python scaling.py
+    python scaling.py --save-baseline
+    python scaling.py --check-timing
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from element import Element, ElementBatch
+
+# dane jak w main.py
+k = 50
+alpha = 10
+S = 2
+LG = 5
+q = -150
+t_sr = 400
+
+BASELINE = "scaling_baseline.json"
+
+
+def analytic(x: np.ndarray) -> np.ndarray:
+    return t_sr - q / alpha + q / k * (x - LG)
+
+
+def run_elements(ME: int, repeat: int = 3) -> dict:
+    """Best of repeat runs."""
+    assembly = solve = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        batch = ElementBatch.uniform(ME=ME, LG=LG, S=S, k=k, alpha=alpha, q=q, t_sr=t_sr, dir=1)
+        ab, P = batch.assemble_banded()
+        assembly = min(assembly, time.perf_counter() - start)
+        start = time.perf_counter()
+        t = Element.solve_equation(ab, P, mode="banded")
+        solve = min(solve, time.perf_counter() - start)
+
+    # pamięć osobno, tracemalloc spowalnia obliczenia
+    tracemalloc.start()
+    batch = ElementBatch.uniform(ME=ME, LG=LG, S=S, k=k, alpha=alpha, q=q, t_sr=t_sr, dir=1)
+    Element.solve_equation(*batch.assemble_banded(), mode="banded")
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "assembly_ms": 1000 * assembly,
+        "solve_ms": 1000 * solve,
+        "total_ms": 1000 * (assembly + solve),
+        "peak_mb": peak / 2 ** 20,
+        "max_error": float(np.abs(t.ravel() - analytic(batch.x)).max()),
+    }
+
+
+def regressions(current: dict, baseline: dict, speed_tol: float | None, max_error: float) -> list[str]:
+    """Accuracy always, timings only when speed_tol is given."""
+    found = []
+    for ME, row in current.items():
+        base = baseline.get(ME)
+        if speed_tol is not None and base is not None and row["total_ms"] > base["total_ms"] * (1 + speed_tol):
+            found.append(f"ME={ME}: {row['total_ms']:.3f} ms, baza {base['total_ms']:.3f}")
+        if row["max_error"] > max_error:
+            found.append(f"ME={ME}: błąd {row['max_error']:.2e} > {max_error:.0e}")
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--elements', type=int, nargs='+', default=[10, 1000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check-timing', action='store_true', help='porównaj też czasy z bazą (zależne od maszyny)')
+    parser.add_argument('--speed-tol', type=float, default=0.25, help='dopuszczalne spowolnienie (0.25 = 25%%)')
+    parser.add_argument('--max-error', type=float, default=1e-6, help='dopuszczalny błąd względem rozwiązania analitycznego [K]')
+    args = parser.parse_args()
+
+    current = {}
+    print(f"{'ME':>8} {'budowa [ms]':>12} {'rozw. [ms]':>11} {'razem [ms]':>11} {'pamięć [MB]':>12} {'max błąd':>10}")
+    for ME in args.elements:
+        row = run_elements(ME, args.repeat)
+        current[str(ME)] = row
+        print(f"{ME:>8} {row['assembly_ms']:>12.3f} {row['solve_ms']:>11.3f} {row['total_ms']:>11.3f} "
+              f"{row['peak_mb']:>12.3f} {row['max_error']:>10.2e}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=1)
+        print(f"Baza zapisana do pliku: {args.baseline}")
+    else:
+        baseline = {}
+        if args.check_timing:
+            if not os.path.exists(args.baseline):
+                sys.exit(f"Brak pliku bazy {args.baseline} (zapisz go: --save-baseline)")
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        found = regressions(current, baseline, args.speed_tol if args.check_timing else None, args.max_error)
+        for line in found:
+            print(f"REGRESJA: {line}")
+        if found:
+            sys.exit(1)
+        print(f"Brak regresji względem {args.baseline}" if args.check_timing else "Brak regresji dokładności")
@@ -0,0 +1,153 @@
+"""Parameter sweep for the steady-state bar problem H t + P = 0.
+
+Every row of the input table is one parameter set (k, alpha, q, t_sr, S, LG,
+dir, ME). Rows with the same ME are stacked into one (B, MN) batch and solved
+together; large sweeps are split into chunks and spread over a process pool.
+
+    python sweep.py sweep_example.csv -o wyniki.csv
+    python sweep.py sweep_example.xlsx --sheet Sweep -o wyniki.csv --workers 4
+"""
+import argparse
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from element import Element, ElementBatch
+from metrics import Metrics
+
+# wartości domyślne jak w main.py, gdy kolumny brakuje w tabeli
+DEFAULTS: dict[str, float] = {
+    "k": 50.0,
+    "alpha": 10.0,
+    "q": -150.0,
+    "t_sr": 400.0,
+    "S": 2.0,
+    "LG": 5.0,
+    "dir": 1,
+    "ME": 4,
+}
+PARAMS: tuple[str, ...] = tuple(DEFAULTS)
+
+
+def read_table(path: str, sheet: str | None = None) -> dict[str, np.ndarray]:
+    """Read parameter sets from CSV or XLSX (header row with PARAMS names)."""
+    if Path(path).suffix.lower() in (".xlsx", ".xlsm"):
+        try:
+            from openpyxl import load_workbook  # only needed for Excel input
+        except ImportError:
+            raise ImportError("Reading XLSX needs openpyxl: pip install openpyxl (or save the table as CSV).") from None
+
+        wb = load_workbook(path, read_only=True, data_only=True)
+        ws = wb[sheet] if sheet else wb.active
+        rows = [r for r in ws.iter_rows(values_only=True) if any(v is not None for v in r)]
+        header = [str(h).strip() if h is not None else "" for h in rows[0]] if rows else []
+        records = [dict(zip(header, r)) for r in rows[1:]]
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            records = list(csv.DictReader(f))
+
+    # puste komórki nagłówka (częste w ręcznie edytowanych arkuszach): kolumna pomijana
+    records = [{name: v for name, v in r.items() if name not in (None, "")} for r in records]
+    unknown = set(records[0]) - set(PARAMS) if records else set()
+    if unknown:
+        raise ValueError(f"Unknown columns in {path}: {', '.join(sorted(unknown))}")
+
+    table = {}
+    for name, default in DEFAULTS.items():
+        values = [r.get(name) for r in records]
+        table[name] = np.array(
+            [default if v in (None, "") else float(v) for v in values]
+        )
+    table["dir"] = table["dir"].astype(int)
+    table["ME"] = table["ME"].astype(int)
+    return table
+
+
+def assemble_stacked(params: dict[str, np.ndarray], ME: int) -> tuple[np.ndarray, np.ndarray]:
+    """Banded H (B, 3, MN) and P (B, MN) for B parameter sets sharing ME,
+    one ``ElementBatch`` with a batch axis."""
+    length = np.repeat((params["LG"] / ME)[:, None], ME, axis=1)
+    batch = ElementBatch(
+        length, params["S"][:, None], params["k"][:, None],
+        alpha=params["alpha"], q=params["q"], t_sr=params["t_sr"], dir=params["dir"],
+    )
+    ab, P = batch.assemble_banded()
+    return ab, P[..., 0]
+
+
+def _solve_chunk(args: tuple[dict[str, np.ndarray], int]) -> np.ndarray:
+    params, ME = args
+    return Element.solve_banded(*assemble_stacked(params, ME))[..., 0]
+
+
+def run_sweep(
+        table: dict[str, np.ndarray],
+        workers: int = 1,
+        chunk_size: int = 5000,
+) -> list[np.ndarray]:
+    """Solve every row of ``table``; returns the nodal temperatures per row."""
+    n_rows = table["ME"].shape[0]
+    tasks = []
+    task_rows = []
+    for ME in np.unique(table["ME"]):
+        rows = np.flatnonzero(table["ME"] == ME)
+        for start in range(0, rows.shape[0], chunk_size):
+            chunk = rows[start:start + chunk_size]
+            tasks.append(({name: table[name][chunk] for name in PARAMS}, int(ME)))
+            task_rows.append(chunk)
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            solved = list(executor.map(_solve_chunk, tasks))
+    else:
+        solved = [_solve_chunk(task) for task in tasks]
+
+    results: list[np.ndarray] = [np.empty(0)] * n_rows
+    for rows, t in zip(task_rows, solved):
+        for row, t_row in zip(rows, t):
+            results[row] = t_row
+    return results
+
+
+def write_results(path: str, table: dict[str, np.ndarray], results: list[np.ndarray]) -> None:
+    """One row per parameter set: the inputs followed by t_1 .. t_MN."""
+    max_MN = max((t.shape[0] for t in results), default=0)  # pusta tabela: sam nagłówek
+    headers = list(PARAMS) + [f"t_{i + 1}" for i in range(max_MN)]
+    with open(path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(headers)
+        for row, t in enumerate(results):
+            inputs = [f"{table[name][row]:g}" for name in PARAMS]
+            temps = [f"{val:.6f}" for val in t]
+            writer.writerow(inputs + temps + [""] * (max_MN - t.shape[0]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch solve H t + P = 0 for many parameter sets.")
+    parser.add_argument("table", help="CSV or XLSX with columns " + ", ".join(PARAMS))
+    parser.add_argument("-o", "--output", default="wyniki_sweep.csv")
+    parser.add_argument("--sheet", default=None, help="sheet name for XLSX input")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--metrics", default=None, help="zapisz czasy faz do podanego pliku JSON")
+    parser.add_argument("--profile", default=None, help="uruchom pod cProfile i zapisz statystyki do pliku")
+    args = parser.parse_args()
+
+    metrics = Metrics(enabled=args.metrics is not None, profile_path=args.profile)
+    metrics.start()
+    with metrics.phase("read"):
+        table = read_table(args.table, args.sheet)
+    with metrics.phase("solve"):
+        results = run_sweep(table, workers=args.workers, chunk_size=args.chunk_size)
+    with metrics.phase("write"):
+        write_results(args.output, table, results)
+    print(f"{len(results)} zestawów parametrów, wyniki zapisane do pliku: {args.output}")
+
+    if metrics.enabled:
+        metrics.stop()
+        metrics.set("sets", len(results))
+        metrics.set("sets_per_s", len(results) / metrics.phases["solve"][0])
+        metrics.set("workers", args.workers)
+        metrics.write(args.metrics or "metrics_sweep.json")
+        print(metrics.summary())
@@ -0,0 +1,124 @@
+"""ElementBatch and the banded solver against the per-element / dense reference.
+
+    python -m pytest lab1
+"""
+import numpy as np
+import pytest
+from element import Element, ElementBatch
+
+# dane jak w main.py
+k = 50
+alpha = 10
+S = 2
+LG = 5
+q = -150
+t_sr = 400
+
+
+def elements(length, S, k, dir=1) -> list[Element]:
+    ME = len(length)
+    S = np.broadcast_to(S, (ME,))
+    k = np.broadcast_to(k, (ME,))
+    return [
+        Element(length[i], S[i], k[i], alpha, q, t_sr, dir=dir, is_start=i == 0, is_end=i == ME - 1)
+        for i in range(ME)
+    ]
+
+
+def assemble_loop(els: list[Element]) -> tuple[np.ndarray, np.ndarray]:
+    """Global H and P summed element by element (the original assembly)."""
+    MN = len(els) + 1
+    H = np.zeros((MN, MN))
+    P = np.zeros((MN, 1))
+    for i, el in enumerate(els):
+        H[i:i + 2, i:i + 2] += el.H
+        P[i:i + 2] += el.P
+    return H, P
+
+
+MESHES = {
+    "uniform": (np.full(8, LG / 8), S, k),
+    "per-element S/k": (
+        np.array([0.2, 0.5, 1.0, 0.3, 1.5, 0.75, 0.75]),
+        np.array([2.0, 1.5, 1.0, 2.5, 3.0, 0.5, 2.0]),
+        np.array([50.0, 20.0, 80.0, 35.0, 50.0, 10.0, 60.0]),
+    ),
+}
+
+
+@pytest.mark.parametrize("dir", [1, -1])
+@pytest.mark.parametrize("mesh", MESHES)
+def test_batch_matches_elements(mesh, dir):
+    length, S_, k_ = MESHES[mesh]
+    batch = ElementBatch(length, S_, k_, alpha, q, t_sr, dir=dir)
+    els = elements(length, S_, k_, dir=dir)
+
+    np.testing.assert_allclose(batch.C, [el.C for el in els], rtol=1e-12)
+    np.testing.assert_allclose(batch.H, np.stack([el.H for el in els]), rtol=1e-12)
+    np.testing.assert_allclose(batch.P, np.stack([el.P[:, 0] for el in els]), rtol=1e-12)
+
+    H, P = batch.assemble()
+    H_ref, P_ref = assemble_loop(els)
+    np.testing.assert_allclose(H, H_ref, rtol=1e-12)
+    np.testing.assert_allclose(P, P_ref, rtol=1e-12)
+
+
+def test_uniform_matches_explicit_lengths():
+    a = ElementBatch.uniform(ME=8, LG=LG, S=S, k=k, alpha=alpha, q=q, t_sr=t_sr)
+    b = ElementBatch.from_nodes(np.linspace(0.0, LG, 9), S, k, alpha, q, t_sr)
+    np.testing.assert_allclose(a.H, b.H, rtol=1e-12)
+    np.testing.assert_allclose(a.x, b.x, atol=1e-12)
+
+
+@pytest.mark.parametrize("dir", [1, -1])
+@pytest.mark.parametrize("mesh", MESHES)
+def test_banded_matches_dense(mesh, dir):
+    length, S_, k_ = MESHES[mesh]
+    batch = ElementBatch(length, S_, k_, alpha, q, t_sr, dir=dir)
+    H, P = batch.assemble()
+    ab, P_banded = batch.assemble_banded()
+
+    # pasma ab to przekątne pełnej macierzy H
+    np.testing.assert_allclose(ab[0, 1:], np.diag(H, 1), rtol=1e-12)
+    np.testing.assert_allclose(ab[1], np.diag(H), rtol=1e-12)
+    np.testing.assert_allclose(ab[2, :-1], np.diag(H, -1), rtol=1e-12)
+    np.testing.assert_allclose(P_banded, P, rtol=1e-12)
+
+    t_dense = Element.solve_equation(H, P, mode="dense")
+    t_banded = Element.solve_equation(ab, P_banded, mode="banded")
+    np.testing.assert_allclose(t_banded, t_dense, rtol=1e-9)
+
+
+def test_banded_large_mesh_matches_dense():
+    batch = ElementBatch.uniform(ME=400, LG=LG, S=S, k=k, alpha=alpha, q=q, t_sr=t_sr)
+    t_dense = Element.solve_equation(*batch.assemble(), mode="dense")
+    t_banded = Element.solve_equation(*batch.assemble_banded(), mode="banded")
+    np.testing.assert_allclose(t_banded, t_dense, rtol=1e-8)
+
+
+def test_banded_singular_raises():
+    ab = np.zeros((3, 4))
+    with pytest.raises(ValueError):
+        Element.solve_equation(ab, np.ones((4, 1)), mode="banded")
+
+
+def test_banded_batch_matches_single_solves():
+    rng = np.random.default_rng(0)
+    B, ME = 6, 9
+    batch = ElementBatch(
+        rng.uniform(0.2, 1.5, (B, ME)), rng.uniform(0.5, 3.0, (B, 1)), rng.uniform(1.0, 80.0, (B, 1)),
+        alpha=rng.uniform(1.0, 50.0, B), q=rng.uniform(-300.0, 0.0, B), t_sr=rng.uniform(0.0, 500.0, B),
+        dir=rng.choice([-1, 1], B),
+    )
+    ab, P = batch.assemble_banded()
+    t = Element.solve_banded(ab, P)
+    assert t.shape == (B, ME + 1, 1)
+    for row in range(B):
+        np.testing.assert_allclose(t[row], Element.solve_banded(ab[row], P[row]), rtol=1e-12)
+
+
+def test_banded_batch_singular_row_raises():
+    ab, P = ElementBatch.uniform(ME=4, LG=LG, S=S, k=k, alpha=alpha, q=q, t_sr=t_sr).assemble_banded()
+    ab = np.stack([ab, np.zeros_like(ab), ab])
+    with pytest.raises(ValueError, match=r"rows \[1\]"):
+        Element.solve_banded(ab, np.stack([P] * 3))
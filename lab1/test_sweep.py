@@ -0,0 +1,63 @@
+"""Stacked sweep against one ElementBatch per parameter set.
+
+    python -m pytest lab1
+"""
+import csv
+
+import numpy as np
+import pytest
+from element import Element, ElementBatch
+from sweep import PARAMS, read_table, run_sweep, write_results
+
+
+def table(B: int, ME: int, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {
+        "k": rng.uniform(1.0, 100.0, B),
+        "alpha": rng.uniform(1.0, 50.0, B),
+        "q": rng.uniform(-300.0, 0.0, B),
+        "t_sr": rng.uniform(0.0, 500.0, B),
+        "S": rng.uniform(0.5, 3.0, B),
+        "LG": rng.uniform(1.0, 10.0, B),
+        "dir": rng.choice([-1, 1], B),
+        "ME": np.full(B, ME),
+    }
+
+
+def test_sweep_matches_single_batches():
+    params = table(20, 6)
+    results = run_sweep(params, chunk_size=7)
+    for row, t in enumerate(results):
+        batch = ElementBatch.uniform(
+            ME=6, LG=params["LG"][row], S=params["S"][row], k=params["k"][row],
+            alpha=params["alpha"][row], q=params["q"][row], t_sr=params["t_sr"][row], dir=params["dir"][row],
+        )
+        t_ref = Element.solve_equation(*batch.assemble_banded(), mode="banded")
+        np.testing.assert_allclose(t, t_ref[:, 0], rtol=1e-9)
+
+
+def test_empty_table(tmp_path):
+    src = tmp_path / "params.csv"
+    src.write_text(",".join(PARAMS) + "\n", encoding="utf-8")
+    params = read_table(str(src))
+    results = run_sweep(params)
+    out = tmp_path / "wyniki.csv"
+    write_results(str(out), params, results)
+    with open(out, newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [list(PARAMS)]
+
+
+def test_xlsx_blank_header_columns_are_ignored(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["k", None, "alpha", "", "ME"])
+    ws.append([25, "uwaga", 20, 1.5, 8])
+    ws.append([50, None, 10, None, 4])
+    wb.save(tmp_path / "params.xlsx")
+
+    params = read_table(str(tmp_path / "params.xlsx"))
+    np.testing.assert_array_equal(params["k"], [25.0, 50.0])
+    np.testing.assert_array_equal(params["alpha"], [20.0, 10.0])
+    np.testing.assert_array_equal(params["ME"], [8, 4])
+    np.testing.assert_array_equal(params["LG"], [5.0, 5.0])
@@ -0,0 +1,98 @@
+# app.py
+import numpy as np
+import streamlit as st
+from runs import DEFAULTS, MAX_NODES, Run, RunRegistry, check_params, run_steps
+from solver import SCHEMES
+
+st.set_page_config(page_title="Nagrzewanie wsadu", layout="wide")
+
+st.title("🔥 Transient heating of a round billet")
+
+# co ile sekund odświeżamy wykres trwającego przebiegu
+REFRESH_S = 0.5
+
+
+@st.cache_resource
+def registry() -> RunRegistry:
+    """One registry per server process, shared by all sessions."""
+    return RunRegistry()
+
+
+def draw(run: Run) -> None:
+    data = run.results()
+    if data.shape[0]:
+        st.line_chart(
+            {"Czas [s]": data[:, 0], "powierzchnia": data[:, 2], "oś": data[:, 1]},
+            x="Czas [s]", y=["powierzchnia", "oś"],
+        )
+    st.progress(run.progress, text=f"{run.steps} / {run.nTime} steps")
+
+
+@st.fragment(run_every=REFRESH_S)
+def live(run: Run) -> None:
+    """Chart and progress of a running run, redrawn every REFRESH_S seconds
+    (also when another session computes it); the rest of the page is not rerun.
+    When the run ends, one full rerun shows the summary and stops the refresh."""
+    draw(run)
+    if run.done.is_set():
+        st.rerun()
+
+
+# 1) Sidebar inputs
+st.sidebar.header("Mesh and time")
+nodes     = st.sidebar.number_input("Nodes (nh)",                min_value=3, max_value=MAX_NODES, value=DEFAULTS["nodes"], step=1)
+order     = st.sidebar.radio("Element order", options=(1, 2), index=0, help="2 needs an odd number of nodes")
+TauMax    = st.sidebar.number_input("Time [s]",                  min_value=1.0, value=DEFAULTS["time"])
+scheme    = st.sidebar.radio("Scheme", options=sorted(SCHEMES), index=sorted(SCHEMES).index(DEFAULTS["scheme"]))
+dt        = st.sidebar.number_input("Time step [s] (0 = dR²/(0.5a))", min_value=0.0, value=DEFAULTS["dt"], format="%.4f")
+st.sidebar.header("Material and furnace")
+AlfaAir   = st.sidebar.number_input("Heat-transfer coeff. (AlfaAir)", min_value=0.0, value=DEFAULTS["AlfaAir"])
+TempBegin = st.sidebar.number_input("Initial temp. [C]",         value=DEFAULTS["TempBegin"])
+t1        = st.sidebar.number_input("Furnace temp. (t1) [C]",    value=DEFAULTS["t1"])
+C         = st.sidebar.number_input("Heat capacity (C)",         min_value=1.0, value=DEFAULTS["C"])
+Ro        = st.sidebar.number_input("Density (Ro)",              min_value=1.0, value=DEFAULTS["Ro"])
+K         = st.sidebar.number_input("Conductivity (K)",          min_value=0.01, value=DEFAULTS["K"])
+
+params = {
+    "nodes": int(nodes), "time": float(TauMax), "scheme": scheme, "order": int(order), "dt": float(dt),
+    "AlfaAir": float(AlfaAir), "TempBegin": float(TempBegin), "t1": float(t1),
+    "C": float(C), "Ro": float(Ro), "K": float(K),
+}
+
+# siatkę i limity przebiegu sprawdzamy przed uruchomieniem
+try:
+    check_params(params)
+    st.sidebar.caption(f"{run_steps(params)[0]} time steps")
+    invalid = None
+except ValueError as e:
+    invalid = str(e)
+    st.sidebar.error(f"Cannot run: {invalid}")
+
+if st.sidebar.button("▶ Run", disabled=invalid is not None):
+    st.session_state.params = params
+
+if "params" in st.session_state:
+    run, source = registry().get(st.session_state.params)
+    if st.session_state.params != params:
+        st.info("Parameters changed, press Run to start the new configuration.")
+
+    # 2) wykres odświeżany w trakcie obliczeń (fragment), po zakończeniu rysowany raz
+    if run.done.is_set():
+        draw(run)
+    else:
+        live(run)
+        st.stop()
+
+    if run.error is not None:
+        st.error(run.error)
+        st.stop()
+
+    # 3) summary
+    data = run.results()
+    dT = np.abs(data[:, 2] - data[:, 1])
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("T oś (koniec)", f"{data[-1, 1]:.2f} °C")
+    c2.metric("T powierzchnia (koniec)", f"{data[-1, 2]:.2f} °C")
+    c3.metric("max ΔT", f"{dT.max():.2f} °C", help=f"t = {data[dT.argmax(), 0]:.1f} s")
+    c4.metric("Steps", f"{run.steps}")
+    st.caption(f"Configuration {run.key}, result from: {source}.")
@@ -0,0 +1,117 @@
+"""Per-step cost of the lab2 solver: previous per-step ThreadPoolExecutor
+assembly + Thomas elimination vs the precomputed HeatingSolver.
+
+Both paths run the same number of steps from TempBegin and must agree.
+
+    python benchmark.py --nodes 51 501 5001 --steps 20
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from problem import AlfaAir, C, K, Rmax, Rmin, Ro, TauMax, TempBegin, t1, time_step
+from solver import HeatingSolver
+
+
+def legacy_step(vrtxCoordX: list, vrtxTemp: list, dTau: float) -> list:
+    """One time step exactly as main.py did it before the solver module."""
+    nh = len(vrtxCoordX)
+    ne = nh - 1
+    Np = 2
+    E = [-0.5773502692, 0.5773502692]
+    W = [1.0, 1.0]
+    N1 = [0.5 * (1 - e) for e in E]
+    N2 = [0.5 * (1 + e) for e in E]
+
+    aC = [0.0] * nh
+    aD = [0.0] * nh
+    aE = [0.0] * nh
+    aB = [0.0] * nh
+
+    TempAir = t1
+
+    def assemble_element(ie):
+        r1 = vrtxCoordX[ie]
+        r2 = vrtxCoordX[ie + 1]
+        t1e = vrtxTemp[ie]
+        t2e = vrtxTemp[ie + 1]
+        dR_local = r2 - r1
+        Alfa = AlfaAir if ie == ne - 1 else 0.0
+
+        Ke = [[0.0, 0.0], [0.0, 0.0]]
+        Fe = [0.0, 0.0]
+
+        for ip in range(Np):
+            Rp = N1[ip] * r1 + N2[ip] * r2
+            TpTau = N1[ip] * t1e + N2[ip] * t2e
+
+            Ke[0][0] += K * Rp * W[ip] / dR_local + C * Ro * dR_local * Rp * W[ip] * N1[ip] ** 2 / dTau
+            Ke[0][1] += -K * Rp * W[ip] / dR_local + C * Ro * dR_local * Rp * W[ip] * N1[ip] * N2[ip] / dTau
+            Ke[1][0] = Ke[0][1]
+            Ke[1][1] += K * Rp * W[ip] / dR_local + C * Ro * dR_local * Rp * W[ip] * N2[ip] ** 2 / dTau + 2 * Alfa * Rmax
+
+            Fe[0] += C * Ro * dR_local * TpTau * Rp * W[ip] * N1[ip] / dTau
+            Fe[1] += C * Ro * dR_local * TpTau * Rp * W[ip] * N2[ip] / dTau + 2 * Alfa * Rmax * TempAir
+
+        return ie, Ke, Fe
+
+    with ThreadPoolExecutor() as executor:
+        results = executor.map(assemble_element, range(ne))
+
+    for ie, Ke, Fe in results:
+        aD[ie] += Ke[0][0]
+        aD[ie + 1] += Ke[1][1]
+        aE[ie] += Ke[0][1]
+        aC[ie + 1] += Ke[1][0]
+        aB[ie] += Fe[0]
+        aB[ie + 1] += Fe[1]
+
+    for i in range(1, nh):
+        m = aC[i] / aD[i - 1]
+        aD[i] -= m * aE[i - 1]
+        aB[i] -= m * aB[i - 1]
+
+    aB[-1] /= aD[-1]
+    for i in range(nh - 2, -1, -1):
+        aB[i] = (aB[i] - aE[i] * aB[i + 1]) / aD[i]
+    return aB
+
+
+def run_legacy(nh: int, steps: int) -> tuple[float, np.ndarray]:
+    dTau = time_step(nh, TauMax)[1]
+    dR = (Rmax - Rmin) / (nh - 1)
+    vrtxCoordX = [Rmin + i * dR for i in range(nh)]
+    vrtxTemp = [TempBegin] * nh
+    start = time.perf_counter()
+    for _ in range(steps):
+        vrtxTemp = legacy_step(vrtxCoordX, vrtxTemp, dTau)
+    return time.perf_counter() - start, np.array(vrtxTemp)
+
+
+def run_solver(nh: int, steps: int) -> tuple[float, float, np.ndarray]:
+    dTau = time_step(nh, TauMax)[1]
+    start = time.perf_counter()
+    solver = HeatingSolver(Rmin, Rmax, nh, AlfaAir, C, Ro, K, dTau)
+    setup = time.perf_counter() - start
+    vrtxTemp = np.full(nh, TempBegin)
+    start = time.perf_counter()
+    for _ in range(steps):
+        vrtxTemp = solver.step(vrtxTemp, t1)
+    return setup, time.perf_counter() - start, vrtxTemp
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, nargs='+', default=[51, 501, 5001])
+    parser.add_argument('--steps', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>6} {'stary [ms/krok]':>16} {'nowy [ms/krok]':>15} {'setup [ms]':>11} {'przysp.':>8} {'max |dT|':>10}")
+    for nh in args.nodes:
+        legacy_time, legacy_temp = run_legacy(nh, args.steps)
+        setup, solver_time, solver_temp = run_solver(nh, args.steps)
+        legacy_ms = 1000 * legacy_time / args.steps
+        solver_ms = 1000 * solver_time / args.steps
+        diff = np.abs(legacy_temp - solver_temp).max()
+        print(f"{nh:>6} {legacy_ms:>16.3f} {solver_ms:>15.3f} {1000 * setup:>11.3f} {legacy_ms / solver_ms:>7.1f}x {diff:>10.2e}")
@@ -0,0 +1,36 @@
+"""Checkpoint/restart for long lab2 runs.
+
+A checkpoint is one .npz file with the temperature field and a JSON blob of
+everything else (time, step index, time step, run parameters, output-file
+positions, event state). It is written to a temporary file first and then
+moved over the previous checkpoint with os.replace, so an interrupted write
+never leaves a broken checkpoint behind.
+"""
+import json
+import os
+
+import numpy as np
+
+
+def save_checkpoint(path: str, vrtxTemp: np.ndarray, state: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, vrtxTemp=vrtxTemp, state=np.array(json.dumps(state)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str) -> tuple[np.ndarray, dict]:
+    with np.load(path) as data:
+        return data["vrtxTemp"].copy(), json.loads(str(data["state"]))
+
+
+def check_parameters(saved: dict, current: dict, allowed: tuple[str, ...] = ("time",)) -> None:
+    """Refuse to resume with different run parameters (except the end time)."""
+    changed = sorted(
+        name for name in set(saved) | set(current)
+        if name not in allowed and saved.get(name) != current.get(name)
+    )
+    if changed:
+        raise ValueError(f"Parametry różnią się od zapisanych w punkcie kontrolnym: {', '.join(changed)}")
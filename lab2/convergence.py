@@ -0,0 +1,183 @@
+"""Mesh-convergence study for lab2.
+
+Runs a list of node counts on a process pool, lines the centre and surface
+temperatures up on common output times, estimates the observed order of
+convergence from every three consecutive meshes (fixed-point iteration,
+so the refinement ratio does not have to be constant) and extrapolates the
+two finest meshes (Richardson). The error of each mesh is its largest
+difference from the extrapolated answer; the coarsest mesh within --tol is
+recommended. If no order can be estimated for the finest triple (the
+differences vanish or do not shrink), there is no extrapolation and the
+errors are measured against the finest mesh instead.
+
+The time step follows the mesh (dR^2 / (0.5 a), as in main.py) unless --dt
+is given, in which case only the spatial error is studied.
+
+    python convergence.py --nodes 26 51 101 201 401 --tol 0.5 --workers 4
+"""
+import argparse
+import csv
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from problem import AlfaAir, C, K, Rmax, Rmin, Ro, TempBegin, run_series, t1, time_step
+from solver import SCHEMES, HeatingSolver
+
+
+def run(
+        nh: int, TauMax: float, output_times: np.ndarray,
+        theta: float = 1.0, order: int = 1, dt: float | None = None,
+) -> tuple[np.ndarray, int, float]:
+    """Centre/surface temperatures at output_times (n_out, 2), steps and wall time."""
+    start = time.perf_counter()
+    nTime, dTau = time_step(nh, TauMax, dt)
+    solver = HeatingSolver(Rmin, Rmax, nh, AlfaAir, C, Ro, K, dTau, theta=theta, order=order)
+    out = run_series(solver, np.full(nh, TempBegin), t1, nTime, output_times)
+    return out, nTime, time.perf_counter() - start
+
+
+def _run_task(task: tuple) -> tuple[np.ndarray, int, float]:
+    return run(*task)
+
+
+def observed_order(
+        f1: np.ndarray, f2: np.ndarray, f3: np.ndarray, r21: float, r32: float,
+) -> float:
+    """Order p from coarse f3, medium f2, fine f1 (r = h_coarse / h_fine).
+
+    Solves p = |ln|e32 / e21| + ln((r21^p - s) / (r32^p - s))| / ln r21 by
+    fixed-point iteration, with e the max-norm differences over all outputs.
+    NaN when there is no order to estimate: a difference is zero or the
+    differences do not shrink (e32 <= e21).
+    """
+    e21 = float(np.abs(f2 - f1).max())
+    e32 = float(np.abs(f3 - f2).max())
+    if e21 == 0.0 or e32 <= e21:
+        return math.nan
+    s = 1.0 if np.sum((f3 - f2) * (f2 - f1)) >= 0 else -1.0
+    p = abs(math.log(e32 / e21)) / math.log(r21)
+    for _ in range(100):
+        try:
+            q = math.log((r21 ** p - s) / (r32 ** p - s))
+        except (ValueError, ZeroDivisionError):  # iteracja wyszła poza dziedzinę
+            return math.nan
+        p_new = abs(math.log(e32 / e21) + q) / math.log(r21)
+        if abs(p_new - p) < 1e-10:
+            return p_new
+        p = p_new
+    return p
+
+
+def richardson(f_fine: np.ndarray, f_coarse: np.ndarray, r: float, p: float) -> np.ndarray:
+    return f_fine + (f_fine - f_coarse) / (r ** p - 1)
+
+
+def study(
+        nodes: list[int], TauMax: float, output_times: np.ndarray,
+        theta: float = 1.0, order: int = 1, dt: float | None = None, workers: int = 1,
+) -> dict:
+    nodes = sorted(nodes)
+    if len(nodes) < 3:
+        raise ValueError("A convergence study needs at least 3 meshes")
+    tasks = [(nh, TauMax, output_times, theta, order, dt) for nh in nodes]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            solved = list(executor.map(_run_task, tasks))
+    else:
+        solved = [_run_task(task) for task in tasks]
+
+    results = [out for out, _, _ in solved]
+    h = [(Rmax - Rmin) / (nh - 1) for nh in nodes]
+    orders = [math.nan, math.nan]
+    for i in range(2, len(nodes)):
+        orders.append(observed_order(results[i], results[i - 1], results[i - 2],
+                                     h[i - 1] / h[i], h[i - 2] / h[i - 1]))
+    p = orders[-1]
+    # bez rzędu nie ma ekstrapolacji, odniesieniem jest najgęstsza siatka
+    extrapolated = results[-1] if math.isnan(p) else richardson(results[-1], results[-2], h[-2] / h[-1], p)
+    errors = [np.abs(out - extrapolated).max(axis=0) for out in results]
+    return {
+        "nodes": nodes,
+        "steps": [steps for _, steps, _ in solved],
+        "wall": [elapsed for _, _, elapsed in solved],
+        "results": results,
+        "orders": orders,
+        "order": p,
+        "extrapolated": extrapolated,
+        "errors": errors,
+    }
+
+
+def recommend(report: dict, tol: float) -> int | None:
+    """Fewest nodes (then fewest steps) whose estimated error is within tol.
+
+    Node and step counts are deterministic, unlike the wall times of runs
+    that shared the pool. Without an estimated order the errors are only
+    relative to the finest mesh, so nothing is recommended.
+    """
+    if math.isnan(report["order"]):
+        return None
+    ok = [(nh, steps) for nh, steps, err in zip(report["nodes"], report["steps"], report["errors"]) if err.max() <= tol]
+    return min(ok)[0] if ok else None
+
+
+def write_study(path: str, output_times: np.ndarray, report: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    headers = ["Czas (s)"]
+    for nh in report["nodes"]:
+        headers += [f"T_os_{nh} (C)", f"T_pow_{nh} (C)"]
+    ref = "odniesienie" if math.isnan(report["order"]) else "Richardson"
+    headers += [f"T_os_{ref} (C)", f"T_pow_{ref} (C)"]
+    with open(path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(headers)
+        for k, Tau in enumerate(output_times):
+            row = [f"{Tau:.4f}"]
+            for out in report["results"]:
+                row += [f"{out[k, 0]:.4f}", f"{out[k, 1]:.4f}"]
+            row += [f"{report['extrapolated'][k, 0]:.4f}", f"{report['extrapolated'][k, 1]:.4f}"]
+            writer.writerow(row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesh-convergence study with Richardson extrapolation.")
+    parser.add_argument('--nodes', type=int, nargs='+', default=[26, 51, 101, 201, 401])
+    parser.add_argument('--time', type=float, default=1000.0)
+    parser.add_argument('--scheme', choices=sorted(SCHEMES), default='euler')
+    parser.add_argument('--order', type=int, choices=[1, 2], default=1)
+    parser.add_argument('--dt', type=float, default=None, help='wspólny krok czasowy [s] (tylko błąd przestrzenny)')
+    parser.add_argument('--output-dt', type=float, default=10.0)
+    parser.add_argument('--tol', type=float, default=0.5, help='dopuszczalny błąd temperatury [C]')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('-o', '--output', default='dt_wyniki/zbieznosc.csv')
+    args = parser.parse_args()
+
+    output_times = np.arange(0.0, args.time + 0.5 * args.output_dt, args.output_dt)
+    report = study(args.nodes, args.time, output_times, theta=SCHEMES[args.scheme], order=args.order,
+                   dt=args.dt, workers=args.workers)
+    write_study(args.output, output_times, report)
+
+    print(f"{'węzły':>6} {'kroki':>8} {'czas [s]':>9} {'błąd oś [C]':>12} {'błąd pow. [C]':>14} {'rząd':>6}")
+    for i, nh in enumerate(report["nodes"]):
+        err = report["errors"][i]
+        p = report["orders"][i]
+        print(f"{nh:>6} {report['steps'][i]:>8} {report['wall'][i]:>9.3f} {err[0]:>12.4f} {err[1]:>14.4f} "
+              + ("     -" if math.isnan(p) else f"{p:>6.2f}"))
+    if math.isnan(report["order"]):
+        print("Nie można oszacować rzędu zbieżności (różnice między siatkami zerowe lub nie maleją); "
+              "bez ekstrapolacji Richardsona, błędy liczone względem najgęstszej siatki")
+    else:
+        print(f"Obserwowany rząd zbieżności: {report['order']:.3f}")
+        print(f"Ekstrapolacja Richardsona w t = {output_times[-1]:g} s: oś {report['extrapolated'][-1, 0]:.4f} C, "
+              f"powierzchnia {report['extrapolated'][-1, 1]:.4f} C")
+    best = recommend(report, args.tol)
+    if math.isnan(report["order"]):
+        print("Brak rekomendacji siatki: dodaj gęstsze siatki")
+    elif best is None:
+        print(f"Żadna siatka nie spełnia tolerancji {args.tol:g} C, potrzebna gęstsza siatka")
+    else:
+        print(f"Najrzadsza siatka z błędem <= {args.tol:g} C: --nodes {best}")
+    print(f"Wyniki zapisane do pliku: {args.output}")
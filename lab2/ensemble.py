@@ -0,0 +1,146 @@
+"""Ensemble mode: many lab2 heating scenarios advanced together.
+
+Every row of the input CSV is one scenario (columns from PARAMS, missing ones
+take the main.py values). Scenarios are advanced as one (B, nh) array by a
+HeatingSolver with batch parameters. All scenarios of a batch share one
+time step: by default the smallest dR^2 / (0.5 a) of the batch, or --dt.
+With --group-dt scenarios are instead grouped by their own default step,
+so every scenario runs exactly as main.py would run it.
+
+Large ensembles are split into chunks and spread over a process pool; all
+results go into one file (CSV in long format, or .npz).
+
+    python ensemble.py scenarios.csv -o dt_wyniki/ensemble.csv --workers 4
+"""
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import problem
+from problem import Rmin, run_series
+from solver import SCHEMES, HeatingSolver
+
+# wartości domyślne jak w main.py
+DEFAULTS: dict[str, float] = {
+    name: getattr(problem, name) for name in ("AlfaAir", "Rmax", "t1", "C", "Ro", "K", "TempBegin")
+}
+PARAMS: tuple[str, ...] = tuple(DEFAULTS)
+
+
+def default_time_step(params: dict[str, np.ndarray], nh: int, TauMax: float) -> np.ndarray:
+    """Per-scenario dTau exactly as main.py chooses it."""
+    a = params["K"] / (params["C"] * params["Ro"])
+    dR = (params["Rmax"] - Rmin) / (nh - 1)
+    dTau = dR ** 2 / (0.5 * a)
+    nTime = (TauMax / dTau).astype(int) + 1
+    return TauMax / nTime
+
+
+def run_batch(
+        params: dict[str, np.ndarray], nh: int, TauMax: float, dTau: float,
+        output_times: np.ndarray, theta: float = 1.0,
+) -> np.ndarray:
+    """Centre and surface temperature at output_times, shape (B, n_out, 2)."""
+    solver = HeatingSolver(Rmin, params["Rmax"], nh, params["AlfaAir"], params["C"], params["Ro"], params["K"],
+                           dTau, theta=theta)
+    vrtxTemp = np.repeat(params["TempBegin"][:, None], nh, axis=1)
+    return run_series(solver, vrtxTemp, params["t1"], int(round(TauMax / dTau)), output_times)
+
+
+def _run_task(task: tuple) -> np.ndarray:
+    return run_batch(*task)
+
+
+def read_scenarios(path: str) -> dict[str, np.ndarray]:
+    with open(path, newline="", encoding="utf-8") as f:
+        records = list(csv.DictReader(f))
+    unknown = set(records[0]) - set(PARAMS) if records else set()
+    if unknown:
+        raise ValueError(f"Unknown columns in {path}: {', '.join(sorted(unknown))}")
+    return {
+        name: np.array([float(r[name]) if r.get(name) not in (None, "") else default for r in records])
+        for name, default in DEFAULTS.items()
+    }
+
+
+def run_ensemble(
+        params: dict[str, np.ndarray], nh: int, TauMax: float, output_times: np.ndarray,
+        dt: float | None = None, group_dt: bool = False, theta: float = 1.0,
+        workers: int = 1, chunk_size: int = 256,
+) -> np.ndarray:
+    """Results for every scenario, shape (B, n_out, 2), in input order."""
+    B = params["K"].shape[0]
+    natural = default_time_step(params, nh, TauMax)
+    if group_dt:
+        groups = [np.flatnonzero(natural == value) for value in np.unique(natural)]
+    else:
+        groups = [np.arange(B)]
+
+    tasks = []
+    task_rows = []
+    for rows in groups:
+        if dt is not None:
+            dTau = TauMax / (int(TauMax / dt) + 1)
+        else:
+            dTau = float(natural[rows].min())
+        for start in range(0, rows.shape[0], chunk_size):
+            chunk = rows[start:start + chunk_size]
+            tasks.append(({name: v[chunk] for name, v in params.items()}, nh, TauMax, dTau, output_times, theta))
+            task_rows.append(chunk)
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            solved = list(executor.map(_run_task, tasks))
+    else:
+        solved = [_run_task(task) for task in tasks]
+
+    results = np.empty((B, output_times.shape[0], 2))
+    for rows, out in zip(task_rows, solved):
+        results[rows] = out
+    return results
+
+
+def write_ensemble(path: str, params: dict[str, np.ndarray], output_times: np.ndarray, results: np.ndarray) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".npz"):
+        np.savez(path, times=output_times, results=results, **params)
+        return
+    headers = ["Scenariusz", *PARAMS, "Czas (s)", "Temperatura w osi (C)",
+               "Temperatura na powierzchni (C)", "Roznica dT (C)"]
+    with open(path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(headers)
+        for b in range(results.shape[0]):
+            inputs = [f"{params[name][b]:g}" for name in PARAMS]
+            for k, Tau in enumerate(output_times):
+                center, surface = results[b, k]
+                writer.writerow([b, *inputs, f"{Tau:.4f}", f"{center:.4f}", f"{surface:.4f}",
+                                 f"{abs(center - surface):.4f}"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched simulation of many heating scenarios.")
+    parser.add_argument("scenarios", help="CSV with columns " + ", ".join(PARAMS))
+    parser.add_argument("-o", "--output", default="dt_wyniki/ensemble.csv", help=".csv or .npz")
+    parser.add_argument("--nodes", type=int, default=51)
+    parser.add_argument("--time", type=float, default=1000.0)
+    parser.add_argument("--scheme", choices=sorted(SCHEMES), default="euler")
+    parser.add_argument("--dt", type=float, default=None, help="wspólny krok czasowy [s]")
+    parser.add_argument("--group-dt", action="store_true",
+                        help="grupuj scenariusze o identycznym domyślnym kroku zamiast kroku wspólnego")
+    parser.add_argument("--output-dt", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    params = read_scenarios(args.scenarios)
+    output_times = np.arange(0.0, args.time + 0.5 * args.output_dt, args.output_dt)
+    results = run_ensemble(
+        params, args.nodes, args.time, output_times,
+        dt=args.dt, group_dt=args.group_dt, theta=SCHEMES[args.scheme],
+        workers=args.workers, chunk_size=args.chunk_size,
+    )
+    write_ensemble(args.output, params, output_times, results)
+    print(f"{results.shape[0]} scenariuszy, wyniki zapisane do pliku: {args.output}")
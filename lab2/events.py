@@ -0,0 +1,109 @@
+"""Stopping events for lab2 runs.
+
+An event watches a scalar g(vrtxTemp) after every time step and fires when
+it crosses zero in the requested direction. The event time (and the centre
+and surface temperatures at that time) is refined by linear interpolation
+between the two steps around the crossing. The run can stop as soon as all
+requested events have fired.
+"""
+from typing import Callable
+
+import numpy as np
+
+
+class Event:
+    def __init__(
+            self, name: str,
+            g: Callable[[np.ndarray], float],
+            direction: int = 0,
+    ) -> None:
+        self.name: str = name
+        self.g: Callable[[np.ndarray], float] = g
+        self.direction: int = direction  # 1 rising, -1 falling, 0 any
+        self.Tau: float | None = None
+        self.t_center: float | None = None
+        self.t_surface: float | None = None
+
+    @property
+    def fired(self) -> bool:
+        return self.Tau is not None
+
+    def check(
+            self, Tau_prev: float, T_prev: np.ndarray, Tau: float, T: np.ndarray,
+    ) -> bool:
+        g0 = self.g(T_prev)
+        g1 = self.g(T)
+        crossed = (
+            (self.direction >= 0 and g0 < 0 <= g1)
+            or (self.direction <= 0 and g0 > 0 >= g1)
+        )
+        if not crossed:
+            return False
+        w = 1.0 if g1 == g0 else g0 / (g0 - g1)
+        self.Tau = Tau_prev + w * (Tau - Tau_prev)
+        self.t_center = T_prev[0] + w * (T[0] - T_prev[0])
+        self.t_surface = T_prev[-1] + w * (T[-1] - T_prev[-1])
+        return True
+
+
+class SteadyStateEvent(Event):
+    """Largest nodal change within one step, per second of that step,
+    drops below tol [C/s]. Dividing by the step length keeps the criterion
+    meaningful with adaptive steps. The event time is the end of the step.
+    """
+
+    def __init__(self, tol: float) -> None:
+        super().__init__(f"max |dT/dt| < {tol:g} C/s", lambda T: 0.0)
+        self.tol: float = tol
+
+    def check(
+            self, Tau_prev: float, T_prev: np.ndarray, Tau: float, T: np.ndarray,
+    ) -> bool:
+        if np.abs(T - T_prev).max() >= self.tol * (Tau - Tau_prev):
+            return False
+        self.Tau, self.t_center, self.t_surface = Tau, T[0], T[-1]
+        return True
+
+
+def target_temperature(location: str, value: float) -> Event:
+    """Centre (node 0) or surface (last node) reaches value."""
+    node = 0 if location == "center" else -1
+    return Event(f"T_{location} = {value:g} C", lambda T: T[node] - value)
+
+
+def delta_threshold(value: float) -> Event:
+    """Surface-centre difference drops below value (after the initial rise)."""
+    return Event(f"dT < {value:g} C", lambda T: abs(T[0] - T[-1]) - value, direction=-1)
+
+
+class EventMonitor:
+    def __init__(self, events: list[Event]) -> None:
+        self.events: list[Event] = events
+
+    @property
+    def done(self) -> bool:
+        return bool(self.events) and all(event.fired for event in self.events)
+
+    def update(self, Tau_prev: float, T_prev: np.ndarray, Tau: float, T: np.ndarray) -> bool:
+        """Check pending events after a step; True when all have fired."""
+        for event in self.events:
+            if not event.fired:
+                event.check(Tau_prev, T_prev, Tau, T)
+        return self.done
+
+    def state(self) -> list:
+        return [[event.Tau, event.t_center, event.t_surface] for event in self.events]
+
+    def restore(self, state: list) -> None:
+        for event, (Tau, t_center, t_surface) in zip(self.events, state):
+            event.Tau, event.t_center, event.t_surface = Tau, t_center, t_surface
+
+    def report(self) -> list[str]:
+        lines = []
+        for event in self.events:
+            if event.fired:
+                lines.append(f"{event.name}: t = {event.Tau:.4f} s "
+                             f"(oś {event.t_center:.4f} C, powierzchnia {event.t_surface:.4f} C)")
+            else:
+                lines.append(f"{event.name}: nie wystąpiło")
+        return lines
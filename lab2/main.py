@@ -1,152 +1,321 @@
-import matplotlib.pyplot as plt
-import csv
 import time
-import argparse 
-from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import sys
+from multiprocessing import Process
+from pathlib import Path
+
+import numpy as np
+from checkpoint import check_parameters, load_checkpoint, save_checkpoint
+from events import EventMonitor, SteadyStateEvent, delta_threshold, target_temperature
+from output import ResultWriter
+from plots import DOWNSAMPLE, plot_report
+from problem import AlfaAir, C, K, Rmax, Rmin, Ro, TempBegin, t1, t2
+from schedule import default_schedule, read_schedule
+from snapshots import SnapshotStore
+from solver import SCHEMES, AdaptiveStepper, HeatingSolver
+
+# metrics.py jest wspólny z lab1
+sys.path.append(str(Path(__file__).resolve().parent.parent / "lab1"))
+from metrics import Metrics  # noqa: E402
 
 parser = argparse.ArgumentParser()
 parser.add_argument('--nodes', type=int, default=51)
 parser.add_argument('--time', type=float, default=1000.0)
+parser.add_argument('--tau1', type=float, default=0.0,
+                    help='czas [s] w temperaturze t2 przed nagrzewaniem (jak Tau1 w temp1d.f90)')
+parser.add_argument('--schedule', default=None,
+                    help='plik CSV z etapami (name,duration,TempAir,AlfaAir); zastępuje --time i --tau1')
+parser.add_argument('--scheme', choices=sorted(SCHEMES), default='euler',
+                    help='euler = backward Euler (theta=1), cn = Crank-Nicolson (theta=0.5)')
+parser.add_argument('--order', type=int, choices=[1, 2], default=1,
+                    help='rząd elementów: 1 liniowe, 2 kwadratowe (nieparzysta liczba węzłów)')
+parser.add_argument('--dt', type=float, default=None,
+                    help='krok czasowy [s]; domyślnie dR^2 / (0.5 a)')
+parser.add_argument('--adaptive', action='store_true',
+                    help='adaptacyjny krok czasowy (kontrola błędu lokalnego)')
+parser.add_argument('--tol', type=float, default=0.1,
+                    help='dopuszczalny błąd lokalny kroku [C] w trybie --adaptive')
+parser.add_argument('--dt-max', type=float, default=None,
+                    help='maksymalny krok czasowy [s] w trybie --adaptive')
+parser.add_argument('--format', choices=['csv', 'npy'], default='csv',
+                    help='format pliku wyników (npy = binarny float64)')
+parser.add_argument('--every', type=int, default=1,
+                    help='zapisuj co N-ty krok czasowy')
+parser.add_argument('--output-times', type=float, nargs='+', default=None,
+                    help='zapisuj tylko w podanych chwilach [s] (interpolacja liniowa)')
+parser.add_argument('--output-dt', type=float, default=None,
+                    help='zapisuj co podany odstęp czasu [s] (interpolacja liniowa)')
+parser.add_argument('--stop-center', type=float, default=None,
+                    help='zatrzymaj, gdy temperatura w osi osiągnie podaną wartość [C]')
+parser.add_argument('--stop-surface', type=float, default=None,
+                    help='zatrzymaj, gdy temperatura na powierzchni osiągnie podaną wartość [C]')
+parser.add_argument('--stop-dt', type=float, default=None,
+                    help='zatrzymaj, gdy różnica dT spadnie poniżej podanej wartości [C]')
+parser.add_argument('--steady-tol', type=float, default=None,
+                    help='zatrzymaj w stanie ustalonym: max |dT/dt| poniżej podanej wartości [C/s]')
+parser.add_argument('--snapshots', action='store_true',
+                    help='zapisuj pełne pole temperatury do dt_wyniki/snapshots_{nodes}.npy')
+parser.add_argument('--snapshot-every', type=int, default=None,
+                    help='migawka co N kroków czasowych')
+parser.add_argument('--snapshot-dt', type=float, default=None,
+                    help='migawka co podany odstęp czasu [s]')
+parser.add_argument('--snapshot-max', type=int, default=10000,
+                    help='maksymalna liczba migawek (gdy nie wynika z parametrów)')
+parser.add_argument('--checkpoint-every', type=int, default=None,
+                    help='zapisuj punkt kontrolny co N kroków czasowych (dt_wyniki/checkpoint_{nodes}.npz)')
+parser.add_argument('--resume', action='store_true',
+                    help='kontynuuj od ostatniego punktu kontrolnego (ten sam lub dłuższy --time)')
+parser.add_argument('--max-steps', type=int, default=None,
+                    help='przerwij po podanej łącznej liczbie kroków z punktem kontrolnym (dalej: --resume)')
+parser.add_argument('--metrics', action='store_true',
+                    help='mierz czasy faz i zapisz dt_wyniki/metrics_{nodes}.json')
+parser.add_argument('--profile', action='store_true',
+                    help='uruchom pod cProfile (dt_wyniki/profile_{nodes}.prof, włącza --metrics)')
+parser.add_argument('--plot-points', type=int, default=2000,
+                    help='liczba punktów na linię wykresu po próbkowaniu')
+parser.add_argument('--plot-method', choices=sorted(DOWNSAMPLE), default='minmax',
+                    help='metoda próbkowania wykresów (minmax lub lttb)')
+parser.add_argument('--no-plot', action='store_true', help='bez wykresów')
 args = parser.parse_args()
 
-# Parametry
-Rmin = 0.0
-Rmax = 0.05
-AlfaAir = 300.0
-TempBegin = 100.0
-t1 = 1200.0
-t2 = 25.0
-C = 700.0
-Ro = 7800.0
-K = 25.0
-Tau1 = 0.0
+# Parametry (Rmin, Rmax, AlfaAir, TempBegin, t1, t2, C, Ro, K z problem.py)
+Tau1 = args.tau1
 Tau2 = args.time
 
 nh = args.nodes
 ne = nh - 1
-Np = 2
 a = K / (C * Ro)
 
-E = [-0.5773502692, 0.5773502692]
-W = [1.0, 1.0]
-N1 = [0.5 * (1 - e) for e in E]
-N2 = [0.5 * (1 + e) for e in E]
-
 dR = (Rmax - Rmin) / ne
-dTau = dR ** 2 / (0.5 * a)
-TauMax = Tau1 + Tau2
-nTime = int(TauMax / dTau) + 1
-dTau = TauMax / nTime
+dTau = dR ** 2 / (0.5 * a) if args.dt is None else args.dt
+if args.schedule is not None:
+    schedule = read_schedule(args.schedule, AlfaAir)
+else:
+    schedule = default_schedule(t1, t2, Tau1, Tau2, AlfaAir)
+TauMax = schedule.end
+# wspólny krok dla wszystkich etapów; kroki kończą się na granicach etapów
+plan = schedule.plan(dTau)
+dTau = plan[0][2]
 
-vrtxCoordX = [Rmin + i * dR for i in range(nh)]
-vrtxTemp = [TempBegin] * nh
+os.makedirs("dt_wyniki", exist_ok=True)
+os.makedirs("dt_wykresy", exist_ok=True)
+checkpoint_path = f"dt_wyniki/checkpoint_{nh}.npz"
+run_params = {name: value for name, value in vars(args).items()
+              if name not in ("time", "resume", "checkpoint_every", "max_steps", "metrics", "profile",
+                              "plot_points", "plot_method", "no_plot")}
+if args.schedule is not None:
+    run_params["schedule"] = schedule.as_list()
 
-time_history = []
-t_center_history = []
-t_surface_history = []
-dT_list_history = []
+saved = None
+if args.resume:
+    vrtxTemp, saved = load_checkpoint(checkpoint_path)
+    check_parameters(saved["params"], run_params)
+    if TauMax < saved["Tau"] - 1e-9 * TauMax:
+        raise ValueError(f"--time {TauMax:g} jest krótszy niż czas punktu kontrolnego {saved['Tau']:g} s")
+    dTau = saved["dTau"]
+    if TauMax != saved["TauMax"]:
+        # dłuższy przebieg: etapy przed punktem kontrolnym jak w zapisanym planie, bieżący etap
+        # zachowuje krok z punktu kontrolnego i dostaje dodatkowe kroki (ostatni skrócony)
+        first = 0
+        for k, (stage, (n_stage, dt_stage, dt_last)) in enumerate(zip(schedule.stages, saved["plan"])):
+            stage_end = schedule.starts[k] + stage.duration
+            if saved["Tau"] < stage_end - 1e-9 * TauMax or k == len(plan) - 1:
+                remaining = stage_end - saved["Tau"]
+                extra = int(np.ceil(remaining / dTau - 1e-9))
+                dt_last = remaining - (extra - 1) * dTau
+                plan[k] = (stage, saved["step"] - first + extra, dTau,
+                           dTau if abs(dt_last - dTau) <= 1e-9 * dTau else dt_last)
+                break
+            plan[k] = (stage, n_stage, dt_stage, dt_last)
+            first += n_stage
+nTime = sum(n_stage for _, n_stage, _, _ in plan)
 
+# krok startowy (w trybie adaptacyjnym od niego zależy dt_min)
+dt_first = dTau if saved is None else saved["dt_first"]
+
+metrics = Metrics(enabled=args.metrics, profile_path=f"dt_wyniki/profile_{nh}.prof" if args.profile else None)
+metrics.start()
+# assembly i każda faktoryzacja (także w kroku adaptacyjnym) mierzone w solverze
+solver = HeatingSolver(Rmin, Rmax, nh, schedule.stages[0].AlfaAir, C, Ro, K, dTau,
+                       theta=SCHEMES[args.scheme], order=args.order, phase=metrics.phase)
 Tau = 0.0
+n_steps = 0
+if saved is None:
+    vrtxTemp = np.full(nh, TempBegin)
+else:
+    Tau = saved["Tau"]
+    n_steps = saved["step"]
+
+filename = f"dt_wyniki/wyniki_symulacji_{nh}.{args.format}"
+output_times = args.output_times
+if args.output_dt is not None:
+    output_times = list(np.arange(0.0, TauMax + 0.5 * args.output_dt, args.output_dt))
+# zapis do pliku (pełny bufor, punkt kontrolny, zamknięcie) mierzony w fazie "io"
+writer = ResultWriter(filename, fmt=args.format, every=args.every, times=output_times,
+                      resume=saved and saved["writer"], phase=metrics.phase)
+
+snapshots = None
+if args.snapshots:
+    if args.snapshot_dt is not None:
+        n_snapshots = int(TauMax / args.snapshot_dt) + 2
+    elif not args.adaptive:
+        n_snapshots = nTime // (args.snapshot_every or 1) + 2
+    else:
+        n_snapshots = args.snapshot_max
+    snapshots = SnapshotStore(
+        f"dt_wyniki/snapshots_{nh}.npy", min(n_snapshots, args.snapshot_max), solver.vrtxCoordX,
+        meta={"dTau": dt_first, "scheme": args.scheme, "order": args.order, "adaptive": args.adaptive,
+              "AlfaAir": AlfaAir, "TempBegin": TempBegin, "t1": t1, "t2": t2,
+              "C": C, "Ro": Ro, "K": K, "Tau1": Tau1, "Tau2": Tau2, "schedule": schedule.as_list()},
+        every=args.snapshot_every, dt=args.snapshot_dt,
+        resume=saved and saved["snapshots"],
+    )
+
+
+def record(Tau, vrtxTemp, force=False):
+    with metrics.phase("record"):
+        writer.record(Tau, vrtxTemp[0], vrtxTemp[-1], force=force)
+        if snapshots is not None:
+            snapshots.record(Tau, vrtxTemp, force=force)
+
 
-print(f"Krok czasowy dt = {dTau:.4f} s\nne={ne}")
+events = []
+if args.stop_center is not None:
+    events.append(target_temperature("center", args.stop_center))
+if args.stop_surface is not None:
+    events.append(target_temperature("surface", args.stop_surface))
+if args.stop_dt is not None:
+    events.append(delta_threshold(args.stop_dt))
+if args.steady_tol is not None:
+    events.append(SteadyStateEvent(args.steady_tol))
+monitor = EventMonitor(events)
+if saved is not None:
+    monitor.restore(saved["events"])
+
+
+def checkpoint(Tau, vrtxTemp, n_steps, dTau, rejected=0):
+    """Zapisywany przed record(Tau), więc po wznowieniu wiersze się nie powtarzają."""
+    with metrics.phase("checkpoint"):
+        save_checkpoint(checkpoint_path, vrtxTemp, {
+            "Tau": Tau, "step": n_steps, "nTime": nTime, "TauMax": TauMax, "dTau": dTau,
+            "dt_first": dt_first, "rejected": rejected, "params": run_params,
+            "plan": [[n_stage, dt_stage, dt_last] for _, n_stage, dt_stage, dt_last in plan],
+            "writer": writer.state(),
+            "snapshots": snapshots.state() if snapshots is not None else None,
+            "events": monitor.state(),
+        })
+
+
+def checkpoint_due(n_steps):
+    return args.checkpoint_every is not None and n_steps % args.checkpoint_every == 0 \
+        and (saved is None or n_steps != saved["step"])
+
+
+def finished(n_steps):
+    """Sprawdzane przed każdym krokiem, także zaraz po wznowieniu z punktu
+    kontrolnego zapisanego po zdarzeniu, więc nie robimy kroku za dużo."""
+    return monitor.done or n_steps == args.max_steps
+
+print(f"Krok czasowy dt = {dTau:.4f} s ({args.scheme}{', adaptacyjny' if args.adaptive else ''})\nne={ne}")
+if len(schedule.stages) > 1:
+    for (stage, n_stage, dt_stage, dt_last), stage_start in zip(plan, schedule.starts):
+        steps = f", {n_stage} kroków" + (f" (ostatni {dt_last:.4f} s)" if dt_last != dt_stage else "")
+        print(f"  {stage.name}: od {stage_start:g} s przez {stage.duration:g} s, TempAir = {stage.TempAir:g} C, "
+              f"AlfaAir = {stage.AlfaAir:g}" + ("" if args.adaptive else steps))
+if saved is not None:
+    print(f"Wznowienie od punktu kontrolnego: t = {Tau:.4f} s, krok {n_steps}")
 start = time.time()
-while Tau <= TauMax:
-    time_history.append(Tau)
-    t_center_history.append(vrtxTemp[0])
-    t_surface_history.append(vrtxTemp[-1])
-    dT_list_history.append(abs(vrtxTemp[0] - vrtxTemp[-1]))
-
-    aC = [0.0] * nh
-    aD = [0.0] * nh
-    aE = [0.0] * nh
-    aB = [0.0] * nh
-
-    TempAir = t1  # stała temperatura otoczenia
-
-    def assemble_element(ie):
-        r1 = vrtxCoordX[ie]
-        r2 = vrtxCoordX[ie + 1]
-        t1e = vrtxTemp[ie]
-        t2e = vrtxTemp[ie + 1]
-        dR_local = r2 - r1
-        Alfa = AlfaAir if ie == ne - 1 else 0.0
-
-        Ke = [[0.0, 0.0], [0.0, 0.0]]
-        Fe = [0.0, 0.0]
-
-        for ip in range(Np):
-            Rp = N1[ip] * r1 + N2[ip] * r2
-            TpTau = N1[ip] * t1e + N2[ip] * t2e
-
-            Ke[0][0] += K * Rp * W[ip] / dR_local + C * Ro * dR_local * Rp * W[ip] * N1[ip] ** 2 / dTau
-            Ke[0][1] += -K * Rp * W[ip] / dR_local + C * Ro * dR_local * Rp * W[ip] * N1[ip] * N2[ip] / dTau
-            Ke[1][0] = Ke[0][1]
-            Ke[1][1] += K * Rp * W[ip] / dR_local + C * Ro * dR_local * Rp * W[ip] * N2[ip] ** 2 / dTau + 2 * Alfa * Rmax
-
-            Fe[0] += C * Ro * dR_local * TpTau * Rp * W[ip] * N1[ip] / dTau
-            Fe[1] += C * Ro * dR_local * TpTau * Rp * W[ip] * N2[ip] / dTau + 2 * Alfa * Rmax * TempAir
-
-        return ie, Ke, Fe
-
-    with ThreadPoolExecutor() as executor:
-        results = executor.map(assemble_element, range(ne))
-
-    for ie, Ke, Fe in results:
-        aD[ie] += Ke[0][0]
-        aD[ie + 1] += Ke[1][1]
-        aE[ie] += Ke[0][1]
-        aC[ie + 1] += Ke[1][0]
-        aB[ie] += Fe[0]
-        aB[ie + 1] += Fe[1]
-
-    # Rozwiązanie układu równań metodą Thomasa
-    for i in range(1, nh):
-        m = aC[i] / aD[i - 1]
-        aD[i] -= m * aE[i - 1]
-        aB[i] -= m * aB[i - 1]
-
-    aB[-1] /= aD[-1]
-    for i in range(nh - 2, -1, -1):
-        aB[i] = (aB[i] - aE[i] * aB[i + 1]) / aD[i]
-
-    vrtxTemp = aB
-    Tau += dTau
+if args.adaptive:
+    stepper = AdaptiveStepper(solver, args.tol, dt_min=dt_first / 2 ** 20, dt_max=args.dt_max or TauMax)
+    if saved is not None:
+        stepper.rejected = saved["rejected"]
+    for stage, stage_start in zip(schedule.stages, schedule.starts):
+        stage_end = stage_start + stage.duration
+        if finished(n_steps):
+            break
+        if stage_end - Tau <= 1e-9 * TauMax:
+            continue
+        solver.set_convection(stage.AlfaAir, min(dTau, stage_end - Tau))
+        while stage_end - Tau > 1e-9 * TauMax and not finished(n_steps):
+            if checkpoint_due(n_steps):
+                checkpoint(Tau, vrtxTemp, n_steps, dTau, stepper.rejected)
+            record(Tau, vrtxTemp)
+            prev_Tau, prev_Temp = Tau, vrtxTemp
+            with metrics.phase("solve"):
+                vrtxTemp, dt_taken, dTau, _ = stepper.advance(vrtxTemp, stage.TempAir, min(dTau, stage_end - Tau))
+            Tau += dt_taken
+            n_steps += 1
+            with metrics.phase("events"):
+                monitor.update(prev_Tau, prev_Temp, Tau, vrtxTemp)
+    print(f"Kroki: {n_steps} (odrzucone: {stepper.rejected})")
+else:
+    first = 0
+    for stage, n_stage, dTau, dt_last in plan:
+        if finished(n_steps):
+            break
+        if n_steps >= first + n_stage:
+            first += n_stage
+            continue
+        # nowa faktoryzacja tylko przy nowej parze (krok, AlfaAir)
+        solver.set_convection(stage.AlfaAir, dTau)
+        for iTime in range(n_steps - first, n_stage):
+            if finished(n_steps):
+                break
+            if checkpoint_due(n_steps):
+                checkpoint(Tau, vrtxTemp, n_steps, dTau)
+            record(Tau, vrtxTemp)
+            prev_Tau, prev_Temp = Tau, vrtxTemp
+            if iTime == n_stage - 1 and dt_last != dTau:
+                # skrócony ostatni krok kończy etap na jego granicy
+                solver.set_time_step(dt_last)
+            with metrics.phase("solve"):
+                vrtxTemp = solver.step(vrtxTemp, stage.TempAir)
+            Tau += solver.dTau
+            n_steps += 1
+            with metrics.phase("events"):
+                monitor.update(prev_Tau, prev_Temp, Tau, vrtxTemp)
+        first += n_stage
+if not monitor.done and n_steps == args.max_steps and TauMax - Tau > 1e-9 * TauMax:
+    # przerwanie po --max-steps: punkt kontrolny bez końcowego wiersza, dalej --resume
+    checkpoint(Tau, vrtxTemp, n_steps, dTau, stepper.rejected if args.adaptive else 0)
+    writer.close()
+    if snapshots is not None:
+        snapshots.close()
+    print(f"Przerwano po {n_steps} krokach (t = {Tau:.4f} s), punkt kontrolny: {checkpoint_path}")
+    sys.exit(0)
+if args.checkpoint_every is not None:
+    # końcowy punkt kontrolny pozwala przedłużyć przebieg (--resume z dłuższym --time)
+    checkpoint(Tau, vrtxTemp, n_steps, dTau, stepper.rejected if args.adaptive else 0)
+record(Tau, vrtxTemp, force=True)
+writer.close()
+if snapshots is not None:
+    with metrics.phase("io"):
+        snapshots.close()
+if snapshots is not None:
+    print(f"Migawki pola temperatury: {snapshots.path} ({len(snapshots.times)})")
 
 end = time.time()-start
+
+# Wykresy (backend Agg) z zamkniętego pliku wyników w osobnym procesie, bez czekania
+# na niego; proces nie jest demonem, więc interpreter poczeka na jego koniec przy wyjściu
+if not args.no_plot:
+    plotter = Process(target=plot_report, args=(filename, "dt_wykresy", str(end), args.plot_points, args.plot_method))
+    with metrics.phase("plot"):
+        plotter.start()
+
 print(f"Czas: {end:2f}s")
+for line in monitor.report():
+    print(line)
+if monitor.done:
+    print(f"Wszystkie zdarzenia wystąpiły, obliczenia zatrzymane w t = {Tau:.4f} s")
+print(f"Wyniki zostały zapisane do pliku: {filename} ({writer.n_rows} wierszy)")
 
-# Zapis do CSV
-filename = f"dt_wyniki/wyniki_symulacji_{nh}.csv"
-headers = ['Czas (s)', 'Temperatura w osi (C)', 'Temperatura na powierzchni (C)', 'Roznica dT (C)']
-
-with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerow(headers)
-    for row in zip(time_history, t_center_history, t_surface_history, dT_list_history):
-        writer.writerow([f"{val:.4f}" for val in row])
-
-print(f"Wyniki zostały zapisane do pliku: {filename}")
-
-# Wykresy
-plt.figure(figsize=(10, 7))
-plt.plot(time_history, t_surface_history, label="1 – na powierzchni wsadu")
-plt.plot(time_history, t_center_history, label="2 – w osi wsadu")
-plt.xlabel("Czas [s]")
-plt.ylabel("Temperatura [°C]")
-plt.title("Wyniki obliczenia nagrzewania wsadu o przekroju okrągłym")
-plt.grid(True)
-plt.legend()
-plt.tight_layout()
-plt.savefig(f"dt_wykresy/temperatura_{nh}_{end}.png")
-# plt.show()
-
-plt.figure(figsize=(10, 7))
-plt.plot(time_history, dT_list_history, label="ΔT", color="black")
-plt.xlabel("Czas [s]")
-plt.ylabel("Różnica temperatur [°C]")
-plt.title("ΔT między powierzchnią a osią")
-plt.grid(True)
-plt.legend()
-plt.tight_layout()
-plt.savefig(f"dt_wykresy/delta_{nh}_{end}.png")
-# plt.show()
+if metrics.enabled:
+    metrics.stop(steps=n_steps - (saved["step"] if saved is not None else 0), elapsed=end)
+    metrics.set("nodes", nh)
+    metrics.set("factorisations", solver.n_factorisations)
+    metrics.set("rows", writer.n_rows)
+    metrics.write(f"dt_wyniki/metrics_{nh}.json")
+    print(metrics.summary())
+    print(f"Metryki zapisane do pliku: dt_wyniki/metrics_{nh}.json")
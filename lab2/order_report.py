@@ -0,0 +1,47 @@
+"""Convergence report: linear vs quadratic elements.
+
+Centre and surface temperature errors (max over the output times) against
+the node count for both element orders. All runs use the same backward Euler
+step (Crank-Nicolson rings at the surface after the jump in ambient
+temperature), so only the spatial error differs; the reference is a fine
+quadratic mesh. The last columns show how many steps the default dR^2 / (0.5 a) rule
+would need for that mesh.
+
+    python order_report.py
+"""
+import argparse
+import time
+
+import numpy as np
+from problem import AlfaAir, C, K, Rmax, Rmin, Ro, TempBegin, run_series, t1, time_step
+from solver import HeatingSolver
+
+
+def run(nh: int, order: int, TauMax: float, dt: float, output_times: np.ndarray) -> tuple[np.ndarray, float]:
+    """Centre/surface temperatures at output_times, shape (n_out, 2), and the wall time."""
+    start = time.perf_counter()
+    nTime, dTau = time_step(nh, TauMax, dt)
+    solver = HeatingSolver(Rmin, Rmax, nh, AlfaAir, C, Ro, K, dTau, theta=1.0, order=order)
+    out = run_series(solver, np.full(nh, TempBegin), t1, nTime, output_times)
+    return out, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--time', type=float, default=1000.0)
+    parser.add_argument('--dt', type=float, default=1.0)
+    parser.add_argument('--output-dt', type=float, default=10.0)
+    parser.add_argument('--linear', type=int, nargs='+', default=[5, 9, 17, 33, 65, 129, 257])
+    parser.add_argument('--quadratic', type=int, nargs='+', default=[5, 9, 17, 33, 65])
+    parser.add_argument('--reference', type=int, default=1025, help='węzły siatki odniesienia (kwadratowej)')
+    args = parser.parse_args()
+
+    output_times = np.arange(0.0, args.time + 0.5 * args.output_dt, args.output_dt)
+    ref, _ = run(args.reference, 2, args.time, args.dt, output_times)
+
+    print(f"{'rząd':>4} {'węzły':>6} {'błąd oś [C]':>12} {'błąd pow. [C]':>14} {'czas [s]':>9} {'kroki dR^2/(0.5a)':>18}")
+    for order, nodes in ((1, args.linear), (2, args.quadratic)):
+        for nh in nodes:
+            res, elapsed = run(nh, order, args.time, args.dt, output_times)
+            err = np.abs(res - ref).max(axis=0)
+            print(f"{order:>4} {nh:>6} {err[0]:>12.4f} {err[1]:>14.4f} {elapsed:>9.3f} {time_step(nh, args.time)[0]:>18}")
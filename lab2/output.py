@@ -0,0 +1,173 @@
+"""Streaming result output for the lab2 simulation.
+
+Rows (time, centre temperature, surface temperature, dT) are buffered and
+flushed in batches while the simulation runs, so memory does not grow with
+the run length. Output can be decimated to every N-th step or to requested
+output times (linear interpolation between the neighbouring steps).
+
+Formats: "csv" (same layout as before) and "npy" (float64, shape (n, 4),
+readable with np.load(path, mmap_mode="r")).
+"""
+import csv
+import struct
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Iterable
+
+import numpy as np
+
+HEADERS = ['Czas (s)', 'Temperatura w osi (C)', 'Temperatura na powierzchni (C)', 'Roznica dT (C)']
+# stała długość nagłówka .npy, żeby po zakończeniu dopisać końcowy kształt
+NPY_HEADER_LEN = 128
+
+
+def _npy_header(n_rows: int) -> bytes:
+    header = "{'descr': '<f8', 'fortran_order': False, 'shape': (%d, 4), }" % n_rows
+    pad = NPY_HEADER_LEN - 10 - len(header) - 1
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", NPY_HEADER_LEN - 10) + (header + " " * pad + "\n").encode("latin1")
+
+
+class OutputSampler:
+    """Values of a time-stepped run at requested output times.
+
+    sample() is called once per step with the step time and the values
+    (a float or an array of any shape) and returns (time, values) for every
+    requested time in (previous step, Tau], interpolated linearly between
+    the two steps. With force=True (the last step) times up to Tau plus
+    the round-off of summing dTau are included.
+    """
+
+    def __init__(self, times: Iterable[float], next_time: int = 0, prev: tuple | None = None) -> None:
+        self.times: list[float] = sorted(times)
+        self.next_time: int = next_time
+        # (Tau, values) of the previous step
+        self.prev: tuple | None = prev
+
+    def sample(self, Tau: float, values, force: bool = False) -> list[tuple[float, object]]:
+        rows = []
+        limit = Tau + 1e-9 * max(1.0, abs(Tau)) if force else Tau
+        while self.next_time < len(self.times) and self.times[self.next_time] <= limit:
+            target = self.times[self.next_time]
+            if self.prev is None or Tau == self.prev[0]:
+                rows.append((target, values))
+            else:
+                T0, v0 = self.prev
+                rows.append((target, v0 + (target - T0) / (Tau - T0) * (values - v0)))
+            self.next_time += 1
+        self.prev = (Tau, values)
+        return rows
+
+
+class ResultWriter:
+    def __init__(
+            self, path: str,
+            fmt: str = "csv",
+            every: int = 1,
+            times: Iterable[float] | None = None,
+            buffer_rows: int = 4096,
+            resume: dict | None = None,
+            phase: Callable[[str], ContextManager] = lambda name: nullcontext(),
+    ) -> None:
+        if fmt not in ("csv", "npy"):
+            raise ValueError(f"Unknown output format: {fmt}")
+        self.path: str = path
+        self.fmt: str = fmt
+        self.every: int = every
+        self.buffer_rows: int = buffer_rows
+        # times every write to the file as "io" (e.g. Metrics.phase)
+        self.phase: Callable[[str], ContextManager] = phase
+
+        self.n_rows: int = 0
+        self._step: int = 0
+        self._sampler: OutputSampler | None = OutputSampler(times) if times is not None else None
+        self._buffer: list[tuple[float, float, float, float]] = []
+
+        if resume is not None:
+            # kontynuacja od punktu kontrolnego: obcinamy plik do zapisanej pozycji
+            self.n_rows = resume["n_rows"]
+            self._step = resume["step"]
+            if self._sampler is not None:
+                self._sampler.next_time = resume["next_time"]
+                if resume["prev"] is not None:
+                    Tau, t_center, t_surface = resume["prev"]
+                    self._sampler.prev = (Tau, np.array((t_center, t_surface)))
+            if fmt == "csv":
+                self._file = open(path, "r+", newline="", encoding="utf-8")
+                self._csv = csv.writer(self._file)
+            else:
+                self._file = open(path, "r+b")
+            self._file.seek(resume["position"])
+            self._file.truncate()
+        elif fmt == "csv":
+            self._file = open(path, "w", newline="", encoding="utf-8")
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(HEADERS)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_npy_header(0))
+
+    def record(self, Tau: float, t_center: float, t_surface: float, force: bool = False) -> None:
+        """Called once per time step; writes the row if it is due."""
+        if self._sampler is None:
+            if force or self._step % self.every == 0:
+                self._append(Tau, t_center, t_surface)
+        else:
+            for target, (c, s) in self._sampler.sample(Tau, np.array((t_center, t_surface)), force):
+                self._append(target, c, s)
+        self._step += 1
+
+    def _append(self, Tau: float, t_center: float, t_surface: float) -> None:
+        self._buffer.append((Tau, t_center, t_surface, abs(t_center - t_surface)))
+        self.n_rows += 1
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.phase("io"):
+            self._write_buffer()
+
+    def _write_buffer(self) -> None:
+        if not self._buffer:
+            return
+        if self.fmt == "csv":
+            self._csv.writerows([f"{val:.4f}" for val in row] for row in self._buffer)
+        else:
+            self._file.write(np.array(self._buffer, dtype="<f8").tobytes())
+        self._file.flush()
+        self._buffer.clear()
+
+    def state(self) -> dict:
+        """Flush and return what a checkpoint needs to continue this file."""
+        self.flush()
+        sampler = self._sampler
+        prev = None
+        if sampler is not None and sampler.prev is not None:
+            Tau, (t_center, t_surface) = sampler.prev
+            prev = (Tau, float(t_center), float(t_surface))
+        return {
+            "position": self._file.tell(),
+            "n_rows": self.n_rows,
+            "step": self._step,
+            "next_time": sampler.next_time if sampler is not None else 0,
+            "prev": prev,
+        }
+
+    def close(self) -> None:
+        with self.phase("io"):
+            self._write_buffer()
+            if self.fmt == "npy":
+                self._file.seek(0)
+                self._file.write(_npy_header(self.n_rows))
+            self._file.close()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_results(path: str) -> np.ndarray:
+    """Rows written by ResultWriter as an (n, 4) array (memory-mapped for npy)."""
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    return np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
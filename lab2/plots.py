@@ -0,0 +1,149 @@
+"""Plots of lab2 results, downsampled and rendered off the simulation path.
+
+The series are read back from the results file (memory-mapped for .npy),
+reduced to about --points points per line and drawn with the Agg backend,
+so the rendering time does not grow with the number of time steps.
+Downsampling keeps the shape of the curve:
+
+- "minmax": the lowest and highest sample of every bucket (keeps every peak),
+- "lttb":   Largest-Triangle-Three-Buckets, one sample per bucket chosen to
+            keep the largest triangle area with its neighbours.
+
+main.py starts plot_report in a separate process once the results file is
+closed and does not wait for it; the process reports the PNG paths (or the
+error) when it is done. The same can be done by hand:
+
+    python plots.py dt_wyniki/wyniki_symulacji_501.npy --points 2000
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from output import read_results
+
+
+def minmax_indices(y: np.ndarray, n_points: int) -> np.ndarray:
+    """Indices of the min and max of n_points // 2 equal buckets plus both ends."""
+    n = y.shape[0]
+    if n <= n_points:
+        return np.arange(n)
+    buckets = max(1, n_points // 2)
+    size = -(-n // buckets)
+    padded = np.empty(buckets * size)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    rows = padded.reshape(buckets, size)
+    base = np.arange(buckets) * size
+    idx = np.concatenate([[0, n - 1], base + rows.argmin(axis=1), base + rows.argmax(axis=1)])
+    return np.unique(np.minimum(idx, n - 1))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets; the first and last sample are always kept."""
+    n = x.shape[0]
+    if n <= n_points or n_points < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_points - 1).astype(int)
+    idx = np.empty(n_points, dtype=int)
+    idx[0] = 0
+    idx[-1] = n - 1
+    a = 0
+    for i in range(n_points - 2):
+        start, stop = edges[i], edges[i + 1]
+        # średnia następnego kubełka (lub ostatni punkt)
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], edges[i + 2])
+            cx, cy = x[nxt].mean(), y[nxt].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        xs = x[start:stop]
+        ys = y[start:stop]
+        area = np.abs((x[a] - cx) * (ys - y[a]) - (x[a] - xs) * (cy - y[a]))
+        a = start + int(area.argmax())
+        idx[i + 1] = a
+    return idx
+
+
+DOWNSAMPLE = {
+    "minmax": lambda x, y, n: minmax_indices(y, n),
+    "lttb": lttb_indices,
+}
+
+
+def downsample(x: np.ndarray, y: np.ndarray, n_points: int, method: str = "minmax") -> tuple[np.ndarray, np.ndarray]:
+    idx = DOWNSAMPLE[method](x, y, n_points)
+    return x[idx], y[idx]
+
+
+def plot_results(
+        path: str, out_dir: str = "dt_wykresy", tag: str = "",
+        n_points: int = 2000, method: str = "minmax",
+) -> tuple[str, str, float]:
+    """Draw both figures from a results file; returns the PNG paths and render time."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    results = read_results(path)
+    time_history = np.asarray(results[:, 0])
+    t_center_history = np.asarray(results[:, 1])
+    t_surface_history = np.asarray(results[:, 2])
+    dT_list_history = np.asarray(results[:, 3])
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0].replace("wyniki_symulacji_", "")
+    suffix = f"{stem}_{tag}" if tag else stem
+
+    # Wykresy
+    plt.figure(figsize=(10, 7))
+    plt.plot(*downsample(time_history, t_surface_history, n_points, method), label="1 – na powierzchni wsadu")
+    plt.plot(*downsample(time_history, t_center_history, n_points, method), label="2 – w osi wsadu")
+    plt.xlabel("Czas [s]")
+    plt.ylabel("Temperatura [°C]")
+    plt.title("Wyniki obliczenia nagrzewania wsadu o przekroju okrągłym")
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
+    temperature_png = os.path.join(out_dir, f"temperatura_{suffix}.png")
+    plt.savefig(temperature_png)
+    plt.close()
+
+    plt.figure(figsize=(10, 7))
+    plt.plot(*downsample(time_history, dT_list_history, n_points, method), label="ΔT", color="black")
+    plt.xlabel("Czas [s]")
+    plt.ylabel("Różnica temperatur [°C]")
+    plt.title("ΔT między powierzchnią a osią")
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
+    delta_png = os.path.join(out_dir, f"delta_{suffix}.png")
+    plt.savefig(delta_png)
+    plt.close()
+    return temperature_png, delta_png, time.perf_counter() - start
+
+
+def plot_report(
+        path: str, out_dir: str = "dt_wykresy", tag: str = "",
+        n_points: int = 2000, method: str = "minmax",
+) -> None:
+    """plot_results for a background process: prints the PNG paths or the error."""
+    try:
+        temperature_png, delta_png, elapsed = plot_results(path, out_dir, tag, n_points, method)
+    except Exception as e:  # wyniki są już zapisane, proces główny nie czeka na wykresy
+        print(f"Błąd rysowania wykresów: {type(e).__name__}: {e}", flush=True)
+        raise SystemExit(1)
+    print(f"Wykresy zapisane do plików: {temperature_png}, {delta_png} ({elapsed:.3f} s)", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Downsampled plots of a lab2 results file.")
+    parser.add_argument("results", help="dt_wyniki/wyniki_symulacji_{nodes}.csv lub .npy")
+    parser.add_argument("--out-dir", default="dt_wykresy")
+    parser.add_argument("--tag", default="")
+    parser.add_argument("--points", type=int, default=2000, help="docelowa liczba punktów na linię")
+    parser.add_argument("--method", choices=sorted(DOWNSAMPLE), default="minmax")
+    args = parser.parse_args()
+
+    temperature_png, delta_png, elapsed = plot_results(args.results, args.out_dir, args.tag, args.points, args.method)
+    print(f"Wykresy zapisane do plików: {temperature_png}, {delta_png} ({elapsed:.3f} s)")
@@ -0,0 +1,63 @@
+"""Parameters of the lab2 heating problem (the temp1d.f90 configuration)
+and a plain fixed-step run driver, shared by main.py and the study scripts."""
+from typing import Callable
+
+import numpy as np
+from output import OutputSampler
+from solver import HeatingSolver
+
+Rmin = 0.0
+Rmax = 0.05
+AlfaAir = 300.0
+TempBegin = 100.0
+t1 = 1200.0
+t2 = 25.0
+C = 700.0
+Ro = 7800.0
+K = 25.0
+TauMax = 1000.0
+
+
+def time_step(
+        nh: int, TauMax: float, dt: float | None = None,
+        K: float = K, C: float = C, Ro: float = Ro, Rmax: float = Rmax,
+) -> tuple[int, float]:
+    """(nTime, dTau) as in main.py: dR^2 / (0.5 a) unless dt is given,
+    shortened so that nTime steps end exactly at TauMax."""
+    a = K / (C * Ro)
+    dR = (Rmax - Rmin) / (nh - 1)
+    dTau = dR ** 2 / (0.5 * a) if dt is None else dt
+    nTime = int(TauMax / dTau) + 1
+    return nTime, TauMax / nTime
+
+
+def run_series(
+        solver: HeatingSolver, vrtxTemp: np.ndarray, TempAir: float | np.ndarray, nTime: int,
+        output_times: np.ndarray,
+        out: np.ndarray | None = None,
+        progress: Callable[[int, int], None] | None = None,
+) -> np.ndarray:
+    """nTime steps of solver.dTau from vrtxTemp at constant TempAir.
+
+    Returns the centre and surface temperatures at output_times (linear
+    interpolation between steps), shape (..., n_out, 2) with the batch axis
+    of the solver in front; out may be given to fill it in place.
+    progress(steps, rows) is called after every step with the number of
+    steps taken and of rows of out already filled.
+    """
+    if out is None:
+        out = np.empty(vrtxTemp.shape[:-1] + (output_times.shape[0], 2))
+    sampler = OutputSampler(output_times)
+    k = 0
+    Tau = 0.0
+    for iTime in range(nTime + 1):
+        for _, values in sampler.sample(Tau, vrtxTemp[..., [0, -1]], force=iTime == nTime):
+            out[..., k, :] = values
+            k += 1
+        if progress is not None:
+            progress(iTime, k)
+        if iTime == nTime:
+            break
+        vrtxTemp = solver.step(vrtxTemp, TempAir)
+        Tau += solver.dTau
+    return out
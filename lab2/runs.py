@@ -0,0 +1,182 @@
+"""Shared, cached lab2 runs for the Streamlit front end.
+
+A run is identified by the hash of its parameters. RunRegistry keeps one
+Run per hash: a new configuration starts a background thread, later
+requests for the same hash (from any session) get the same Run object and
+read its partial results while it is still going. Finished runs stay in
+memory (LRU, MAX_RUNS) and are stored in cache_dir/{hash}.npz, so they
+survive a restart. check_params rejects invalid meshes and configurations
+above MAX_NODES, MAX_STEPS or MAX_WORK (nodes x steps) before a thread is
+started. A run that fails stays in memory with its error, so asking for the
+same configuration again shows the error instead of starting it again.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import problem
+from problem import Rmax, Rmin, run_series, time_step
+from solver import SCHEMES, HeatingSolver
+
+# zmiana wersji unieważnia pliki w pamięci podręcznej na dysku
+CACHE_VERSION = 1
+MAX_RUNS = 16
+# liczba punktów wyników na przebieg
+OUTPUT_POINTS = 2000
+# limity jednego przebiegu (węzły x kroki ~ 0.25 us na maszynie odniesienia)
+MAX_NODES = 20001
+MAX_STEPS = 1_000_000
+MAX_WORK = 200_000_000
+
+DEFAULTS: dict[str, float | int | str] = {
+    "nodes": 51,
+    "time": problem.TauMax,
+    "scheme": "euler",
+    "order": 1,
+    "dt": 0.0,  # 0 = dR^2 / (0.5 a)
+    "AlfaAir": problem.AlfaAir,
+    "TempBegin": problem.TempBegin,
+    "t1": problem.t1,
+    "C": problem.C,
+    "Ro": problem.Ro,
+    "K": problem.K,
+}
+
+
+def run_steps(params: dict) -> tuple[int, float]:
+    """(nTime, dTau) of a configuration, as in main.py."""
+    p = params
+    return time_step(p["nodes"], p["time"], p["dt"] or None, K=p["K"], C=p["C"], Ro=p["Ro"])
+
+
+def check_params(params: dict) -> None:
+    """ValueError for a mesh the solver cannot build or a run that would
+    exceed MAX_NODES, MAX_STEPS or MAX_WORK."""
+    nodes = params["nodes"]
+    order = params["order"]
+    if (nodes - 1) % order:
+        raise ValueError(f"order {order} elements need (nodes - 1) divisible by {order}, got {nodes} nodes")
+    if nodes > MAX_NODES:
+        raise ValueError(f"{nodes} nodes, the limit is {MAX_NODES}")
+    nTime = run_steps(params)[0]
+    if nTime > MAX_STEPS:
+        raise ValueError(f"{nTime} time steps, the limit is {MAX_STEPS}; increase the time step")
+    if nodes * nTime > MAX_WORK:
+        raise ValueError(f"{nodes} nodes x {nTime} steps, the limit is {MAX_WORK}; "
+                         f"use fewer nodes or a larger time step")
+
+
+def params_hash(params: dict) -> str:
+    blob = json.dumps({"version": CACHE_VERSION, **params}, sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class Run:
+    """Centre/surface temperature history of one configuration, filled while it runs."""
+
+    def __init__(self, params: dict, key: str) -> None:
+        self.params: dict = params
+        self.key: str = key
+        self.data: np.ndarray = np.empty((0, 3))
+        self.n: int = 0  # wypełnione wiersze data (zapis wiersza przed zwiększeniem n)
+        self.done: threading.Event = threading.Event()
+        self.error: str | None = None
+        self.steps: int = 0
+        self.nTime: int = 0
+
+    @classmethod
+    def from_file(cls, path: str, params: dict, key: str) -> "Run":
+        run = cls(params, key)
+        with np.load(path) as f:
+            run.data = f["data"].copy()
+            run.steps = run.nTime = int(f["steps"])
+        run.n = run.data.shape[0]
+        run.done.set()
+        return run
+
+    @property
+    def progress(self) -> float:
+        if self.done.is_set():
+            return 1.0
+        return self.steps / self.nTime if self.nTime else 0.0
+
+    def results(self) -> np.ndarray:
+        """Rows (time, centre, surface) computed so far."""
+        return self.data[:self.n].copy()
+
+    def compute(self) -> None:
+        p = self.params
+        nTime, dTau = run_steps(p)
+        solver = HeatingSolver(Rmin, Rmax, p["nodes"], p["AlfaAir"], p["C"], p["Ro"], p["K"], dTau,
+                               theta=SCHEMES[p["scheme"]], order=p["order"])
+        output_times = np.linspace(0.0, p["time"], min(OUTPUT_POINTS, nTime + 1))
+        self.data = np.empty((output_times.shape[0], 3))
+        self.data[:, 0] = output_times
+        self.nTime = nTime
+
+        def progress(steps: int, rows: int) -> None:
+            self.steps = steps
+            self.n = rows
+
+        run_series(solver, np.full(p["nodes"], p["TempBegin"]), p["t1"], nTime, output_times,
+                   out=self.data[:, 1:], progress=progress)
+
+
+class RunRegistry:
+    def __init__(self, cache_dir: str = "dt_wyniki/cache", max_runs: int = MAX_RUNS) -> None:
+        self.cache_dir: str = cache_dir
+        self.max_runs: int = max_runs
+        self._runs: OrderedDict[str, Run] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, params: dict) -> tuple[Run, str]:
+        """The run for params and where it came from: "pamięć", "w toku"
+        (shared with a run already in progress), "dysk", "obliczenia" (new)
+        or "błąd" (a failed run, kept with its error).
+        ValueError (check_params) for a configuration over the limits."""
+        check_params(params)
+        key = params_hash(params)
+        with self._lock:
+            run = self._runs.get(key)
+            if run is not None:
+                self._runs.move_to_end(key)
+                if run.error is not None:
+                    return run, "błąd"
+                return run, "pamięć" if run.done.is_set() else "w toku"
+            if os.path.exists(self._path(key)):
+                run = Run.from_file(self._path(key), params, key)
+                source = "dysk"
+            else:
+                run = Run(params, key)
+                threading.Thread(target=self._execute, args=(run,), daemon=True).start()
+                source = "obliczenia"
+            self._runs[key] = run
+            self._evict()
+            return run, source
+
+    def _evict(self) -> None:
+        # usuwamy najstarsze zakończone przebiegi; trwające zostają
+        for key in list(self._runs):
+            if len(self._runs) <= self.max_runs:
+                break
+            if self._runs[key].done.is_set():
+                del self._runs[key]
+
+    def _execute(self, run: Run) -> None:
+        try:
+            run.compute()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = self._path(run.key) + ".tmp"
+            with open(tmp, "wb") as f:
+                np.savez(f, data=run.results(), steps=run.steps, params=json.dumps(run.params))
+            os.replace(tmp, self._path(run.key))
+        except Exception as e:  # błąd zostaje w rejestrze i jest pokazywany w interfejsie
+            run.error = f"{type(e).__name__}: {e}"
+        finally:
+            run.done.set()
@@ -0,0 +1,189 @@
+"""Mesh-scaling benchmark of the lab2 solver with validation against temp1d.f90.
+
+For every node count: setup time, time per step over --steps steps and the
+peak traced memory of the solver. Validation runs the temp1d.f90
+configuration (nh=501, 1000 s, the same material data and time step) and
+compares the centre and surface temperatures with the stored Fortran
+output in reference/temp1d_nh501.csv (printed with 2 decimals, so errors up
+to 0.005 C are rounding).
+
+A validation error above --max-error (or above the baseline error) is
+reported as a regression (exit code 1). Timings depend on the machine, so
+they are compared with the baseline only with --check-timing (a slowdown
+above --speed-tol is a regression).
+
+    python scaling.py                      # sprawdzenie dokładności
+    python scaling.py --check-timing       # także czasy względem bazy
+    python scaling.py --save-baseline      # zapis nowej bazy
+    python scaling.py --make-reference     # ponowne wygenerowanie referencji (gfortran)
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from problem import AlfaAir, C, K, Rmax, Rmin, Ro, TauMax, TempBegin, t1, time_step
+from solver import HeatingSolver
+
+REFERENCE = "reference/temp1d_nh501.csv"
+REFERENCE_NODES = 501
+BASELINE = "scaling_baseline.json"
+# co który krok zapisujemy z wyjścia programu Fortran (plus 10 pierwszych i ostatni)
+REFERENCE_EVERY = 500
+
+
+def make_reference(source: str = "temp1d.f90", path: str = REFERENCE) -> int:
+    """Compile and run temp1d.f90, store every REFERENCE_EVERY-th step.
+
+    temp1d.f90 writes Tau before adding dTau next to the temperatures after
+    the step, so a row i holds the state after i + 1 steps.
+    """
+    compiler = shutil.which("gfortran")
+    if compiler is None:
+        raise RuntimeError("gfortran not found, cannot regenerate the reference")
+    with tempfile.TemporaryDirectory() as tmp:
+        exe = os.path.join(tmp, "temp1d")
+        subprocess.run([compiler, "-O2", "-o", exe, os.path.abspath(source)], check=True)
+        subprocess.run([exe], cwd=tmp, check=True, stdout=subprocess.DEVNULL)
+        with open(os.path.join(tmp, "temperat.txt"), encoding="utf-8") as f:
+            rows = [line.split() for line in f.readlines()[1:] if not line.strip().startswith("dTmax")]
+
+    dTau = time_step(REFERENCE_NODES, TauMax)[1]
+    n = len(rows)
+    keep = [i for i in range(n) if i < 10 or (i + 1) % REFERENCE_EVERY == 0 or i == n - 1]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Krok", "Czas (s)", "Temperatura w osi (C)", "Temperatura na powierzchni (C)"])
+        for i in keep:
+            writer.writerow([i + 1, f"{(i + 1) * dTau:.6f}", rows[i][1], rows[i][2]])
+    return len(keep)
+
+
+def read_reference(path: str = REFERENCE) -> tuple[np.ndarray, np.ndarray]:
+    """Step numbers and (n, 2) centre/surface temperatures."""
+    data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    return data[:, 0].astype(int), data[:, 2:4]
+
+
+def run_nodes(nh: int, steps: int, repeat: int = 3) -> dict:
+    """Best of repeat runs (the smallest meshes take microseconds per step)."""
+    dTau = time_step(nh, TauMax)[1]
+    setup = elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        solver = HeatingSolver(Rmin, Rmax, nh, AlfaAir, C, Ro, K, dTau)
+        setup = min(setup, time.perf_counter() - start)
+        vrtxTemp = np.full(nh, TempBegin)
+        start = time.perf_counter()
+        for _ in range(steps):
+            vrtxTemp = solver.step(vrtxTemp, t1)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    # pamięć osobno, tracemalloc spowalnia pętlę
+    tracemalloc.start()
+    solver = HeatingSolver(Rmin, Rmax, nh, AlfaAir, C, Ro, K, dTau)
+    solver.step(np.full(nh, TempBegin), t1)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "setup_ms": 1000 * setup,
+        "steps": steps,
+        "wall_s": elapsed,
+        "ms_per_step": 1000 * elapsed / steps,
+        "steps_full_run": int(round(TauMax / dTau)),
+        "peak_mb": peak / 2 ** 20,
+    }
+
+
+def validate(path: str = REFERENCE) -> dict:
+    """Full temp1d.f90 run with HeatingSolver, errors at the reference steps."""
+    ref_steps, ref_temp = read_reference(path)
+    dTau = time_step(REFERENCE_NODES, TauMax)[1]
+    solver = HeatingSolver(Rmin, Rmax, REFERENCE_NODES, AlfaAir, C, Ro, K, dTau)
+    vrtxTemp = np.full(REFERENCE_NODES, TempBegin)
+    out = np.empty_like(ref_temp)
+    k = 0
+    start = time.perf_counter()
+    for iTime in range(1, ref_steps[-1] + 1):
+        vrtxTemp = solver.step(vrtxTemp, t1)
+        if iTime == ref_steps[k]:
+            out[k] = vrtxTemp[0], vrtxTemp[-1]
+            k += 1
+    elapsed = time.perf_counter() - start
+    err = np.abs(out - ref_temp).max(axis=0)
+    return {"steps": int(ref_steps[-1]), "wall_s": elapsed, "err_center": float(err[0]), "err_surface": float(err[1])}
+
+
+def regressions(current: dict, baseline: dict, speed_tol: float | None, max_error: float) -> list[str]:
+    """Validation errors always, timings only when speed_tol is given."""
+    found = []
+    for nh, row in current["nodes"].items():
+        base = baseline.get("nodes", {}).get(nh)
+        if speed_tol is not None and base is not None and row["ms_per_step"] > base["ms_per_step"] * (1 + speed_tol):
+            found.append(f"nodes={nh}: {row['ms_per_step']:.3f} ms/krok, baza {base['ms_per_step']:.3f}")
+    check = current.get("validation")
+    if check is not None:
+        base = baseline.get("validation") or {}
+        for name in ("err_center", "err_surface"):
+            limit = max(max_error, base.get(name, 0.0))
+            if check[name] > limit:
+                found.append(f"{name} = {check[name]:.4f} C > {limit:.4f} C")
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, nargs='+', default=[51, 101, 501, 1001, 5001])
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-validation', action='store_true', help='bez pełnego przebiegu nh=501')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check-timing', action='store_true', help='porównaj też czasy z bazą (zależne od maszyny)')
+    parser.add_argument('--speed-tol', type=float, default=0.25, help='dopuszczalne spowolnienie (0.25 = 25%%)')
+    parser.add_argument('--max-error', type=float, default=0.01, help='dopuszczalny błąd względem temp1d.f90 [C]')
+    parser.add_argument('--make-reference', action='store_true', help='wygeneruj referencję z temp1d.f90')
+    args = parser.parse_args()
+
+    if args.make_reference:
+        print(f"Referencja: {make_reference()} wierszy zapisanych do pliku {REFERENCE}")
+
+    current = {"nodes": {}}
+    print(f"{'nodes':>6} {'setup [ms]':>11} {'kroki':>6} {'czas [s]':>9} {'ms/krok':>9} {'kroki 1000 s':>13} {'pamięć [MB]':>12}")
+    for nh in args.nodes:
+        row = run_nodes(nh, args.steps, args.repeat)
+        current["nodes"][str(nh)] = row
+        print(f"{nh:>6} {row['setup_ms']:>11.3f} {row['steps']:>6} {row['wall_s']:>9.3f} {row['ms_per_step']:>9.3f} "
+              f"{row['steps_full_run']:>13} {row['peak_mb']:>12.3f}")
+
+    if not args.skip_validation:
+        check = validate()
+        current["validation"] = check
+        print(f"temp1d.f90 (nh={REFERENCE_NODES}, {check['steps']} kroków, {check['wall_s']:.1f} s): "
+              f"max błąd oś {check['err_center']:.4f} C, powierzchnia {check['err_surface']:.4f} C")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=1)
+        print(f"Baza zapisana do pliku: {args.baseline}")
+    else:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        elif args.check_timing:
+            sys.exit(f"Brak pliku bazy {args.baseline} (zapisz go: --save-baseline)")
+        found = regressions(current, baseline, args.speed_tol if args.check_timing else None, args.max_error)
+        for line in found:
+            print(f"REGRESJA: {line}")
+        if found:
+            sys.exit(1)
+        print(f"Brak regresji względem {args.baseline}" if args.check_timing else "Brak regresji dokładności")
@@ -0,0 +1,100 @@
+"""Heating/soaking/cooling schedules for lab2.
+
+A schedule is a list of stages, each with a duration, an ambient temperature
+and a surface heat-transfer coefficient. All stages run in one continuous
+simulation: the temperature field carries over from stage to stage and all
+stages share one step size, so the operator is factorised once per AlfaAir
+(plus once for a shortened last step of a stage, see Schedule.plan).
+
+Schedule file (CSV, AlfaAir may be left empty to keep the default):
+
+    name,duration,TempAir,AlfaAir
+    nagrzewanie,900,1200,300
+    wygrzewanie,300,1150,150
+    chlodzenie,600,25,30
+"""
+import csv
+import math
+
+
+class Stage:
+    def __init__(self, name: str, duration: float, TempAir: float, AlfaAir: float) -> None:
+        if duration <= 0:
+            raise ValueError(f"Stage {name!r} must have a positive duration, got {duration}")
+        self.name: str = name
+        self.duration: float = duration
+        self.TempAir: float = TempAir
+        self.AlfaAir: float = AlfaAir
+
+    def as_dict(self) -> dict:
+        return {"name": self.name, "duration": self.duration, "TempAir": self.TempAir, "AlfaAir": self.AlfaAir}
+
+
+class Schedule:
+    def __init__(self, stages: list[Stage]) -> None:
+        if not stages:
+            raise ValueError("Schedule needs at least one stage")
+        self.stages: list[Stage] = stages
+        self.starts: list[float] = []
+        Tau = 0.0
+        for stage in stages:
+            self.starts.append(Tau)
+            Tau += stage.duration
+        self.end: float = Tau
+
+    def plan(self, dTau: float) -> list[tuple[Stage, int, float, float]]:
+        """(stage, number of steps, step size, last step size) per stage.
+
+        All stages share one step size, so a factorisation is reused by every
+        stage with the same AlfaAir. When the durations have a common divisor
+        g >= dTau (to 1 us), the step is g / (int(g / dTau) + 1), the main.py
+        rule applied to g, and every stage is a whole number of steps; for a
+        single stage that is duration / (int(duration / dTau) + 1) as before.
+        Otherwise the step is dTau and only the last step of each stage is
+        shortened to end on the stage boundary.
+        """
+        durations = [stage.duration for stage in self.stages]
+        g = durations[0]
+        if len(durations) > 1:
+            units = [round(d * 1e6) for d in durations]
+            exact = all(abs(u - d * 1e6) < 1e-3 for u, d in zip(units, durations))
+            g = math.gcd(*units) / 1e6 if exact else 0.0
+        if g >= dTau:
+            dt = g / (int(g / dTau) + 1)
+            return [(stage, round(stage.duration / dt), dt, dt) for stage in self.stages]
+
+        plan = []
+        for stage in self.stages:
+            nTime = math.ceil(stage.duration / dTau - 1e-9)
+            last = stage.duration - (nTime - 1) * dTau
+            plan.append((stage, nTime, dTau, dTau if abs(last - dTau) <= 1e-9 * dTau else last))
+        return plan
+
+    def as_list(self) -> list[dict]:
+        return [stage.as_dict() for stage in self.stages]
+
+
+def default_schedule(t1: float, t2: float, Tau1: float, Tau2: float, AlfaAir: float) -> Schedule:
+    """Semantics of temp1d.f90: ambient t2 until Tau1, then t1 until Tau1 + Tau2."""
+    stages = []
+    if Tau1 > 0:
+        stages.append(Stage("przed", Tau1, t2, AlfaAir))
+    stages.append(Stage("nagrzewanie", Tau2, t1, AlfaAir))
+    return Schedule(stages)
+
+
+def read_schedule(path: str, AlfaAir: float) -> Schedule:
+    with open(path, newline="", encoding="utf-8") as f:
+        records = list(csv.DictReader(f))
+    missing = {"duration", "TempAir"} - set(records[0]) if records else set()
+    if missing:
+        raise ValueError(f"Missing columns in {path}: {', '.join(sorted(missing))}")
+    return Schedule([
+        Stage(
+            r.get("name") or f"etap {i + 1}",
+            float(r["duration"]),
+            float(r["TempAir"]),
+            float(r["AlfaAir"]) if r.get("AlfaAir") not in (None, "") else AlfaAir,
+        )
+        for i, r in enumerate(records)
+    ])
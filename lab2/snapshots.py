@@ -0,0 +1,125 @@
+"""Full temperature-field snapshots of a lab2 run.
+
+Profiles are written into a preallocated memory-mapped .npy file of shape
+(n_snapshots, nh); a small JSON file next to it (same name, .json) holds the
+mesh, time step, material parameters and the time of every snapshot.
+Reading goes through np.load(mmap_mode="r"), so any time or radius can be
+sliced without loading the whole run.
+
+    snaps = open_snapshots("dt_wyniki/snapshots_51.npy")
+    snaps.at_time(500.0)      # radial profile closest to t = 500 s
+    snaps.at_radius(0.025)    # temperature history at r = 25 mm
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+def _meta_path(path: str | Path) -> Path:
+    return Path(path).with_suffix(".json")
+
+
+class SnapshotStore:
+    """Writer side: preallocates the file and fills rows as the run goes."""
+
+    def __init__(
+            self, path: str,
+            n_snapshots: int,
+            vrtxCoordX: np.ndarray,
+            meta: dict,
+            every: int | None = None,
+            dt: float | None = None,
+            resume: dict | None = None,
+    ) -> None:
+        self.path: str = path
+        self.every: int | None = every
+        self.dt: float | None = dt
+        self.meta: dict = dict(meta)
+        self.meta["Rmin"] = float(vrtxCoordX[0])
+        self.meta["Rmax"] = float(vrtxCoordX[-1])
+        self.meta["nh"] = int(vrtxCoordX.shape[0])
+
+        shape = (n_snapshots, vrtxCoordX.shape[0])
+        if resume is None:
+            self.data: np.ndarray = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=shape)
+            self.times: list[float] = []
+            self._step: int = 0
+            self._next_time: float = 0.0
+        else:
+            self.times = list(resume["times"])
+            self._step = resume["step"]
+            self._next_time = resume["next_time"]
+            old = np.load(path, mmap_mode="r")
+            if old.shape[0] >= n_snapshots:
+                del old
+                self.data = np.lib.format.open_memmap(path, mode="r+")
+            else:
+                # dłuższy przebieg: większy plik, przepisujemy zapisane migawki
+                tmp = path + ".tmp.npy"
+                data = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float64, shape=shape)
+                data[:len(self.times)] = old[:len(self.times)]
+                data.flush()
+                del old, data
+                os.replace(tmp, path)
+                self.data = np.lib.format.open_memmap(path, mode="r+")
+
+    def record(self, Tau: float, vrtxTemp: np.ndarray, force: bool = False) -> None:
+        """Called once per time step; stores the profile if it is due."""
+        eps = 1e-9 * max(1.0, abs(Tau))
+        if self.dt is not None:
+            due = Tau >= self._next_time - eps
+            if due:
+                self._next_time = (np.floor((Tau + eps) / self.dt) + 1) * self.dt
+        else:
+            due = self._step % (self.every or 1) == 0
+        self._step += 1
+
+        if not (due or force) or (self.times and self.times[-1] == Tau):
+            return
+        n = len(self.times)
+        if n == self.data.shape[0]:
+            if not force:
+                return
+            # ostatni wiersz zawsze na stan końcowy
+            n -= 1
+            self.times.pop()
+        self.data[n] = vrtxTemp
+        self.times.append(float(Tau))
+
+    def state(self) -> dict:
+        self.data.flush()
+        return {"times": self.times, "step": self._step, "next_time": self._next_time}
+
+    def close(self) -> None:
+        self.data.flush()
+        self.meta["n_snapshots"] = len(self.times)
+        self.meta["times"] = self.times
+        with open(_meta_path(self.path), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=1)
+        del self.data
+
+
+class Snapshots:
+    """Reader side: zero-copy view of a snapshot file."""
+
+    def __init__(self, path: str) -> None:
+        with open(_meta_path(path), encoding="utf-8") as f:
+            self.meta: dict = json.load(f)
+        n = self.meta["n_snapshots"]
+        self.temps: np.ndarray = np.load(path, mmap_mode="r")[:n]
+        self.times: np.ndarray = np.array(self.meta["times"])
+        self.radius: np.ndarray = np.linspace(self.meta["Rmin"], self.meta["Rmax"], self.meta["nh"])
+
+    def at_time(self, Tau: float) -> np.ndarray:
+        """Radial profile of the snapshot closest to Tau."""
+        return self.temps[int(np.abs(self.times - Tau).argmin())]
+
+    def at_radius(self, r: float) -> np.ndarray:
+        """Temperature history of the node closest to r."""
+        return self.temps[:, int(np.abs(self.radius - r).argmin())]
+
+
+def open_snapshots(path: str) -> Snapshots:
+    return Snapshots(path)
@@ -0,0 +1,290 @@
+"""Transient radial heating of a round billet (1D axisymmetric FEM).
+
+Conductivity, heat capacity and convection terms do not change in time, so
+the banded operator is assembled and factorised once per time-step size.
+Every time step only builds the right-hand side from the capacity and
+conductivity matrices and runs a forward/back substitution.
+
+The operator is symmetric positive definite. With scipy installed it is
+factorised with LAPACK's banded Cholesky (cholesky_banded) and every step
+calls cho_solve_banded, so the substitution runs in compiled code. Without
+scipy a banded LU with node loops in Python is used instead; it gives the
+same results up to rounding but costs about 0.2 us per node and step.
+
+Elements are linear (2 nodes, tridiagonal system) or quadratic Lagrange
+(3 nodes, pentadiagonal system). Time integration is the theta scheme:
+theta=1 backward Euler (the original formulation), theta=0.5 Crank-Nicolson.
+
+Rmax, AlfaAir, C, Ro and K may also be arrays of shape (B,): the solver then
+advances B independent scenarios at once, temperatures have shape (B, nh)
+and the same node loops of the factorisation and substitution work on
+(B,) rows instead of floats.
+"""
+from contextlib import nullcontext
+from typing import Callable, ContextManager
+
+import numpy as np
+
+try:
+    from scipy.linalg import cho_solve_banded, cholesky_banded
+except ImportError:  # bez scipy: faktoryzacja i podstawienia w pętlach Pythona
+    cho_solve_banded = cholesky_banded = None
+
+# linear elements, 2-point Gauss quadrature
+E = np.array([-0.5773502692, 0.5773502692])
+W = np.array([1.0, 1.0])
+N1 = 0.5 * (1 - E)
+N2 = 0.5 * (1 + E)
+Np = 2
+
+# quadratic elements, 3-point Gauss quadrature
+E3 = np.array([-np.sqrt(0.6), 0.0, np.sqrt(0.6)])
+W3 = np.array([5.0 / 9.0, 8.0 / 9.0, 5.0 / 9.0])
+
+# order -> (weights (Np,), N (Np, nodes), dN/dksi (Np, nodes))
+SHAPE: dict[int, tuple[np.ndarray, np.ndarray, np.ndarray]] = {
+    1: (W,
+        np.stack([N1, N2], axis=1),
+        np.tile([-0.5, 0.5], (Np, 1))),
+    2: (W3,
+        np.stack([0.5 * E3 * (E3 - 1), 1 - E3 ** 2, 0.5 * E3 * (E3 + 1)], axis=1),
+        np.stack([E3 - 0.5, -2 * E3, E3 + 0.5], axis=1)),
+}
+
+SCHEMES: dict[str, float] = {"euler": 1.0, "cn": 0.5}
+# ile faktoryzacji (różne dTau i AlfaAir) trzymamy w pamięci
+MAX_FACTORS = 16
+
+
+class HeatingSolver:
+    def __init__(
+            self, Rmin: float, Rmax: float | np.ndarray, nh: int,
+            AlfaAir: float | np.ndarray,
+            C: float | np.ndarray,
+            Ro: float | np.ndarray,
+            K: float | np.ndarray,
+            dTau: float,
+            theta: float = 1.0,
+            order: int = 1,
+            phase: Callable[[str], ContextManager] = lambda name: nullcontext(),
+    ) -> None:
+        if order not in SHAPE:
+            raise ValueError(f"Unsupported element order: {order}")
+        if (nh - 1) % order:
+            raise ValueError(f"Quadratic elements need an odd number of nodes, got {nh}.")
+        self.Rmin: float = Rmin
+        self.Rmax: float | np.ndarray = Rmax
+        self.nh: int = nh
+        self.order: int = order
+        self.ne: int = (nh - 1) // order
+        self.AlfaAir: float | np.ndarray = AlfaAir
+        self.C: float | np.ndarray = C
+        self.Ro: float | np.ndarray = Ro
+        self.K: float | np.ndarray = K
+        self.theta: float = theta
+        # times "assembly" and every "factorisation" (e.g. Metrics.phase)
+        self.phase: Callable[[str], ContextManager] = phase
+        # () for one scenario, (B,) for a batch
+        self.batch: tuple[int, ...] = np.broadcast_shapes(*(np.shape(v) for v in (Rmax, AlfaAir, C, Ro, K)))
+        if len(self.batch) > 1:
+            raise ValueError(f"Batch parameters must be 1-D, got shape {self.batch}")
+
+        dR = (np.asarray(Rmax) - Rmin) / (nh - 1)
+        self.vrtxCoordX: np.ndarray = np.broadcast_to(
+            Rmin + np.arange(nh, dtype=np.float64) * dR[..., None], self.batch + (nh,))
+
+        # global symmetric band matrices, shape (..., order+1, nh):
+        # row 0 the diagonal, row j the j-th off-diagonal (last j entries unused)
+        # capacity C*Ro*M
+        self.mB: np.ndarray = np.zeros(self.batch + (order + 1, nh))
+        # conduction + convection
+        self.kB: np.ndarray = np.zeros(self.batch + (order + 1, nh))
+        # convection term of the last node
+        self.conv: float | np.ndarray = 0.0
+
+        with phase("assembly"):
+            self._assemble()
+        self._factors: dict[tuple, np.ndarray | tuple[list, list, list]] = {}
+        self.n_factorisations: int = 0
+        self.set_time_step(dTau)
+
+    def _assemble(self) -> None:
+        """All elements and Gauss points at once: arrays of shape (..., ne, Np, nodes)."""
+        Wq, N, dN = SHAPE[self.order]
+        nodes = self.order + 1
+        idx = np.arange(self.ne)[:, None] * self.order + np.arange(nodes)[None, :]
+        r = self.vrtxCoordX[..., idx]
+        dR_local = (r[..., -1] - r[..., 0])[..., None]
+        Rp = r @ N.T  # (..., ne, Np)
+        K, C, Ro = (np.asarray(v)[..., None, None] for v in (self.K, self.C, self.Ro))
+
+        # element matrices (..., ne, nodes, nodes); the same scaling as the
+        # original linear element: K*Rp*W/dR and C*Ro*dR*Rp*W*Ni*Nj
+        cond = np.einsum("...eq,qa,qb->...eab", 4 * K * Rp * Wq / dR_local, dN, dN)
+        cap = np.einsum("...eq,qa,qb->...eab", C * Ro * dR_local * Rp * Wq, N, N)
+
+        # idx[:, a] has no repeated nodes, so a plain += scatters correctly
+        for a in range(nodes):
+            for b in range(a, nodes):
+                self.mB[..., b - a, idx[:, a]] += cap[..., a, b]
+                self.kB[..., b - a, idx[:, a]] += cond[..., a, b]
+        # convection on the last node, 2 * Alfa * Rmax added at every
+        # Gauss point of the linear element
+        self._k_surface: float | np.ndarray = self.kB[..., 0, -1].copy()
+        self.conv = 2 * 2 * self.AlfaAir * self.Rmax
+        self.kB[..., 0, -1] += self.conv
+
+    def set_convection(self, AlfaAir: float, dTau: float | None = None) -> None:
+        """Switch the surface heat-transfer coefficient (e.g. a new schedule stage)
+        and optionally the time step, factorising at most once."""
+        if np.any(AlfaAir != self.AlfaAir):
+            self.AlfaAir = AlfaAir
+            self.conv = 2 * 2 * AlfaAir * self.Rmax
+            self.kB[..., 0, -1] = self._k_surface + self.conv
+        self.set_time_step(self.dTau if dTau is None else dTau)
+
+    def set_time_step(self, dTau: float) -> None:
+        """Switch to dTau, factorising the operator only for a new (dTau, AlfaAir)."""
+        self.dTau: float = dTau
+        key = (dTau, tuple(np.ravel(self.AlfaAir).tolist()))
+        if key not in self._factors:
+            if len(self._factors) >= MAX_FACTORS:
+                del self._factors[next(iter(self._factors))]
+            with self.phase("factorisation"):
+                self._factors[key] = self._factor(dTau)
+            self.n_factorisations += 1
+        self._lu = self._factors[key]
+
+    def _factor(self, dTau: float) -> np.ndarray | tuple[list, list, list]:
+        """Factorisation of the SPD operator M/dTau + theta*K.
+
+        With scipy: the lower banded Cholesky factor, shape (..., order+1, nh)
+        (the band layout of mB/kB is LAPACK's lower form). Without scipy: a
+        banded LU (no pivoting) as multipliers m[j][i] = L[i+j, i], the
+        pivots d[i] and the upper band e[j][i] = U[i, i+j], each as Python
+        lists (of floats, or of (B,) arrays for a batch).
+        """
+        A = self.mB / dTau + self.theta * self.kB
+        if cholesky_banded is not None:
+            bands = A.reshape((-1,) + A.shape[-2:])
+            return np.stack([cholesky_banded(a, lower=True, check_finite=False) for a in bands]).reshape(A.shape)
+        p = self.order
+        n = self.nh
+        if p == 1:
+            aD = self._rows(A[..., 0, :])
+            aE = self._rows(A[..., 1, :])
+            m = [0.0] * n
+            for i in range(1, n):
+                m[i] = aE[i - 1] / aD[i - 1]
+                aD[i] -= m[i] * aE[i - 1]
+            return m, aD, aE
+
+        U = [self._rows(A[..., j, :]) for j in range(p + 1)]
+        L = [[0.0] * n for _ in range(p + 1)]
+        for i in range(n - 1):
+            for k in range(1, min(p, n - 1 - i) + 1):
+                # the Schur complements stay symmetric: L[i+k, i] = U[i, i+k] / U[i, i]
+                lk = U[k][i] / U[0][i]
+                L[k][i] = lk
+                for j in range(k, min(p, n - 1 - i) + 1):
+                    U[j - k][i + k] -= lk * U[j][i]
+        return L, U[0], U[1:]
+
+    def _rows(self, V: np.ndarray) -> list:
+        """Values per node: floats, or contiguous (B,) rows for a batch."""
+        return list(V.T.copy()) if self.batch else V.tolist()
+
+    @staticmethod
+    def _band_dot(B: np.ndarray, T: np.ndarray) -> np.ndarray:
+        out = B[..., 0, :] * T
+        for j in range(1, B.shape[-2]):
+            out[..., :-j] += B[..., j, :-j] * T[..., j:]
+            out[..., j:] += B[..., j, :-j] * T[..., :-j]
+        return out
+
+    def rhs(self, vrtxTemp: np.ndarray, TempAir: float | np.ndarray) -> np.ndarray:
+        """M/dTau T - (1-theta) K T plus convection."""
+        aB = self._band_dot(self.mB, vrtxTemp) / self.dTau
+        if self.theta != 1.0:
+            aB -= (1.0 - self.theta) * self._band_dot(self.kB, vrtxTemp)
+        aB[..., -1] += self.conv * TempAir
+        return aB
+
+    def substitute(self, aB: np.ndarray) -> np.ndarray:
+        """Forward/back substitution with the stored factorisation."""
+        if isinstance(self._lu, np.ndarray):
+            if not self.batch:
+                return cho_solve_banded((self._lu, True), aB, check_finite=False)
+            return np.stack([cho_solve_banded((cb, True), b, check_finite=False) for cb, b in zip(self._lu, aB)])
+        b = self._rows(aB)
+        m, d, e = self._lu
+        n = self.nh
+        if self.order == 1:
+            for i in range(1, n):
+                b[i] -= m[i] * b[i - 1]
+
+            b[-1] /= d[-1]
+            for i in range(n - 2, -1, -1):
+                b[i] = (b[i] - e[i] * b[i + 1]) / d[i]
+            return np.ascontiguousarray(np.array(b).T)
+
+        p = self.order
+        for i in range(n - 1):
+            for k in range(1, min(p, n - 1 - i) + 1):
+                b[i + k] -= m[k][i] * b[i]
+        for i in range(n - 1, -1, -1):
+            acc = b[i]
+            for j in range(1, min(p, n - 1 - i) + 1):
+                acc -= e[j - 1][i] * b[i + j]
+            b[i] = acc / d[i]
+        return np.ascontiguousarray(np.array(b).T)
+
+    def step(self, vrtxTemp: np.ndarray, TempAir: float | np.ndarray) -> np.ndarray:
+        """Temperatures after one time step dTau."""
+        return self.substitute(self.rhs(vrtxTemp, TempAir))
+
+
+class AdaptiveStepper:
+    """Step-doubling error control for HeatingSolver.
+
+    A step of dTau is compared with two steps of dTau/2; the difference
+    (scaled by the scheme order) is the local error estimate in degrees.
+    dTau moves on a power-of-two ladder (halved on rejection, doubled when
+    the error is well below tol), so factorisations are reused.
+    """
+
+    def __init__(
+            self, solver: HeatingSolver,
+            tol: float,
+            dt_min: float,
+            dt_max: float,
+    ) -> None:
+        self.solver: HeatingSolver = solver
+        self.tol: float = tol
+        self.dt_min: float = dt_min
+        self.dt_max: float = dt_max
+        self.order: int = 2 if solver.theta == 0.5 else 1
+        self.rejected: int = 0
+
+    def advance(
+            self, vrtxTemp: np.ndarray, TempAir: float, dTau: float,
+    ) -> tuple[np.ndarray, float, float, float]:
+        """One accepted step starting with dTau.
+
+        Returns (temperatures, dTau taken, proposed next dTau, error estimate).
+        """
+        scale = 2 ** self.order - 1
+        while True:
+            self.solver.set_time_step(dTau)
+            full = self.solver.step(vrtxTemp, TempAir)
+            self.solver.set_time_step(dTau / 2)
+            half = self.solver.step(self.solver.step(vrtxTemp, TempAir), TempAir)
+            err = float(np.abs(half - full).max()) / scale
+
+            if err <= self.tol or dTau / 2 < self.dt_min:
+                next_dTau = dTau
+                if err * 2 ** (self.order + 1) <= self.tol and 2 * dTau <= self.dt_max:
+                    next_dTau = 2 * dTau
+                return half, dTau, next_dTau, err
+            self.rejected += 1
+            dTau /= 2
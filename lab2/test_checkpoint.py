@@ -0,0 +1,86 @@
+"""Checkpoint/resume of main.py against an uninterrupted run.
+
+Every case runs main.py once straight through and once stopped with
+--max-steps and continued with --resume; all output files (results,
+snapshots and their metadata) must be byte-identical.
+
+    python -m pytest lab2
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from checkpoint import load_checkpoint
+
+MAIN = str(Path(__file__).resolve().parent / "main.py")
+NODES = 21
+
+
+def main(cwd: Path, *args: str) -> str:
+    result = subprocess.run(
+        [sys.executable, MAIN, "--nodes", str(NODES), "--time", "200", "--no-plot", *args],
+        cwd=cwd, env={**os.environ, "MPLBACKEND": "Agg"}, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def outputs(cwd: Path) -> dict[str, bytes]:
+    return {path.name: path.read_bytes() for path in sorted((cwd / "dt_wyniki").iterdir())
+            if not path.name.startswith("checkpoint_")}
+
+
+def checkpoint_step(cwd: Path) -> int:
+    return load_checkpoint(str(cwd / "dt_wyniki" / f"checkpoint_{NODES}.npz"))[1]["step"]
+
+
+CASES = {
+    "csv": ["--format", "csv", "--snapshots", "--snapshot-every", "5"],
+    "npy": ["--format", "npy", "--snapshots", "--snapshot-dt", "7"],
+    "csv output-dt": ["--format", "csv", "--output-dt", "3", "--snapshots"],
+    "npy adaptive": ["--format", "npy", "--scheme", "cn", "--adaptive", "--snapshots", "--snapshot-every", "3"],
+}
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_resume_matches_uninterrupted(tmp_path, case):
+    args = [*CASES[case], "--checkpoint-every", "10"]
+    straight, resumed = tmp_path / "straight", tmp_path / "resumed"
+    straight.mkdir()
+    resumed.mkdir()
+
+    main(straight, *args)
+    assert "Przerwano po 17 krokach" in main(resumed, *args, "--max-steps", "17")
+    assert checkpoint_step(resumed) == 17
+    main(resumed, *args, "--resume")
+
+    assert outputs(resumed) == outputs(straight)
+    assert checkpoint_step(resumed) == checkpoint_step(straight)
+
+
+@pytest.mark.parametrize("adaptive", [[], ["--scheme", "cn", "--adaptive"]])
+def test_resume_after_event(tmp_path, adaptive):
+    args = [*adaptive, "--stop-center", "300", "--checkpoint-every", "10", "--snapshots"]
+    straight, resumed = tmp_path / "straight", tmp_path / "resumed"
+    straight.mkdir()
+    resumed.mkdir()
+
+    main(straight, *args)
+    stopped = outputs(straight)
+    step = checkpoint_step(straight)
+
+    # checkpoint after the event: resuming (also with a longer --time) takes no step
+    out = main(straight, *args, "--resume", "--time", "400")
+    assert "Wszystkie zdarzenia wystąpiły" in out
+    assert checkpoint_step(straight) == step
+    # the snapshot file is resized for the longer run, the results stay the same
+    results = f"wyniki_symulacji_{NODES}.csv"
+    assert outputs(straight)[results] == stopped[results]
+
+    # interrupted before the event, resumed through it
+    main(resumed, *args, "--max-steps", "5")
+    main(resumed, *args, "--resume")
+    assert checkpoint_step(resumed) == step
+    assert outputs(resumed) == stopped
@@ -0,0 +1,38 @@
+"""Observed order, the missing-order case and the mesh recommendation.
+
+    python -m pytest lab2
+"""
+import math
+
+import numpy as np
+from convergence import observed_order, recommend, study
+
+OUTPUT_TIMES = np.arange(0.0, 101.0, 10.0)
+
+
+def test_order_of_a_second_order_sequence():
+    exact = np.linspace(100.0, 200.0, 5)
+    f = [exact + 3.0 * h ** 2 for h in (0.1, 0.2, 0.4)]
+    assert math.isclose(observed_order(*f, 2.0, 2.0), 2.0, rel_tol=1e-8)
+
+
+def test_no_order_without_shrinking_differences():
+    f = np.ones(4)
+    assert math.isnan(observed_order(f, f, f, 2.0, 2.0))
+    assert not math.isnan(observed_order(f, f + 1.0, f + 3.0, 2.0, 2.0))
+    assert math.isnan(observed_order(f, f + 2.0, f + 3.0, 2.0, 2.0))
+
+
+def test_study_without_order_has_no_recommendation():
+    report = study([3, 3, 3], 100.0, OUTPUT_TIMES)
+    assert math.isnan(report["order"])
+    np.testing.assert_array_equal(report["extrapolated"], report["results"][-1])
+    assert recommend(report, tol=1e9) is None
+
+
+def test_recommend_fewest_nodes():
+    report = study([11, 21, 41], 100.0, OUTPUT_TIMES, dt=1.0)
+    assert not math.isnan(report["order"])
+    report["wall"] = [3.0, 1.0, 2.0]  # czasy nie wpływają na wybór
+    assert recommend(report, tol=1e9) == 11
+    assert recommend(report, tol=0.0) is None
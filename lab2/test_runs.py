@@ -0,0 +1,39 @@
+"""Run limits and the shared run registry of the Streamlit front end.
+
+    python -m pytest lab2
+"""
+import pytest
+import runs
+from runs import DEFAULTS, RunRegistry, check_params
+
+
+def test_check_params_rejects_even_nodes_for_order_2():
+    check_params({**DEFAULTS, "order": 2, "nodes": 51})
+    with pytest.raises(ValueError, match="divisible by 2"):
+        check_params({**DEFAULTS, "order": 2, "nodes": 50})
+
+
+def test_check_params_limits():
+    with pytest.raises(ValueError, match="nodes"):
+        check_params({**DEFAULTS, "nodes": runs.MAX_NODES + 2})
+    with pytest.raises(ValueError, match="time steps"):
+        check_params({**DEFAULTS, "dt": 1e-4})
+
+
+def test_failed_run_is_kept_with_its_error(tmp_path, monkeypatch):
+    registry = RunRegistry(cache_dir=str(tmp_path))
+    params = {**DEFAULTS, "nodes": 11}
+
+    def fail(self):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(runs.Run, "compute", fail)
+    run, source = registry.get(params)
+    assert source == "obliczenia"
+    assert run.done.wait(5)
+
+    # ta sama konfiguracja nie startuje ponownie, tylko pokazuje błąd
+    again, source = registry.get(params)
+    assert again is run
+    assert source == "błąd"
+    assert again.error == "RuntimeError: boom"
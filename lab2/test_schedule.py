@@ -0,0 +1,65 @@
+"""Schedule step plans and the factorisations they cost in main.py.
+
+    python -m pytest lab2
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from problem import time_step
+from schedule import Schedule, Stage, default_schedule
+
+MAIN = str(Path(__file__).resolve().parent / "main.py")
+dTau = 0.4367
+
+
+def test_single_stage_keeps_main_rule():
+    (_, n, dt, last), = default_schedule(1200.0, 25.0, 0.0, 1000.0, 300.0).plan(dTau)
+    assert (n, dt) == time_step(51, 1000.0, dTau)
+    assert last == dt
+
+
+def test_commensurate_stages_share_one_step():
+    plan = Schedule([Stage("a", 900, 1200, 300), Stage("b", 300, 1150, 150), Stage("c", 600, 25, 300)]).plan(dTau)
+    steps = {dt for _, _, dt, _ in plan} | {last for _, _, _, last in plan}
+    assert len(steps) == 1
+    assert steps.pop() <= dTau
+    for stage, n, dt, _ in plan:
+        assert n * dt == pytest.approx(stage.duration, rel=1e-12)
+
+
+def test_other_stages_shorten_the_last_step():
+    plan = Schedule([Stage("a", 900.25, 1200, 300), Stage("b", 299.9, 1150, 150)]).plan(2.0)
+    for stage, n, dt, last in plan:
+        assert dt == 2.0
+        assert 0.0 < last < dt
+        assert (n - 1) * dt + last == pytest.approx(stage.duration, rel=1e-12)
+
+
+def factorisations(tmp_path: Path, rows: list[str], *args: str) -> int:
+    (tmp_path / "etapy.csv").write_text("\n".join(["name,duration,TempAir,AlfaAir", *rows]) + "\n", encoding="utf-8")
+    result = subprocess.run(
+        [sys.executable, MAIN, "--nodes", "21", "--schedule", "etapy.csv", "--metrics", "--no-plot", *args],
+        cwd=tmp_path, env={**os.environ, "MPLBACKEND": "Agg"}, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    with open(tmp_path / "dt_wyniki" / "metrics_21.json", encoding="utf-8") as f:
+        return json.load(f)["factorisations"]
+
+
+def test_heat_soak_cool_factorises_once_per_alfa(tmp_path):
+    # nagrzewanie i chłodzenie z tym samym AlfaAir: jedna faktoryzacja na nie oba
+    rows = ["nagrzewanie,900,1200,300", "wygrzewanie,300,1150,150", "chlodzenie,600,25,300"]
+    assert factorisations(tmp_path, rows) == 2
+
+
+def test_shortened_last_steps_add_one_factorisation_each(tmp_path):
+    rows = ["nagrzewanie,90.25,1200,300", "wygrzewanie,29.9,1150,150", "chlodzenie,60.1,25,300"]
+    stages = [Stage(name, float(duration), float(TempAir), float(AlfaAir))
+              for name, duration, TempAir, AlfaAir in (row.split(",") for row in rows)]
+    shortened = sum(last != dt for _, _, dt, last in Schedule(stages).plan(2.0))
+    assert shortened == 3
+    assert factorisations(tmp_path, rows, "--dt", "2") == 2 + shortened
@@ -0,0 +1,66 @@
+"""Batched HeatingSolver against one solver per scenario, and the LAPACK
+(scipy) substitution against the pure-Python banded LU.
+
+    python -m pytest lab2
+"""
+import numpy as np
+import pytest
+from output import OutputSampler
+from problem import C, K, Rmin, Ro
+import solver as solver_module
+from solver import HeatingSolver
+
+Rmax = np.array([0.05, 0.04, 0.06])
+AlfaAir = np.array([300.0, 150.0, 500.0])
+K_ = np.array([K, 30.0, 20.0])
+
+
+@pytest.mark.parametrize("theta", [1.0, 0.5])
+@pytest.mark.parametrize("order,nh", [(1, 21), (2, 21)])
+def test_batch_matches_single(order, nh, theta):
+    dTau = 2.0
+    batch = HeatingSolver(Rmin, Rmax, nh, AlfaAir, C, Ro, K_, dTau, theta=theta, order=order)
+    single = [HeatingSolver(Rmin, Rmax[b], nh, AlfaAir[b], C, Ro, K_[b], dTau, theta=theta, order=order)
+              for b in range(3)]
+    T = np.full((3, nh), 100.0)
+    T_single = [np.full(nh, 100.0) for _ in range(3)]
+    for i in range(50):
+        if i == 25:  # nowy etap: inne alfa i krok
+            batch.set_convection(AlfaAir / 2, dTau / 2)
+            for b, solver in enumerate(single):
+                solver.set_convection(AlfaAir[b] / 2, dTau / 2)
+        T = batch.step(T, 1200.0)
+        T_single = [solver.step(t, 1200.0) for solver, t in zip(single, T_single)]
+    np.testing.assert_allclose(T, np.stack(T_single), rtol=1e-10)
+    assert batch.n_factorisations == 2
+
+
+@pytest.mark.parametrize("batch", [False, True])
+@pytest.mark.parametrize("theta", [1.0, 0.5])
+@pytest.mark.parametrize("order,nh", [(1, 41), (2, 41)])
+def test_lapack_matches_python_loops(monkeypatch, order, nh, theta, batch):
+    pytest.importorskip("scipy")
+    params = (Rmax, AlfaAir, K_) if batch else (Rmax[0], AlfaAir[0], K_[0])
+
+    def run() -> np.ndarray:
+        solver = HeatingSolver(Rmin, params[0], nh, params[1], C, Ro, params[2], 2.0, theta=theta, order=order)
+        T = np.full(solver.batch + (nh,), 100.0)
+        for _ in range(30):
+            T = solver.step(T, 1200.0)
+        return T
+
+    T_lapack = run()
+    monkeypatch.setattr(solver_module, "cholesky_banded", None)
+    T_loops = run()
+    np.testing.assert_allclose(T_lapack, T_loops, rtol=1e-12)
+
+
+def test_sampler_interpolates_arrays():
+    sampler = OutputSampler([0.0, 1.5, 3.0])
+    rows = []
+    for Tau, values in [(0.0, np.array([0.0, 10.0])), (1.0, np.array([1.0, 20.0])), (2.0, np.array([2.0, 30.0]))]:
+        rows += sampler.sample(Tau, values)
+    rows += sampler.sample(3.0 - 1e-12, np.array([3.0, 40.0]), force=True)
+    assert [t for t, _ in rows] == [0.0, 1.5, 3.0]
+    np.testing.assert_allclose(rows[1][1], [1.5, 25.0])
+    np.testing.assert_allclose(rows[2][1], [3.0, 40.0])